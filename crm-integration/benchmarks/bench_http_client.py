@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Benchmark: pooled HubSpot client vs. a fresh httpx.AsyncClient per request.
+
+Starts a local mock HubSpot server (plain HTTP/1.1 keep-alive) that counts
+accepted TCP connections, then fires the same number of requests through:
+
+  1. per-request  — the old behaviour, a new AsyncClient for every call
+  2. pooled       — hubspot_mcp._make_api_request with the shared client
+
+Usage:
+    python crm-integration/benchmarks/bench_http_client.py [--requests 300] [--concurrency 10]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("HUBSPOT_API_KEY", "bench-key")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx  # noqa: E402
+
+import hubspot_mcp  # noqa: E402
+
+BODY = json.dumps({"results": [], "paging": {}}).encode()
+
+
+class MockHubSpot:
+    """Minimal keep-alive HTTP server that answers every request with BODY."""
+
+    def __init__(self):
+        self.connections = 0
+        self.server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":", 1)[1])
+                if length:
+                    await reader.readexactly(length)
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\n"
+                    b"Content-Type: application/json\r\n"
+                    b"Content-Length: " + str(len(BODY)).encode() + b"\r\n\r\n" + BODY
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self) -> str:
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        port = self.server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}"
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+
+async def _per_request_call(base: str):
+    async with httpx.AsyncClient() as client:
+        response = await client.post(
+            f"{base}/crm/v3/objects/contacts/search",
+            headers=hubspot_mcp._auth_headers(),
+            json={"filterGroups": []},
+            timeout=30.0,
+        )
+        response.raise_for_status()
+        return response.json()
+
+
+async def _pooled_call(base: str):
+    return await hubspot_mcp._make_api_request(
+        "/crm/v3/objects/contacts/search", method="POST", json_data={"filterGroups": []}
+    )
+
+
+async def _run_mode(call, base: str, total: int, concurrency: int) -> list[float]:
+    latencies: list[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await call(base)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(*(one() for _ in range(total)))
+    return latencies
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark pooled HubSpot HTTP client")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    # Benchmark the transport, not the 100 req/10s limiter
+    hubspot_mcp.rate_limiter = hubspot_mcp.RateLimiter(max_requests=10**9)
+
+    print(f"{'mode':<12} {'conns':>6} {'p50 ms':>8} {'p99 ms':>8} {'mean ms':>8}")
+    for label, call in (("per-request", _per_request_call), ("pooled", _pooled_call)):
+        mock = MockHubSpot()
+        base = await mock.start()
+        hubspot_mcp.HUBSPOT_API_BASE = base
+        try:
+            latencies = await _run_mode(call, base, args.requests, args.concurrency)
+        finally:
+            await hubspot_mcp._close_http_client()
+            await mock.stop()
+        print(
+            f"{label:<12} {mock.connections:>6} "
+            f"{statistics.median(latencies):>8.2f} {_percentile(latencies, 99):>8.2f} "
+            f"{statistics.fmean(latencies):>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -12,6 +12,9 @@ Usage:
     # Sync all changed prospects (reads names from stdin, one per line)
     echo "Hsien Naidu" | python crm-integration/cli_sync.py sync -
 
+    # One request at a time per prospect instead of HubSpot batch endpoints
+    python crm-integration/cli_sync.py sync --no-batch "Hsien Naidu"
+
     # Get pipeline summary
     python crm-integration/cli_sync.py pipeline
 
@@ -48,15 +51,13 @@ if MCP_JSON.exists():
 
 # Now import the MCP server module (env vars must be set first)
 sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "shared"))
+from prospects_store import load_table
 from hubspot_mcp import (
-    _parse_prospects_table,
-    _prospect_to_hubspot_properties,
-    _create_or_update_contact,
-    _ensure_company_association,
-    _ensure_deal,
-    _determine_pipeline_stage,
+    _sync_prospects,
     _search_contact_by_linkedin_url,
     _make_api_request,
+    _close_http_client,
     _handle_api_error,
     _split_name,
     ICP_PROSPECTS_PATH,
@@ -64,33 +65,32 @@ from hubspot_mcp import (
 )
 
 
+async def _run(coro):
+    """Run a command coroutine, then release the pooled HubSpot connections."""
+    try:
+        return await coro
+    finally:
+        await _close_http_client()
+
+
 def _read_prospects_file():
-    """Read and parse icp-prospects.md."""
+    """icp-prospects.md as an indexed table (see shared/prospects_store)."""
     if not ICP_PROSPECTS_PATH.exists():
         print(f"ERROR: Prospects file not found: {ICP_PROSPECTS_PATH}", file=sys.stderr)
         sys.exit(1)
-    content = ICP_PROSPECTS_PATH.read_text(encoding="utf-8")
-    return _parse_prospects_table(content)
+    return load_table(ICP_PROSPECTS_PATH)
 
 
 def _find_prospect_by_name(prospects, name):
-    """Find a prospect by name (case-insensitive partial match)."""
-    name_lower = name.lower().strip()
-    # Exact match first
-    for p in prospects:
-        if p.get("Name", "").lower().strip() == name_lower:
-            return p
-    # Partial match
-    for p in prospects:
-        if name_lower in p.get("Name", "").lower():
-            return p
-    return None
-
-
-async def sync_prospects(names):
-    """Sync specific prospects by name."""
+    """Find a prospect by name (case-insensitive exact match, then partial match)."""
+    return prospects.find_by_name(name)
+
+
+async def sync_prospects(names, batch=True, full=False):
+    """Sync specific prospects by name. Rows unchanged since the last sync are skipped."""
     prospects = _read_prospects_file()
     results = []
+    to_sync = []
 
     for name in names:
         prospect = _find_prospect_by_name(prospects, name)
@@ -102,37 +102,25 @@ async def sync_prospects(names):
         if not linkedin_url or linkedin_url == "TBD":
             results.append(f"SKIPPED: {prospect['Name']} — no LinkedIn URL")
             continue
+        to_sync.append(prospect)
+
+    outcomes = await _sync_prospects(to_sync, batch=batch, full=full)
+    for prospect, outcome in zip(to_sync, outcomes):
+        if isinstance(outcome, BaseException):
+            results.append(f"ERROR: {prospect['Name']} — {outcome}")
+            continue
+
+        action, stage, ids = outcome
+        if action == "unchanged":
+            results.append(f"UNCHANGED: {prospect['Name']} — already in sync | Stage: {stage}")
+            continue
 
-        try:
-            properties = _prospect_to_hubspot_properties(prospect)
-            result = await _create_or_update_contact(properties)
-            action = result.get("_action", "synced")
-            contact_id = result["id"]
-
-            # Associate company
-            company_name = prospect.get("Company", "")
-            company_id = await _ensure_company_association(contact_id, company_name)
-
-            # Determine pipeline stage
-            touches_str = prospect.get("Touches", "0").strip()
-            try:
-                touches = int(touches_str.replace("+", ""))
-            except ValueError:
-                touches = 0
-            conn_status = prospect.get("Connection Status", "none")
-            touch_history = prospect.get("Touch History", "-")
-            stage = _determine_pipeline_stage(touches, conn_status, touch_history)
-
-            # Create/update deal
-            deal_id = await _ensure_deal(contact_id, stage, prospect["Name"])
-
-            line = f"OK: {prospect['Name']} — {action} | Stage: {stage} | Touches: {touches} | Connection: {conn_status}"
-            if company_id:
-                line += f" | Company: {company_name}"
-            results.append(line)
-
-        except Exception as e:
-            results.append(f"ERROR: {prospect['Name']} — {e}")
+        touches = prospect.get("Touches", "0").strip()
+        conn_status = prospect.get("Connection Status", "none")
+        line = f"OK: {prospect['Name']} — {action} | Stage: {stage} | Touches: {touches} | Connection: {conn_status}"
+        if ids.get("company_id"):
+            line += f" | Company: {prospect.get('Company', '')}"
+        results.append(line)
 
     return results
 
@@ -208,6 +196,15 @@ def main():
     # sync command
     sync_parser = subparsers.add_parser("sync", help="Sync prospects by name")
     sync_parser.add_argument("names", nargs="+", help="Prospect names to sync (use '-' for stdin)")
+    sync_parser.add_argument(
+        "--batch", action=argparse.BooleanOptionalAction, default=True,
+        help="Use HubSpot batch endpoints, a few calls per 100 names instead of 4-7 per name "
+             "(default, as in crm_sync_all); --no-batch syncs one prospect at a time",
+    )
+    sync_parser.add_argument(
+        "--full", action="store_true",
+        help="Re-send prospects even if unchanged since the last sync",
+    )
 
     # pipeline command
     subparsers.add_parser("pipeline", help="Show pipeline summary")
@@ -232,7 +229,7 @@ def main():
         if names == ["-"]:
             names = [line.strip() for line in sys.stdin if line.strip()]
 
-        results = asyncio.run(sync_prospects(names))
+        results = asyncio.run(_run(sync_prospects(names, batch=args.batch, full=args.full)))
         print(f"\nCRM Sync Results ({len(results)} records)")
         print("=" * 50)
         for r in results:
@@ -240,10 +237,10 @@ def main():
         print()
 
     elif args.command == "pipeline":
-        asyncio.run(get_pipeline())
+        asyncio.run(_run(get_pipeline()))
 
     elif args.command == "lookup":
-        asyncio.run(lookup_contact(args.name))
+        asyncio.run(_run(lookup_contact(args.name)))
 
 
 if __name__ == "__main__":
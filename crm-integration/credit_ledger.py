@@ -0,0 +1,142 @@
+"""
+Monthly credit ledger for the email-finder providers.
+
+Free-tier credits (Apollo 50/month, Hunter 25/month, ...) are spent across
+many runs of crm_find_email / crm_find_emails, so the tally has to outlive a
+single call. The ledger is a SQLite file next to icp-prospects.md (override
+with EMAIL_CREDIT_LEDGER_PATH) holding credits used per provider per calendar
+month (UTC).
+
+try_consume() checks and increments in one UPDATE statement, so concurrent
+lookups — in one process or several — can never spend past a limit.
+email-finder/validate-keys.py reads the same file to show remaining budget.
+
+The same file keeps per-provider call statistics (hit rate, latency) for the
+adaptive waterfall scheduler. They are exponentially weighted (STATS_DECAY
+per call), so a provider whose match rate changes is re-ranked within a few
+dozen calls. expected_cost_per_hit() is the ranking itself, shared by the
+scheduler and validate-keys.py.
+"""
+
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS credits (
+    month TEXT NOT NULL,
+    provider TEXT NOT NULL,
+    used INTEGER NOT NULL,
+    PRIMARY KEY (month, provider)
+);
+CREATE TABLE IF NOT EXISTS provider_stats (
+    provider TEXT PRIMARY KEY,
+    calls REAL NOT NULL,
+    hits REAL NOT NULL,
+    latency_total REAL NOT NULL
+);
+"""
+STATS_DECAY = 0.98  # weight kept by past calls each time a new one is recorded
+PRIOR_CALLS = 5.0  # weight of the prior hit rate and latency below
+PRIOR_HIT_RATE = 0.3
+PRIOR_LATENCY = 3.0  # seconds
+
+
+def current_month() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m")
+
+
+def expected_cost_per_hit(
+    stats: Optional[Dict[str, float]], remaining: int, max_limit: int, latency_weight: float
+) -> float:
+    """Expected credits-equivalent spent per email found by a provider.
+
+    A call costs one credit, priced by scarcity (the largest monthly allowance
+    divided by the provider's remaining credits, so a credit from a nearly
+    exhausted pool is dear), plus latency_weight per second of average
+    latency; divided by the hit rate. Hit rate and latency are smoothed
+    towards a prior (30%, 3s over 5 calls) until a provider has history.
+    `stats` is the provider's provider_stats() entry, or None.
+    """
+    entry = stats or {"calls": 0.0, "hits": 0.0, "latency_total": 0.0}
+    hit_rate = (entry["hits"] + PRIOR_HIT_RATE * PRIOR_CALLS) / (entry["calls"] + PRIOR_CALLS)
+    latency = (entry["latency_total"] + PRIOR_LATENCY * PRIOR_CALLS) / (entry["calls"] + PRIOR_CALLS)
+    credit_price = max_limit / max(1, remaining)
+    return (credit_price + latency_weight * latency) / hit_rate
+
+
+class CreditLedger:
+    """Credits used per (month, provider), plus weighted per-provider call stats.
+
+    Months are "YYYY-MM" in UTC.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=10, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def used(self, provider: str, month: Optional[str] = None) -> int:
+        row = self._conn.execute(
+            "SELECT used FROM credits WHERE month = ? AND provider = ?",
+            (month or current_month(), provider),
+        ).fetchone()
+        return row[0] if row else 0
+
+    def remaining(self, provider: str, limit: int, month: Optional[str] = None) -> int:
+        return max(0, limit - self.used(provider, month))
+
+    def try_consume(self, provider: str, limit: int, count: int = 1) -> bool:
+        """Spend `count` credits if that stays within `limit` this month."""
+        month = current_month()
+        self._conn.execute(
+            "INSERT OR IGNORE INTO credits (month, provider, used) VALUES (?, ?, 0)",
+            (month, provider),
+        )
+        cursor = self._conn.execute(
+            "UPDATE credits SET used = used + ? WHERE month = ? AND provider = ? AND used + ? <= ?",
+            (count, month, provider, count, limit),
+        )
+        return cursor.rowcount == 1
+
+    def refund(self, provider: str, count: int = 1) -> None:
+        """Give back credits reserved for a call that never reached the provider."""
+        self._conn.execute(
+            "UPDATE credits SET used = MAX(0, used - ?) WHERE month = ? AND provider = ?",
+            (count, current_month(), provider),
+        )
+
+    def usage(self, month: Optional[str] = None) -> Dict[str, int]:
+        """Credits used per provider in `month` (default: this month)."""
+        rows = self._conn.execute(
+            "SELECT provider, used FROM credits WHERE month = ?", (month or current_month(),)
+        ).fetchall()
+        return dict(rows)
+
+    def record_call(self, provider: str, hit: bool, latency: float) -> None:
+        """Fold one answered provider call into its weighted hit/latency stats."""
+        self._conn.execute(
+            "INSERT OR IGNORE INTO provider_stats (provider, calls, hits, latency_total) VALUES (?, 0, 0, 0)",
+            (provider,),
+        )
+        self._conn.execute(
+            "UPDATE provider_stats SET calls = calls * ? + 1, hits = hits * ? + ?, "
+            "latency_total = latency_total * ? + ? WHERE provider = ?",
+            (STATS_DECAY, STATS_DECAY, 1 if hit else 0, STATS_DECAY, latency, provider),
+        )
+
+    def provider_stats(self) -> Dict[str, Dict[str, float]]:
+        """{provider: {calls, hits, latency_total}} (weighted counts)."""
+        rows = self._conn.execute(
+            "SELECT provider, calls, hits, latency_total FROM provider_stats"
+        ).fetchall()
+        return {
+            provider: {"calls": calls, "hits": hits, "latency_total": latency_total}
+            for provider, calls, hits, latency_total in rows
+        }
+
+    def close(self) -> None:
+        self._conn.close()
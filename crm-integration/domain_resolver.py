@@ -0,0 +1,236 @@
+"""
+Company domain resolution for the email-finder waterfall.
+
+Hunter and Snov.io look people up by name + company domain, and charge a
+credit whether or not the domain exists. Instead of guessing
+"<companyname>.com", DomainResolver tries a short list of candidates (a URL in
+the prospect's Notes, then the company name against the TLDs of the
+prospect's location, e.g. .com.sg / .sg for Singapore, and .com) and only
+accepts one that receives mail. A domain guessed from the company name needs
+a DNS MX record: a company's name under some other TLD is as likely to be an
+unrelated business, and only one that takes mail is worth a credit. Results,
+including "no domain found", are cached per company and location TLDs in a
+JSON file next to icp-prospects.md (DomainCache; override with
+COMPANY_DOMAIN_CACHE_PATH).
+
+DNS goes through a pluggable Resolver: DnsResolver uses dnspython for MX
+lookups when it is installed (pip install dnspython). Without it only a
+domain written in Notes can be checked (by an address lookup); guesses stay
+unverified and are not used.
+"""
+
+import asyncio
+import re
+import socket
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Protocol, Tuple
+
+from sync_state import _atomic_write_json, _read_json, normalize_company_name
+
+# Hosts that show up in Notes but are never a company's mail domain
+IGNORED_HOSTS = (
+    "linkedin.com", "lnkd.in", "facebook.com", "twitter.com", "x.com",
+    "instagram.com", "youtube.com", "medium.com", "github.com", "google.com",
+)
+COMPANY_SUFFIXES = re.compile(
+    r"[\s,]*\b(Pte\.?\s*Ltd\.?|Sdn\.?\s*Bhd\.?|Pty\.?\s*Ltd\.?|Ltd\.?|Limited|Inc\.?|Corp\.?|"
+    r"Corporation|LLC|LLP|GmbH|PLC|Co\.?|Company|Group|Holdings?)\s*$",
+    re.IGNORECASE,
+)
+DEFAULT_TLDS = ("com",)
+# Location keyword -> TLDs tried before DEFAULT_TLDS
+REGIONAL_TLDS = {
+    "singapore": ("com.sg", "sg"),
+    "malaysia": ("com.my", "my"),
+    "kuala lumpur": ("com.my", "my"),
+    "indonesia": ("co.id", "id"),
+    "jakarta": ("co.id", "id"),
+    "hong kong": ("com.hk", "hk"),
+    "australia": ("com.au",),
+    "sydney": ("com.au",),
+    "melbourne": ("com.au",),
+    "india": ("in", "co.in"),
+    "united kingdom": ("co.uk",),
+    "london": ("co.uk",),
+}
+# getaddrinfo errors meaning "no such name" (anything else is a lookup failure)
+NO_SUCH_NAME = {socket.EAI_NONAME, getattr(socket, "EAI_NODATA", socket.EAI_NONAME)}
+
+
+CACHE_VERSION = 2  # 1 accepted .io/.co/.ai guesses on an address record alone
+
+
+class Resolver(Protocol):
+    async def has_mail(self, domain: str, mx_only: bool = False) -> Optional[bool]:
+        """True/False if the domain does/doesn't receive mail; None if DNS failed.
+
+        With mx_only, only an MX record counts (None if MX can't be checked).
+        """
+        ...
+
+
+class DnsResolver:
+    """MX lookup via dnspython when available, else A/AAAA via getaddrinfo."""
+
+    def __init__(self, timeout: float = 3.0):
+        self.timeout = timeout
+
+    async def has_mail(self, domain: str, mx_only: bool = False) -> Optional[bool]:
+        try:
+            import dns.asyncresolver
+            import dns.exception
+            import dns.resolver
+        except ImportError:
+            return None if mx_only else await self._has_address(domain)
+        try:
+            answers = await dns.asyncresolver.resolve(domain, "MX", lifetime=self.timeout)
+        except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer, dns.resolver.NoNameservers):
+            return False
+        except dns.exception.DNSException:
+            return None
+        return len(answers) > 0
+
+    async def _has_address(self, domain: str) -> Optional[bool]:
+        loop = asyncio.get_running_loop()
+        try:
+            await asyncio.wait_for(loop.getaddrinfo(domain, None), timeout=self.timeout)
+        except socket.gaierror as e:
+            return False if e.errno in NO_SUCH_NAME else None
+        except (asyncio.TimeoutError, OSError):
+            return None
+        return True
+
+
+def domain_from_text(text: str) -> Optional[str]:
+    """First non-social website domain mentioned in free text (e.g. Notes)."""
+    for match in re.finditer(r"https?://(?:www\.)?([a-zA-Z0-9.-]+\.[a-zA-Z]{2,})", text or ""):
+        host = match.group(1).lower()
+        if not any(host == h or host.endswith("." + h) for h in IGNORED_HOSTS):
+            return host
+    return None
+
+
+def regional_tlds(location: str) -> Tuple[str, ...]:
+    """TLDs suggested by a prospect's Location, most specific first."""
+    location = (location or "").lower()
+    tlds: List[str] = []
+    for keyword, regional in REGIONAL_TLDS.items():
+        if keyword in location:
+            tlds.extend(t for t in regional if t not in tlds)
+    return tuple(tlds)
+
+
+def candidate_domains(company: str, location: str = "") -> List[str]:
+    """Plausible domains for a company name, most likely first."""
+    company = (company or "").strip()
+    if not company or company == "-":
+        return []
+    if re.fullmatch(r"[a-zA-Z0-9-]+(\.[a-zA-Z0-9-]+)*\.[a-zA-Z]{2,}", company):
+        return [company.lower()]  # Company column already holds a domain
+
+    base = COMPANY_SUFFIXES.sub("", company)
+    words = re.findall(r"[a-zA-Z0-9]+", base.lower())
+    if not words:
+        return []
+    stems = ["".join(words)]
+    if len(words) > 1:
+        stems.append("-".join(words))
+
+    tlds = list(regional_tlds(location))
+    tlds.extend(t for t in DEFAULT_TLDS if t not in tlds)
+
+    return [f"{stem}.{tld}" for stem in stems for tld in tlds]
+
+
+class DomainCache:
+    """(company name, location TLDs) -> verified domain ("" when none was found), with TTLs.
+
+    The same company name can resolve differently by location (acme.com.sg vs
+    acme.com), so entries are keyed on both.
+    """
+
+    def __init__(self, path: Path, ttl_seconds: float, negative_ttl_seconds: float):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.companies: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        self.load()
+
+    def load(self) -> None:
+        data = _read_json(self.path)
+        self.companies = data.get("companies", {}) if data.get("version") == CACHE_VERSION else {}
+
+    @staticmethod
+    def key(company_name: str, tlds: Tuple[str, ...] = ()) -> str:
+        name = normalize_company_name(company_name)
+        return f"{name}|{','.join(tlds)}" if name and tlds else name
+
+    def get(self, company_name: str, tlds: Tuple[str, ...] = ()) -> Optional[str]:
+        """Cached domain, "" for a cached miss, or None if unknown/expired."""
+        entry = self.companies.get(self.key(company_name, tlds))
+        if not entry:
+            return None
+        ttl = self.ttl_seconds if entry["domain"] else self.negative_ttl_seconds
+        if time.time() - entry.get("checked_at", 0) > ttl:
+            return None
+        return entry["domain"]
+
+    def put(self, company_name: str, domain: str, tlds: Tuple[str, ...] = ()) -> None:
+        key = self.key(company_name, tlds)
+        if not key:
+            return
+        self.companies[key] = {"domain": domain, "checked_at": time.time()}
+        self._dirty = True
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        _atomic_write_json(self.path, {"version": CACHE_VERSION, "companies": self.companies})
+        self._dirty = False
+
+
+class DomainResolver:
+    """Finds a mail-receiving domain for a company, caching the answer."""
+
+    def __init__(self, cache: DomainCache, resolver: Optional[Resolver] = None):
+        self.cache = cache
+        self.resolver: Resolver = resolver or DnsResolver()
+        self._checked: Dict[Tuple[str, bool], Optional[bool]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def _has_mail(self, domain: str, mx_only: bool = False) -> Optional[bool]:
+        if (domain, mx_only) in self._checked:
+            return self._checked[domain, mx_only]
+        verdict = await self.resolver.has_mail(domain, mx_only)
+        if verdict is not None:  # Retry DNS failures next time
+            self._checked[domain, mx_only] = verdict
+        return verdict
+
+    async def resolve(self, company: str, notes: str = "", location: str = "") -> Optional[str]:
+        """Verified domain for this company, or None if no candidate receives mail."""
+        explicit = domain_from_text(notes)
+        if explicit and await self._has_mail(explicit):
+            return explicit
+
+        company = company or ""
+        if normalize_company_name(company) in ("", "-"):
+            return None
+        tlds = regional_tlds(location)
+        key = DomainCache.key(company, tlds)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            cached = self.cache.get(company, tlds)
+            if cached is not None:
+                return cached or None
+            unknown = False
+            for candidate in candidate_domains(company, location):
+                verdict = await self._has_mail(candidate, mx_only=True)
+                if verdict:
+                    self.cache.put(company, candidate, tlds)
+                    return candidate
+                unknown = unknown or verdict is None
+            if not unknown:
+                self.cache.put(company, "", tlds)  # Only cache a miss DNS actually confirmed
+            return None
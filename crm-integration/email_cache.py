@@ -0,0 +1,115 @@
+"""
+Persistent email-lookup cache for the email-finder waterfall.
+
+Every waterfall result is stored in a small SQLite database next to
+icp-prospects.md (override with EMAIL_LOOKUP_CACHE_PATH), keyed on the
+normalized name + company domain + LinkedIn URL of the person looked up:
+
+- hits keep the email with its source and verification status, and are
+  reused for EMAIL_CACHE_TTL_DAYS;
+- misses are cached for EMAIL_CACHE_NEGATIVE_TTL_DAYS, so a person nobody
+  could find isn't re-queried (and re-charged) on every run.
+
+Each entry also records how many provider credits the original lookup spent,
+which is what a cache hit saves.
+"""
+
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from prospects_store import normalize_name, normalize_url
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS email_lookups (
+    key TEXT PRIMARY KEY,
+    email TEXT NOT NULL,
+    source TEXT NOT NULL,
+    status TEXT NOT NULL,
+    credits INTEGER NOT NULL,
+    looked_up_at REAL NOT NULL
+)
+"""
+
+
+def normalize_domain(domain: str) -> str:
+    """Lookup key for a company domain: lowercase, no scheme, www. or path."""
+    domain = re.sub(r"^https?://", "", (domain or "").strip().lower())
+    domain = domain.split("/", 1)[0]
+    return domain[4:] if domain.startswith("www.") else domain
+
+
+def lookup_key(name: str, domain: Optional[str], linkedin_url: str) -> str:
+    url = normalize_url(linkedin_url or "").rstrip("/")
+    if url == "tbd":
+        url = ""
+    return "|".join((normalize_name(name), normalize_domain(domain or ""), url))
+
+
+class EmailLookupCache:
+    """SQLite-backed map of lookup key -> {email, source, status, credits}.
+
+    A miss is stored with email "". Entries older than their TTL read as
+    absent. Hit/credit counters cover this process only; see stats().
+    """
+
+    def __init__(self, path: Path, ttl_seconds: float, negative_ttl_seconds: float):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.lookups = 0
+        self.hits = 0
+        self.negative_hits = 0
+        self.credits_saved = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=10, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(SCHEMA)
+
+    def get(self, name: str, domain: Optional[str], linkedin_url: str) -> Optional[Dict[str, Any]]:
+        """Fresh cached result, or None. Cached misses come back with email == ""."""
+        self.lookups += 1
+        row = self._conn.execute(
+            "SELECT email, source, status, credits, looked_up_at FROM email_lookups WHERE key = ?",
+            (lookup_key(name, domain, linkedin_url),),
+        ).fetchone()
+        if row is None:
+            return None
+        email, source, status, credits, looked_up_at = row
+        ttl = self.ttl_seconds if email else self.negative_ttl_seconds
+        if time.time() - looked_up_at > ttl:
+            return None
+        self.hits += 1
+        if not email:
+            self.negative_hits += 1
+        self.credits_saved += credits
+        return {"email": email, "source": source, "status": status, "credits": credits}
+
+    def _put(self, name: str, domain: Optional[str], linkedin_url: str,
+             email: str, source: str, status: str, credits: int) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO email_lookups VALUES (?, ?, ?, ?, ?, ?)",
+            (lookup_key(name, domain, linkedin_url), email, source, status, credits, time.time()),
+        )
+
+    def put_hit(self, name: str, domain: Optional[str], linkedin_url: str,
+                result: Dict[str, str], credits: int) -> None:
+        self._put(name, domain, linkedin_url,
+                  result["email"], result["source"], result["status"], credits)
+
+    def put_miss(self, name: str, domain: Optional[str], linkedin_url: str, credits: int) -> None:
+        self._put(name, domain, linkedin_url, "", "", "", credits)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+            "credits_saved": self.credits_saved,
+        }
+
+    def close(self) -> None:
+        self._conn.close()
@@ -7,21 +7,35 @@ Provides tools for contact management, activity logging, and pipeline reporting.
 """
 
 import asyncio
+import hashlib
 import json
 import os
-import re
+import random
+import sys
 import time
-from datetime import datetime, timezone
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timezone
+from email.utils import parsedate_to_datetime
 from enum import Enum
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
 
 import httpx
 from mcp.server.fastmcp import FastMCP
 from pydantic import BaseModel, ConfigDict, Field, field_validator
 
-# Initialize the MCP server
-mcp = FastMCP("hubspot_mcp")
+# icp-prospects.md is read and written through shared/prospects_store
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "shared"))
+from credit_ledger import CreditLedger, expected_cost_per_hit
+from domain_resolver import DomainCache, DomainResolver
+from email_cache import EmailLookupCache
+from prospects_snapshot import ProspectsSnapshot, snapshot_for
+from prospects_store import (
+    PROSPECTS_PATH, ProspectRow, ProspectsTable, hubspot_date_ms, load_table, normalize_url, today_utc,
+    write_updates,
+)
+from sync_state import CompanyCache, SyncStateStore, normalize_company_name, row_hash
+from token_manager import TokenManager, open_token_store
 
 # Constants
 HUBSPOT_API_BASE = "https://api.hubapi.com"
@@ -33,15 +47,86 @@ PROSPEO_API_BASE = "https://api.prospeo.io"
 CHARACTER_LIMIT = 25000
 RATE_LIMIT_MAX = 100
 RATE_LIMIT_WINDOW = 10  # seconds
+REQUEST_TIMEOUT = 30.0  # seconds
+RETRY_MAX_ATTEMPTS = 5
+RETRY_BASE_DELAY = 1.0  # seconds, doubled per attempt
+RETRY_MAX_DELAY = 30.0  # seconds
+IDEMPOTENT_METHODS = {"GET", "PUT", "PATCH", "DELETE"}
+HTTP_MAX_CONNECTIONS = int(os.environ.get("HUBSPOT_HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE = int(os.environ.get("HUBSPOT_HTTP_MAX_KEEPALIVE", "10"))
+HTTP_KEEPALIVE_EXPIRY = float(os.environ.get("HUBSPOT_HTTP_KEEPALIVE_EXPIRY", "30"))  # seconds
+SYNC_CONCURRENCY = int(os.environ.get("HUBSPOT_SYNC_CONCURRENCY", "8"))
+BATCH_SIZE = 100  # HubSpot max inputs per batch call / IN-filter values per search
+DEAL_TO_CONTACT_TYPE_ID = 3  # HubSpot-defined association type
 APOLLO_MONTHLY_LIMIT = 50
 HUNTER_MONTHLY_LIMIT = 25
 SNOV_MONTHLY_LIMIT = 50
 GETPROSPECT_MONTHLY_LIMIT = 50
 PROSPEO_MONTHLY_LIMIT = 100
-ICP_PROSPECTS_PATH = Path(os.environ.get(
-    "ICP_PROSPECTS_PATH",
-    str(Path.home() / ".claude" / "skills" / "shared" / "logs" / "icp-prospects.md")
+EMAIL_MONTHLY_LIMITS = {
+    "Apollo": APOLLO_MONTHLY_LIMIT, "Hunter": HUNTER_MONTHLY_LIMIT,
+    "Snov.io": SNOV_MONTHLY_LIMIT, "GetProspect": GETPROSPECT_MONTHLY_LIMIT,
+    "Prospeo": PROSPEO_MONTHLY_LIMIT,
+}
+# Email waterfall: "sequential" (default, fewest credits) or "race" (lowest latency)
+EMAIL_LOOKUP_MODE = os.environ.get("EMAIL_LOOKUP_MODE", "sequential").strip().lower()
+EMAIL_PROVIDER_TIMEOUT = float(os.environ.get("EMAIL_PROVIDER_TIMEOUT", "30"))  # seconds per provider
+# Per-provider deadline overrides, e.g. EMAIL_PROVIDER_DEADLINES="Snov.io=12,GetProspect=8"
+EMAIL_PROVIDER_DEADLINES = {
+    name.strip(): float(seconds)
+    for name, _, seconds in (
+        item.partition("=") for item in os.environ.get("EMAIL_PROVIDER_DEADLINES", "").split(",")
+    )
+    if name.strip() and seconds.strip()
+}
+EMAIL_ENRICH_CONCURRENCY = int(os.environ.get("EMAIL_ENRICH_CONCURRENCY", "4"))  # prospects in flight
+EMAIL_PROVIDER_CONCURRENCY = int(os.environ.get("EMAIL_PROVIDER_CONCURRENCY", "2"))  # calls in flight per provider
+# Per-provider request pacing as (requests, window seconds); conservative free-tier figures
+EMAIL_PROVIDER_RATES = {
+    "Apollo": (50, 60),
+    "Hunter": (15, 1),
+    "Snov.io": (60, 60),
+    "GetProspect": (60, 60),
+    "Prospeo": (30, 60),
+}
+# Waterfall order: "adaptive" (by expected cost per found email) or "fixed" (registry order)
+EMAIL_PROVIDER_ORDER = os.environ.get("EMAIL_PROVIDER_ORDER", "adaptive").strip().lower()
+EMAIL_LATENCY_WEIGHT = float(os.environ.get("EMAIL_LATENCY_WEIGHT", "0.1"))  # credits per second waited
+ICP_PROSPECTS_PATH = PROSPECTS_PATH  # ICP_PROSPECTS_PATH env, else ~/.claude/skills/shared/logs/icp-prospects.md
+CRM_SYNC_STATE_PATH = Path(os.environ.get(
+    "CRM_SYNC_STATE_PATH",
+    str(ICP_PROSPECTS_PATH.parent / "crm-sync-state.json")
+))
+CRM_COMPANY_CACHE_PATH = Path(os.environ.get(
+    "CRM_COMPANY_CACHE_PATH",
+    str(ICP_PROSPECTS_PATH.parent / "crm-company-cache.json")
+))
+COMPANY_CACHE_TTL_HOURS = float(os.environ.get("CRM_COMPANY_CACHE_TTL_HOURS", "168"))
+# Also hash icp-prospects.md when checking the parse cache (catches same-size edits within mtime resolution)
+PROSPECTS_CACHE_VERIFY = os.environ.get("ICP_PROSPECTS_CACHE_VERIFY", "").lower() in ("1", "true", "yes")
+EMAIL_LOOKUP_CACHE_PATH = Path(os.environ.get(
+    "EMAIL_LOOKUP_CACHE_PATH",
+    str(ICP_PROSPECTS_PATH.parent / "email-lookup-cache.sqlite3")
 ))
+EMAIL_CREDIT_LEDGER_PATH = Path(os.environ.get(
+    "EMAIL_CREDIT_LEDGER_PATH",
+    str(ICP_PROSPECTS_PATH.parent / "email-credit-ledger.sqlite3")
+))
+COMPANY_DOMAIN_CACHE_PATH = Path(os.environ.get(
+    "COMPANY_DOMAIN_CACHE_PATH",
+    str(ICP_PROSPECTS_PATH.parent / "company-domains.json")
+))
+DOMAIN_CACHE_TTL_DAYS = float(os.environ.get("DOMAIN_CACHE_TTL_DAYS", "90"))
+DOMAIN_CACHE_NEGATIVE_TTL_DAYS = float(os.environ.get("DOMAIN_CACHE_NEGATIVE_TTL_DAYS", "7"))
+EMAIL_CACHE_TTL_DAYS = float(os.environ.get("EMAIL_CACHE_TTL_DAYS", "180"))
+EMAIL_CACHE_NEGATIVE_TTL_DAYS = float(os.environ.get("EMAIL_CACHE_NEGATIVE_TTL_DAYS", "30"))
+# OAuth access tokens (Snov.io) survive restarts only if OAUTH_TOKEN_SECRET is set (encrypted at rest)
+OAUTH_TOKEN_STORE_PATH = Path(os.environ.get(
+    "OAUTH_TOKEN_STORE_PATH",
+    str(ICP_PROSPECTS_PATH.parent / "oauth-tokens.enc")
+))
+OAUTH_TOKEN_SECRET = os.environ.get("OAUTH_TOKEN_SECRET", "")
+OAUTH_TOKEN_REFRESH_MARGIN = float(os.environ.get("OAUTH_TOKEN_REFRESH_MARGIN", "300"))  # seconds before expiry
 
 # Custom HubSpot properties to create
 CUSTOM_PROPERTIES = [
@@ -153,26 +238,150 @@ PIPELINE_STAGES = {
 # ─── Rate Limiter ───────────────────────────────────────────────────────────
 
 class RateLimiter:
-    """Simple sliding-window rate limiter for HubSpot API (100 req/10s)."""
+    """Token-bucket rate limiter for HubSpot API (100 req/10s).
+
+    O(1) per acquire. Each caller reserves the next token under a FIFO lock
+    and then sleeps until that token is due, so concurrent waiters are spaced
+    out in arrival order instead of waking together. The bucket holds a tenth
+    of the window's budget as burst and refills the rest evenly, so no 10s
+    window ever sees more than max_requests.
+
+    pause() blocks everyone until a point in time (Retry-After, or HubSpot's
+    interval headers reporting 0 remaining) and voids the tokens reserved so
+    far: waiters that slept through a pause reserve again, so they resume
+    spaced out at the refill rate rather than all at once. Time spent waiting
+    is counted in throttled_seconds / throttled_waits; see stats().
+    """
 
     def __init__(self, max_requests: int = RATE_LIMIT_MAX, window: int = RATE_LIMIT_WINDOW):
         self.max_requests = max_requests
         self.window = window
-        self.timestamps: list[float] = []
+        self.capacity = max(1, max_requests // 10)
+        self.rate = max(max_requests - self.capacity, 1) / window  # tokens per second
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.resume_at = 0.0
+        self.daily_remaining: Optional[int] = None
+        self.throttled_seconds = 0.0
+        self.throttled_waits = 0
+        self.retries = 0
+        self._lock = asyncio.Lock()
+
+    def _reserve(self) -> float:
+        """Take one token (possibly going into debt); return seconds until it's due."""
+        now = time.monotonic()
+        start = max(now, self.resume_at)
+        if start > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (start - self.updated) * self.rate)
+            self.updated = start
+        self.tokens -= 1
+        due = self.updated + max(0.0, -self.tokens) / self.rate
+        return due - now
 
     async def acquire(self):
-        now = time.monotonic()
-        self.timestamps = [t for t in self.timestamps if now - t < self.window]
-        if len(self.timestamps) >= self.max_requests:
-            wait = self.window - (now - self.timestamps[0])
+        while True:
+            async with self._lock:
+                wait = self._reserve()
+                resume_at = self.resume_at
             if wait > 0:
+                self.throttled_seconds += wait
+                self.throttled_waits += 1
                 await asyncio.sleep(wait)
-        self.timestamps.append(time.monotonic())
+            if self.resume_at == resume_at:
+                return
+            # A pause started while we slept and voided our token: queue again behind it
+
+    def pause(self, seconds: float) -> None:
+        """Hold all callers for `seconds`; the bucket restarts empty afterwards.
+
+        Outstanding reservations are dropped (their waiters reserve again), so
+        the debt they ran up is cleared too.
+        """
+        resume_at = time.monotonic() + seconds
+        if resume_at > self.resume_at:
+            self.resume_at = resume_at
+            self.tokens = 0.0
+            self.updated = resume_at
+
+    def observe(self, response: httpx.Response) -> None:
+        """Track HubSpot's rate-limit headers from a response."""
+        headers = response.headers
+        daily = headers.get("X-HubSpot-RateLimit-Daily-Remaining")
+        if daily is not None and daily.isdigit():
+            self.daily_remaining = int(daily)
+        remaining = headers.get("X-HubSpot-RateLimit-Remaining")
+        interval_ms = headers.get("X-HubSpot-RateLimit-Interval-Milliseconds")
+        if remaining == "0" and interval_ms and interval_ms.isdigit():
+            self.pause(int(interval_ms) / 1000)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "throttled_seconds": round(self.throttled_seconds, 2),
+            "throttled_waits": self.throttled_waits,
+            "retries": self.retries,
+            "daily_remaining": self.daily_remaining,
+        }
 
 
 rate_limiter = RateLimiter()
 
 
+# ─── HTTP Client ────────────────────────────────────────────────────────────
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional `h2` package (pip install httpx[http2])."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Return the process-wide HubSpot client, creating it on first use.
+
+    One pooled client keeps TCP+TLS connections alive between calls instead of
+    paying a fresh handshake per request. Pool size is configurable through the
+    HUBSPOT_HTTP_MAX_CONNECTIONS / HUBSPOT_HTTP_MAX_KEEPALIVE env vars.
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            http2=_http2_available(),
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=REQUEST_TIMEOUT,
+        )
+    return _http_client
+
+
+async def _close_http_client() -> None:
+    """Close the shared client. Call once before the event loop shuts down."""
+    global _http_client
+    if _http_client is not None:
+        client, _http_client = _http_client, None
+        await client.aclose()
+
+
+@asynccontextmanager
+async def _lifespan(server: FastMCP) -> AsyncIterator[None]:
+    """MCP server lifespan: release pooled connections on shutdown."""
+    try:
+        yield
+    finally:
+        await _close_http_client()
+
+
+# Initialize the MCP server
+mcp = FastMCP("hubspot_mcp", lifespan=_lifespan)
+
+
 # ─── API Helpers ─────────────────────────────────────────────────────────────
 
 def _get_api_key() -> str:
@@ -189,27 +398,82 @@ def _auth_headers() -> Dict[str, str]:
     }
 
 
+def _retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP date)."""
+    value = response.headers.get("Retry-After", "").strip()
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def _is_daily_limit(response: httpx.Response) -> bool:
+    """HubSpot flags daily-quota 429s with policyName DAILY; retrying won't help."""
+    try:
+        return response.json().get("policyName") == "DAILY"
+    except Exception:
+        return False
+
+
+def _backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff: uniform(0, min(cap, base * 2^attempt))."""
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** attempt)))
+
+
 async def _make_api_request(
     endpoint: str,
     method: str = "GET",
     json_data: Optional[Dict] = None,
     params: Optional[Dict] = None,
 ) -> Dict[str, Any]:
-    """Reusable function for all HubSpot API calls with rate limiting."""
-    await rate_limiter.acquire()
-    async with httpx.AsyncClient() as client:
+    """Reusable function for all HubSpot API calls with rate limiting.
+
+    429s are retried (honouring Retry-After, else jittered exponential
+    backoff) up to RETRY_MAX_ATTEMPTS times, except daily-quota 429s. 502/503/504
+    are retried the same way for idempotent methods only.
+    """
+    client = _get_http_client()
+    for attempt in range(RETRY_MAX_ATTEMPTS + 1):
+        await rate_limiter.acquire()
         response = await client.request(
             method,
             f"{HUBSPOT_API_BASE}{endpoint}",
             headers=_auth_headers(),
             json=json_data,
             params=params,
-            timeout=30.0,
         )
-        response.raise_for_status()
-        if response.status_code == 204:
-            return {}
-        return response.json()
+        rate_limiter.observe(response)
+
+        status = response.status_code
+        retryable = status == 429 or (status in (502, 503, 504) and method in IDEMPOTENT_METHODS)
+        if retryable and attempt < RETRY_MAX_ATTEMPTS:
+            if status == 429 and _is_daily_limit(response):
+                rate_limiter.daily_remaining = 0
+                break
+            delay = _retry_after_seconds(response)
+            if delay is None:
+                delay = _backoff_delay(attempt)
+            rate_limiter.retries += 1
+            if status == 429:
+                # Everyone shares the same budget, so hold all callers
+                rate_limiter.pause(delay)
+            else:
+                rate_limiter.throttled_seconds += delay
+                await asyncio.sleep(delay)
+            continue
+        break
+
+    response.raise_for_status()
+    if response.status_code == 204:
+        return {}
+    return response.json()
 
 
 def _handle_api_error(e: Exception) -> str:
@@ -230,7 +494,9 @@ def _handle_api_error(e: Exception) -> str:
         elif status == 404:
             return f"Error: Resource not found — {message}"
         elif status == 429:
-            return "Error: Rate limit exceeded. Wait 10 seconds and retry."
+            if _is_daily_limit(e.response):
+                return "Error: HubSpot daily API limit reached. It resets at midnight (account time zone)."
+            return f"Error: Rate limit exceeded after {RETRY_MAX_ATTEMPTS} retries. Wait 10 seconds and retry."
         return f"Error: HubSpot API returned {status} — {message}"
     elif isinstance(e, httpx.TimeoutException):
         return "Error: Request timed out. Please try again."
@@ -251,36 +517,6 @@ def _split_name(full_name: str) -> tuple[str, str]:
     return (parts[0], " ".join(parts[1:]))
 
 
-def _parse_touch_date(date_str: str) -> Optional[str]:
-    """Parse date like '07Feb' or '22Jan' into ISO date string for HubSpot.
-
-    HubSpot date properties expect midnight UTC timestamps in milliseconds.
-    We assume current year if the date is in the past, otherwise last year.
-    """
-    if not date_str or date_str.strip() == "-":
-        return None
-    date_str = date_str.strip()
-    # Match patterns like "07Feb", "22Jan", "23Jan 17:45"
-    match = re.match(r"(\d{1,2})([A-Za-z]{3})", date_str)
-    if not match:
-        return None
-    day = int(match.group(1))
-    month_str = match.group(2)
-    try:
-        month = datetime.strptime(month_str, "%b").month
-    except ValueError:
-        return None
-    year = datetime.now().year
-    try:
-        dt = datetime(year, month, day, tzinfo=timezone.utc)
-        if dt > datetime.now(timezone.utc):
-            dt = dt.replace(year=year - 1)
-        # HubSpot date properties need midnight UTC in ms
-        return str(int(dt.timestamp() * 1000))
-    except ValueError:
-        return None
-
-
 def _determine_pipeline_stage(
     touches: int, connection_status: str, touch_history: str
 ) -> str:
@@ -303,57 +539,31 @@ def _determine_pipeline_stage(
     return "Lead"
 
 
-def _parse_prospects_table(content: str) -> List[Dict[str, str]]:
-    """Parse the markdown prospects table from icp-prospects.md.
+def _prospect_stage(prospect: Dict[str, str]) -> str:
+    """Pipeline stage for a parsed icp-prospects.md row."""
+    touches = int(prospect.get("Touches", "0").replace("+", "") or "0")
+    return _determine_pipeline_stage(
+        touches,
+        prospect.get("Connection Status", "none"),
+        prospect.get("Touch History", ""),
+    )
 
-    Returns list of dicts with keys matching column headers.
-    Handles escaped pipes (\\|) in ANY column by replacing them with a placeholder
-    before splitting, then restoring after. This prevents column misalignment when
-    Touch History or Notes contain escaped pipes.
-    """
-    PIPE_PLACEHOLDER = "\x00PIPE\x00"
-    prospects = []
-    lines = content.split("\n")
-    headers = []
-    in_prospects_table = False
-
-    for line in lines:
-        stripped = line.strip()
-        if not stripped.startswith("|"):
-            if in_prospects_table and headers:
-                break  # End of table
-            continue
 
-        # Replace escaped pipes with placeholder BEFORE splitting
-        safe_line = stripped.replace("\\|", PIPE_PLACEHOLDER)
-        cells = [c.strip().replace(PIPE_PLACEHOLDER, "|") for c in safe_line.split("|")]
-        # Remove empty first/last from leading/trailing pipes
-        cells = cells[1:-1] if len(cells) > 2 else cells
+def _load_prospects_table() -> ProspectsTable:
+    """icp-prospects.md parsed and indexed, cached until the file changes.
 
-        if not headers:
-            if "#" in cells and "Name" in cells:
-                headers = cells
-                in_prospects_table = True
-                continue
-        elif in_prospects_table:
-            # Skip separator row
-            if all(c.replace("-", "").replace(":", "").strip() == "" for c in cells):
-                continue
-            # Handle any remaining overflow (extra unescaped pipes)
-            if len(cells) > len(headers):
-                overflow = cells[len(headers) - 1:]
-                cells = cells[:len(headers) - 1] + [" | ".join(overflow)]
-            if len(cells) == len(headers):
-                row = dict(zip(headers, cells))
-                prospects.append(row)
+    Back-to-back tool calls in the long-lived MCP server reuse one parse.
+    """
+    return load_table(ICP_PROSPECTS_PATH, verify_content=PROSPECTS_CACHE_VERIFY)
 
-    return prospects
 
+def _prospect_to_hubspot_properties(prospect: Dict[str, str], today: Optional[date] = None) -> Dict[str, str]:
+    """Convert a parsed prospect row into HubSpot contact properties.
 
-def _prospect_to_hubspot_properties(prospect: Dict[str, str]) -> Dict[str, str]:
-    """Convert a parsed prospect row into HubSpot contact properties."""
+    `today` anchors the year of Last Touch; pass one value for a whole batch.
+    """
     firstname, lastname = _split_name(prospect.get("Name", ""))
-    touch_date = _parse_touch_date(prospect.get("Last Touch", ""))
+    touch_date = hubspot_date_ms(prospect.get("Last Touch", ""), today)
 
     props: Dict[str, str] = {
         "firstname": firstname,
@@ -430,8 +640,27 @@ async def _search_contact_by_email(email: str) -> Optional[Dict]:
     return results[0] if results else None
 
 
-async def _create_or_update_contact(properties: Dict[str, str]) -> Dict[str, Any]:
-    """Create or update a HubSpot contact. Deduplicates by linkedin_profile, then email."""
+async def _create_or_update_contact(
+    properties: Dict[str, str], contact_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """Create or update a HubSpot contact. Deduplicates by linkedin_profile, then email.
+
+    If contact_id is already known (from the sync-state store), PATCH it
+    directly and only fall back to the search if HubSpot says it's gone.
+    """
+    if contact_id:
+        try:
+            result = await _make_api_request(
+                f"/crm/v3/objects/contacts/{contact_id}",
+                method="PATCH",
+                json_data={"properties": properties},
+            )
+            return {**result, "_action": "updated"}
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code != 404:
+                raise
+            # Deleted in HubSpot since the last sync — look it up again
+
     linkedin_url = properties.get("linkedin_profile", "")
     existing = await _search_contact_by_linkedin_url(linkedin_url)
 
@@ -472,12 +701,43 @@ async def _create_or_update_contact(properties: Dict[str, str]) -> Dict[str, Any
             raise
 
 
-async def _ensure_company_association(contact_id: str, company_name: str):
-    """Search for company by name and associate with contact. Creates company if not found."""
-    if not company_name or company_name.strip() == "-":
-        return None
-
-    # Search for existing company
+# Per-company locks so parallel syncs of colleagues don't create duplicate companies
+_company_locks: Dict[str, asyncio.Lock] = {}
+_company_cache: Optional[CompanyCache] = None
+
+
+def _get_company_cache() -> CompanyCache:
+    """Process-wide company name -> ID cache, loaded from disk on first use."""
+    global _company_cache
+    if _company_cache is None:
+        _company_cache = CompanyCache(CRM_COMPANY_CACHE_PATH, COMPANY_CACHE_TTL_HOURS * 3600)
+    return _company_cache
+
+
+async def _prewarm_company_cache() -> None:
+    """Fill the company cache from one paginated listing, at most once per TTL."""
+    cache = _get_company_cache()
+    if not cache.needs_warm():
+        return
+    after = None
+    while True:
+        params: Dict[str, Any] = {"limit": 100, "properties": "name"}
+        if after:
+            params["after"] = after
+        data = await _make_api_request("/crm/v3/objects/companies", params=params)
+        for company in data.get("results", []):
+            name = company.get("properties", {}).get("name")
+            if name:
+                # Keep the first match for duplicate names, like the EQ search would
+                cache.put(name, company["id"], overwrite=False)
+        after = data.get("paging", {}).get("next", {}).get("after")
+        if not after:
+            break
+    cache.mark_warmed()
+
+
+async def _find_or_create_company(company_name: str) -> str:
+    """Search HubSpot for a company by exact name; create it if missing."""
     data = await _make_api_request(
         "/crm/v3/objects/companies/search",
         method="POST",
@@ -493,17 +753,38 @@ async def _ensure_company_association(contact_id: str, company_name: str):
         },
     )
     results = data.get("results", [])
-
     if results:
-        company_id = results[0]["id"]
-    else:
-        # Create company
-        company = await _make_api_request(
-            "/crm/v3/objects/companies",
-            method="POST",
-            json_data={"properties": {"name": company_name}},
-        )
-        company_id = company["id"]
+        return results[0]["id"]
+
+    company = await _make_api_request(
+        "/crm/v3/objects/companies",
+        method="POST",
+        json_data={"properties": {"name": company_name}},
+    )
+    return company["id"]
+
+
+async def _ensure_company_association(contact_id: str, company_name: str):
+    """Search for company by name and associate with contact. Creates company if not found.
+
+    Company IDs and completed associations are cached (see CompanyCache), so
+    repeat calls for the same employer or contact cost no API calls. A 404 on
+    a cached company drops it from the cache and retries with a fresh lookup.
+    """
+    if not company_name or company_name.strip() == "-":
+        return None
+
+    cache = _get_company_cache()
+    lock = _company_locks.setdefault(normalize_company_name(company_name), asyncio.Lock())
+    async with lock:
+        company_id = cache.get(company_name)
+        from_cache = company_id is not None
+        if not company_id:
+            company_id = await _find_or_create_company(company_name)
+            cache.put(company_name, company_id)
+
+    if cache.has_association(contact_id, company_id):
+        return company_id
 
     # Associate contact with company
     try:
@@ -511,61 +792,593 @@ async def _ensure_company_association(contact_id: str, company_name: str):
             f"/crm/v3/objects/contacts/{contact_id}/associations/companies/{company_id}/contact_to_company",
             method="PUT",
         )
-    except httpx.HTTPStatusError:
-        pass  # Association may already exist
+        cache.add_association(contact_id, company_id)
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 404 and from_cache:
+            # Company was deleted or merged in HubSpot since it was cached
+            cache.invalidate(company_id)
+            return await _ensure_company_association(contact_id, company_name)
+        # Association may already exist
 
     return company_id
 
 
+def _deal_name(prospect_name: str) -> str:
+    return f"LinkedIn Pipeline - {prospect_name}"
+
+
+async def _build_deal_index(contact_ids: List[str]) -> Dict[str, Dict[str, str]]:
+    """Map contact ID -> its deal's {"id", "dealstage", "dealname"}.
+
+    One v4 associations batch read plus one deals batch read per 100 contacts,
+    instead of a GET per contact. Contacts with no deal map to {} so callers
+    know to create one without looking again.
+    """
+    index: Dict[str, Dict[str, str]] = {}
+    for chunk in _chunks(list(dict.fromkeys(contact_ids))):
+        data = await _make_api_request(
+            "/crm/v4/associations/contacts/deals/batch/read",
+            method="POST",
+            json_data={"inputs": [{"id": cid} for cid in chunk]},
+        )
+        deal_for: Dict[str, str] = {}
+        for row in data.get("results", []):
+            to = row.get("to", [])
+            if to:
+                deal_for[str(row["from"]["id"])] = str(to[0]["toObjectId"])
+
+        deal_props: Dict[str, Dict] = {}
+        if deal_for:
+            deals = await _make_api_request(
+                "/crm/v3/objects/deals/batch/read",
+                method="POST",
+                json_data={
+                    "inputs": [{"id": did} for did in dict.fromkeys(deal_for.values())],
+                    "properties": ["dealstage", "dealname"],
+                },
+            )
+            deal_props = {d["id"]: d.get("properties", {}) for d in deals.get("results", [])}
+
+        for cid in chunk:
+            did = deal_for.get(cid)
+            if did:
+                props = deal_props.get(did, {})
+                index[cid] = {
+                    "id": did,
+                    "dealstage": props.get("dealstage") or "",
+                    "dealname": props.get("dealname") or "",
+                }
+            else:
+                index[cid] = {}
+    return index
+
+
 async def _ensure_deal(
-    contact_id: str, stage_name: str, prospect_name: str
+    contact_id: str,
+    stage_name: str,
+    prospect_name: str,
+    existing: Optional[Dict[str, str]] = None,
 ) -> Optional[str]:
-    """Create or update deal for pipeline tracking. One deal per contact."""
+    """Create or update deal for pipeline tracking. One deal per contact.
+
+    existing is the contact's entry from a deal index: {"id", "dealstage",
+    "dealname"}, {} if the contact is known to have no deal, or None to look
+    it up. The PATCH is skipped when the stored stage and name already match.
+    """
     pipeline_id = os.environ.get("HUBSPOT_PIPELINE_ID", "default")
     stage_id = PIPELINE_STAGES.get(stage_name, "lead")
+    dealname = _deal_name(prospect_name)
 
-    # Search for existing deal associated with this contact
-    data = await _make_api_request(
-        f"/crm/v3/objects/contacts/{contact_id}/associations/deals",
-        method="GET",
+    if existing is None:
+        # Search for existing deal associated with this contact
+        data = await _make_api_request(
+            f"/crm/v3/objects/contacts/{contact_id}/associations/deals",
+            method="GET",
+        )
+        existing_deals = data.get("results", [])
+        existing = {"id": existing_deals[0]["id"]} if existing_deals else {}
+
+    if existing:
+        deal_id = existing["id"]
+        if existing.get("dealstage") == stage_id and existing.get("dealname") == dealname:
+            return deal_id
+        try:
+            await _make_api_request(
+                f"/crm/v3/objects/deals/{deal_id}",
+                method="PATCH",
+                json_data={
+                    "properties": {
+                        "dealstage": stage_id,
+                        "dealname": dealname,
+                    }
+                },
+            )
+            return deal_id
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code != 404 or "dealstage" not in existing:
+                raise
+            # Indexed deal was deleted in HubSpot — look up again
+            return await _ensure_deal(contact_id, stage_name, prospect_name)
+
+    deal = await _make_api_request(
+        "/crm/v3/objects/deals",
+        method="POST",
+        json_data={
+            "properties": {
+                "dealname": dealname,
+                "dealstage": stage_id,
+                "pipeline": pipeline_id,
+            },
+        },
     )
-    existing_deals = data.get("results", [])
+    deal_id = deal["id"]
+    # Associate deal with contact
+    try:
+        await _make_api_request(
+            f"/crm/v3/objects/deals/{deal_id}/associations/contacts/{contact_id}/deal_to_contact",
+            method="PUT",
+        )
+    except httpx.HTTPStatusError:
+        pass
+    return deal_id
+
+
+async def _sync_prospect_row(
+    prospect: Dict[str, str],
+    contact_id: Optional[str] = None,
+    deal_index: Optional[Dict[str, Dict[str, str]]] = None,
+) -> tuple[str, str, Dict[str, Optional[str]]]:
+    """Sync one parsed prospect row: contact, then company, then deal.
+
+    Returns (action, stage, ids) where action is "created" or "updated" and
+    ids holds the HubSpot contact_id/company_id/deal_id plus the deal's
+    stage and name as written.
+    """
+    name = prospect.get("Name", "Unknown")
+    properties = _prospect_to_hubspot_properties(prospect)
+    result = await _create_or_update_contact(properties, contact_id)
+    action = result.get("_action", "synced")
+    contact_id = result["id"]
+
+    # Company association
+    company_id = await _ensure_company_association(contact_id, prospect.get("Company", ""))
+
+    # Deal/pipeline
+    stage = _prospect_stage(prospect)
+    existing = (deal_index or {}).get(contact_id)
+    deal_id = await _ensure_deal(contact_id, stage, name, existing)
+    return action, stage, {
+        "contact_id": contact_id,
+        "company_id": company_id,
+        "deal_id": deal_id,
+        "deal_stage": PIPELINE_STAGES.get(stage, "lead"),
+        "deal_name": _deal_name(name),
+    }
+
+
+async def _run_bounded(items: List[Any], worker, concurrency: int) -> List[Any]:
+    """Run `worker` over items with at most `concurrency` calls in flight.
+
+    Results come back in input order. Exceptions are returned in place rather
+    than raised, so one failing item doesn't cancel the rest.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(item):
+        async with semaphore:
+            return await worker(item)
+
+    return await asyncio.gather(*(run(item) for item in items), return_exceptions=True)
+
+
+# ─── Batch Sync ──────────────────────────────────────────────────────────────
+
+def _chunks(items: List[Any], size: int = BATCH_SIZE):
+    """Yield successive slices of at most `size` items."""
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+async def _batch_search_by_values(
+    object_type: str, property_name: str, values: List[str], properties: List[str]
+) -> Dict[str, Dict]:
+    """Find objects whose `property_name` is any of `values` (max BATCH_SIZE).
+
+    One search call with an IN filter instead of one search per value.
+    Returns {lowercased value: object}; HubSpot matches IN values case-insensitively.
+    """
+    unique = sorted({v.lower() for v in values if v})
+    found: Dict[str, Dict] = {}
+    if not unique:
+        return found
+    after = None
+    while True:
+        body: Dict[str, Any] = {
+            "filterGroups": [{
+                "filters": [{
+                    "propertyName": property_name,
+                    "operator": "IN",
+                    "values": unique,
+                }]
+            }],
+            "properties": properties,
+            "limit": 100,
+        }
+        if after:
+            body["after"] = after
+        data = await _make_api_request(
+            f"/crm/v3/objects/{object_type}/search", method="POST", json_data=body
+        )
+        for obj in data.get("results", []):
+            value = (obj.get("properties", {}).get(property_name) or "").lower()
+            if value:
+                found.setdefault(value, obj)
+        after = data.get("paging", {}).get("next", {}).get("after")
+        if not after:
+            return found
+
+
+async def _batch_write(object_type: str, action: str, inputs: List[Dict]) -> List[Dict]:
+    """POST inputs to /crm/v3/objects/{type}/batch/{create|update} in chunks of 100."""
+    results: List[Dict] = []
+    for chunk in _chunks(inputs):
+        data = await _make_api_request(
+            f"/crm/v3/objects/{object_type}/batch/{action}",
+            method="POST",
+            json_data={"inputs": chunk},
+        )
+        results.extend(data.get("results", []))
+    return results
+
 
-    if existing_deals:
-        deal_id = existing_deals[0]["id"]
+async def _batch_associate(from_type: str, to_type: str, pairs: List[tuple[str, str]]) -> None:
+    """Create default associations for (from_id, to_id) pairs, 100 per call."""
+    inputs = [{"from": {"id": a}, "to": {"id": b}} for a, b in dict.fromkeys(pairs)]
+    for chunk in _chunks(inputs):
         await _make_api_request(
-            f"/crm/v3/objects/deals/{deal_id}",
-            method="PATCH",
-            json_data={
-                "properties": {
-                    "dealstage": stage_id,
-                    "dealname": f"LinkedIn Pipeline - {prospect_name}",
-                }
-            },
+            f"/crm/v4/associations/{from_type}/{to_type}/batch/associate/default",
+            method="POST",
+            json_data={"inputs": chunk},
         )
-        return deal_id
-    else:
-        deal = await _make_api_request(
-            "/crm/v3/objects/deals",
+
+
+async def _batch_resolve_companies(company_names: List[str]) -> Dict[str, str]:
+    """Map company names to HubSpot IDs, creating missing companies in bulk.
+
+    Names already in the company cache cost nothing; the rest are looked up
+    with IN-filter searches and added to the cache.
+    Returns {lowercased name: company_id}.
+    """
+    cache = _get_company_cache()
+    names = {n.strip().lower(): n.strip() for n in company_names if n and n.strip() != "-"}
+    company_ids: Dict[str, str] = {}
+    for key, name in names.items():
+        cached = cache.get(name)
+        if cached:
+            company_ids[key] = cached
+
+    unresolved = [key for key in names if key not in company_ids]
+    for chunk in _chunks(unresolved):
+        found = await _batch_search_by_values("companies", "name", chunk, ["name"])
+        company_ids.update({key: obj["id"] for key, obj in found.items()})
+
+    missing = [{"properties": {"name": names[key]}} for key in names if key not in company_ids]
+    for company in await _batch_write("companies", "create", missing):
+        name = (company.get("properties", {}).get("name") or "").lower()
+        company_ids[name] = company["id"]
+
+    for key in unresolved:
+        if key in company_ids:
+            cache.put(names[key], company_ids[key])
+    return company_ids
+
+
+def _is_stale_id_error(error: httpx.HTTPStatusError) -> bool:
+    """A batch update naming a deleted record fails as a whole: 404, or 400 with an object-not-found error."""
+    status = error.response.status_code
+    return status == 404 or (status == 400 and "not found" in error.response.text.lower())
+
+
+async def _batch_sync_chunk(
+    prospects: List[Dict[str, str]],
+    company_ids: Dict[str, str],
+    known_ids: Optional[List[Optional[str]]] = None,
+    deal_index: Optional[Dict[str, Dict[str, str]]] = None,
+) -> List[Any]:
+    """Sync up to BATCH_SIZE prospects with batch endpoints.
+
+    Same dedup rules as _create_or_update_contact (linkedin_profile, then
+    email) and the same company/deal handling, but with one call per step
+    instead of one per prospect. Contacts with an ID in known_ids skip the
+    lookup; contacts in deal_index skip the deal lookup, and their deal is
+    only updated if its stage or name changed. Rows without a LinkedIn URL
+    can't be deduped or matched back to created contacts; they come back as
+    ("skipped", stage, {}) without touching HubSpot.
+    Returns (action, stage, ids) or an exception per row.
+    """
+    today = today_utc()
+    props_list = [_prospect_to_hubspot_properties(p, today) for p in prospects]
+    existing_ids: List[Optional[str]] = list(known_ids or [None] * len(prospects))
+
+    has_url = [props.get("linkedin_profile", "") not in ("", "TBD") for props in props_list]
+    if not all(has_url):
+        keep = [i for i, ok in enumerate(has_url) if ok]
+        synced = iter(await _batch_sync_chunk(
+            [prospects[i] for i in keep], company_ids, [existing_ids[i] for i in keep], deal_index
+        ) if keep else [])
+        return [
+            next(synced) if ok else ("skipped", _prospect_stage(prospect), {})
+            for prospect, ok in zip(prospects, has_url)
+        ]
+
+    # 1. Dedupe: one search by LinkedIn URL, one batch read by email for the rest
+    by_url = await _batch_search_by_values(
+        "contacts", "linkedin_profile",
+        [p.get("linkedin_profile", "") for p, cid in zip(props_list, existing_ids) if not cid],
+        ["linkedin_profile", "email"],
+    )
+    existing_ids = [
+        cid or (by_url.get(p.get("linkedin_profile", "").lower()) or {}).get("id")
+        for p, cid in zip(props_list, existing_ids)
+    ]
+    emails = [
+        p["email"].lower() for p, cid in zip(props_list, existing_ids)
+        if not cid and p.get("email")
+    ]
+    if emails:
+        data = await _make_api_request(
+            "/crm/v3/objects/contacts/batch/read",
             method="POST",
             json_data={
-                "properties": {
-                    "dealname": f"LinkedIn Pipeline - {prospect_name}",
-                    "dealstage": stage_id,
-                    "pipeline": pipeline_id,
-                },
+                "idProperty": "email",
+                "inputs": [{"id": e} for e in dict.fromkeys(emails)],
+                "properties": ["email", "linkedin_profile"],
             },
         )
-        deal_id = deal["id"]
-        # Associate deal with contact
+        by_email = {
+            (c.get("properties", {}).get("email") or "").lower(): c["id"]
+            for c in data.get("results", [])
+        }
+        existing_ids = [
+            cid or by_email.get(p.get("email", "").lower())
+            for p, cid in zip(props_list, existing_ids)
+        ]
+
+    # 2. Write: batch update existing contacts, batch create new ones
+    updates = {cid: props for props, cid in zip(props_list, existing_ids) if cid}
+    creates = {
+        props["linkedin_profile"].lower(): props
+        for props, cid in zip(props_list, existing_ids) if not cid
+    }
+    await _batch_write(
+        "contacts", "update",
+        [{"id": cid, "properties": props} for cid, props in updates.items()],
+    )
+    created = await _batch_write(
+        "contacts", "create", [{"properties": props} for props in creates.values()]
+    )
+    created_ids = {
+        (c.get("properties", {}).get("linkedin_profile") or "").lower(): c["id"] for c in created
+    }
+
+    contact_ids: List[Optional[str]] = []
+    actions: List[str] = []
+    for props, cid in zip(props_list, existing_ids):
+        if cid:
+            contact_ids.append(cid)
+            actions.append("updated")
+        else:
+            contact_ids.append(created_ids.get(props["linkedin_profile"].lower()))
+            actions.append("created")
+
+    # 3. Company associations (skipping ones already made on earlier runs)
+    cache = _get_company_cache()
+    company_pairs = []
+    for prospect, cid in zip(prospects, contact_ids):
+        company_id = company_ids.get(prospect.get("Company", "").strip().lower())
+        if cid and company_id and not cache.has_association(cid, company_id):
+            company_pairs.append((cid, company_id))
+    try:
+        await _batch_associate("contacts", "companies", company_pairs)
+    except httpx.HTTPStatusError:
+        # Likely a stale cached company; drop them so the next run re-resolves
+        for _, company_id in company_pairs:
+            cache.invalidate(company_id)
+        raise
+    for cid, company_id in company_pairs:
+        cache.add_association(cid, company_id)
+
+    # 4. Deals: index lookups only for contacts not already indexed, then
+    #    batch update (only where stage/name changed) and batch create
+    stages = [_prospect_stage(p) for p in prospects]
+
+    deal_index = dict(deal_index or {})
+    created_contacts = set(created_ids.values())
+    unindexed = [
+        cid for cid in dict.fromkeys(contact_ids)
+        if cid and cid not in deal_index and cid not in created_contacts
+    ]
+    if unindexed:
+        deal_index.update(await _build_deal_index(unindexed))
+
+    pipeline_id = os.environ.get("HUBSPOT_PIPELINE_ID", "default")
+    deal_updates: Dict[str, Dict] = {}
+    deal_creates: Dict[str, Dict] = {}
+    for prospect, cid, stage in zip(prospects, contact_ids, stages):
+        if not cid:
+            continue
+        properties = {
+            "dealstage": PIPELINE_STAGES.get(stage, "lead"),
+            "dealname": _deal_name(prospect.get("Name", "Unknown")),
+        }
+        existing = deal_index.get(cid)
+        if existing:
+            if (existing.get("dealstage"), existing.get("dealname")) != (
+                properties["dealstage"], properties["dealname"]
+            ):
+                deal_updates[existing["id"]] = {"id": existing["id"], "properties": properties}
+        else:
+            deal_creates[cid] = {
+                "properties": {**properties, "pipeline": pipeline_id},
+                "associations": [{
+                    "to": {"id": cid},
+                    "types": [{
+                        "associationCategory": "HUBSPOT_DEFINED",
+                        "associationTypeId": DEAL_TO_CONTACT_TYPE_ID,
+                    }],
+                }],
+            }
+    await _batch_write("deals", "update", list(deal_updates.values()))
+    created_deals = await _batch_write("deals", "create", list(deal_creates.values()))
+    deal_by_name: Dict[str, Optional[str]] = {}
+    for deal in created_deals:
+        dealname = deal.get("properties", {}).get("dealname", "")
+        # Same-named prospects make the mapping ambiguous; leave those unrecorded
+        deal_by_name[dealname] = None if dealname in deal_by_name else deal["id"]
+
+    outcomes: List[Any] = []
+    for prospect, props, cid, action, stage in zip(prospects, props_list, contact_ids, actions, stages):
+        if cid:
+            dealname = _deal_name(prospect.get("Name", "Unknown"))
+            outcomes.append((action, stage, {
+                "contact_id": cid,
+                "company_id": company_ids.get(prospect.get("Company", "").strip().lower()),
+                "deal_id": (deal_index.get(cid) or {}).get("id") or deal_by_name.get(dealname),
+                "deal_stage": PIPELINE_STAGES.get(stage, "lead"),
+                "deal_name": dealname,
+            }))
+        else:
+            outcomes.append(ValueError(
+                f"batch create returned no contact for {props.get('linkedin_profile', '?')}"
+            ))
+    return outcomes
+
+
+async def _batch_sync_prospects(
+    prospects: List[Dict[str, str]],
+    concurrency: int = 1,
+    known_ids: Optional[List[Optional[str]]] = None,
+    deal_index: Optional[Dict[str, Dict[str, str]]] = None,
+) -> List[Any]:
+    """Sync prospects through HubSpot batch endpoints, 100 rows per chunk.
+
+    Companies are resolved once up front so parallel chunks can't create
+    duplicates. A chunk whose batch update hits a stored contact or deal ID
+    that no longer exists is redone once through the lookups, like
+    _create_or_update_contact does per row. A chunk that still fails marks
+    all of its rows with that exception.
+    Returns (action, stage, ids) or an exception per prospect, in input order.
+    """
+    if not prospects:
+        return []
+    known_ids = list(known_ids or [None] * len(prospects))
+    company_ids = await _batch_resolve_companies([p.get("Company", "") for p in prospects])
+    chunks = [
+        (prospects[i:i + BATCH_SIZE], known_ids[i:i + BATCH_SIZE])
+        for i in range(0, len(prospects), BATCH_SIZE)
+    ]
+
+    async def sync_chunk(chunk: tuple) -> List[Any]:
+        rows, ids = chunk
         try:
-            await _make_api_request(
-                f"/crm/v3/objects/deals/{deal_id}/associations/contacts/{contact_id}/deal_to_contact",
-                method="PUT",
-            )
-        except httpx.HTTPStatusError:
-            pass
-        return deal_id
+            return await _batch_sync_chunk(rows, company_ids, ids, deal_index)
+        except httpx.HTTPStatusError as e:
+            if not _is_stale_id_error(e) or not (any(ids) or deal_index):
+                raise
+            # A stored ID was deleted in HubSpot, failing the whole batch — look everything up again
+            return await _batch_sync_chunk(rows, company_ids)
+
+    chunk_outcomes = await _run_bounded(chunks, sync_chunk, concurrency)
+    outcomes: List[Any] = []
+    for (chunk, _), result in zip(chunks, chunk_outcomes):
+        if isinstance(result, BaseException):
+            outcomes.extend([result] * len(chunk))
+        else:
+            outcomes.extend(result)
+    return outcomes
+
+
+# ─── Delta Sync ──────────────────────────────────────────────────────────────
+
+def _prospect_sync_hash(prospect: Dict[str, str]) -> str:
+    """Hash of everything a row pushes to HubSpot (contact props, company, stage)."""
+    return row_hash({
+        "properties": _prospect_to_hubspot_properties(prospect),
+        "company": prospect.get("Company", "").strip(),
+        "stage": _prospect_stage(prospect),
+        "name": prospect.get("Name", "").strip(),
+    })
+
+
+async def _sync_prospects(
+    prospects: List[Dict[str, str]],
+    batch: bool = True,
+    concurrency: int = 1,
+    full: bool = False,
+) -> List[Any]:
+    """Sync prospects (all with LinkedIn URLs), skipping rows unchanged since the last sync.
+
+    Reads and updates the local sync-state store: rows whose content hash
+    matches the stored one cost zero API calls and come back as
+    ("unchanged", stage, ids); changed rows for known contacts skip the ID
+    lookup. full=True re-sends every row and ignores stored IDs.
+    Returns (action, stage, ids) or an exception per prospect, in input order.
+    """
+    state = SyncStateStore(CRM_SYNC_STATE_PATH)
+    company_cache = _get_company_cache()
+    hashes = [_prospect_sync_hash(p) for p in prospects]
+    outcomes: List[Any] = [None] * len(prospects)
+
+    pending: List[int] = []
+    for i, (prospect, content_hash) in enumerate(zip(prospects, hashes)):
+        url = prospect.get("Profile URL", "")
+        if not full and state.is_current(url, content_hash):
+            entry = state.get(url) or {}
+            ids = {k: entry.get(k) for k in ("contact_id", "company_id", "deal_id")}
+            outcomes[i] = ("unchanged", _prospect_stage(prospect), ids)
+        else:
+            pending.append(i)
+
+    to_sync = [prospects[i] for i in pending]
+    if to_sync:
+        await _prewarm_company_cache()
+    entries = [{} if full else (state.get(p.get("Profile URL", "")) or {}) for p in to_sync]
+    known_ids = [entry.get("contact_id") for entry in entries]
+
+    # Deal index for this run: persisted deal IDs/stages first, one batch
+    # associations read for known contacts without a stored deal
+    deal_index: Dict[str, Dict[str, str]] = {}
+    for entry in entries:
+        if entry.get("contact_id") and entry.get("deal_id"):
+            deal_index[entry["contact_id"]] = {
+                "id": entry["deal_id"],
+                "dealstage": entry.get("deal_stage", ""),
+                "dealname": entry.get("deal_name", ""),
+            }
+    unindexed = [cid for cid in known_ids if cid and cid not in deal_index]
+    if unindexed:
+        deal_index.update(await _build_deal_index(unindexed))
+
+    if batch:
+        results = await _batch_sync_prospects(to_sync, concurrency, known_ids, deal_index)
+    else:
+        results = await _run_bounded(
+            list(zip(to_sync, known_ids)),
+            lambda item: _sync_prospect_row(item[0], item[1], deal_index),
+            concurrency,
+        )
+
+    for i, result in zip(pending, results):
+        outcomes[i] = result
+        url = prospects[i].get("Profile URL", "")
+        if not isinstance(result, BaseException):
+            if result[0] != "skipped":
+                state.record(url, hashes[i], **result[2])
+        elif isinstance(result, httpx.HTTPStatusError) and _is_stale_id_error(result):
+            state.forget(url)  # Its stored IDs may point at deleted records: resolve afresh next run
+    state.save()
+    company_cache.save()
+    return outcomes
 
 
 # ─── Pydantic Input Models ──────────────────────────────────────────────────
@@ -587,6 +1400,26 @@ class SyncProspectInput(BaseModel):
     notes: str = Field(default="", description="Additional notes about the prospect")
 
 
+class SyncAllInput(BaseModel):
+    """Input for batch-syncing every prospect in icp-prospects.md."""
+    model_config = ConfigDict(extra="forbid")
+
+    concurrency: int = Field(
+        default=SYNC_CONCURRENCY,
+        description="Prospects synced in parallel (1 = sequential). Each prospect still runs contact -> company -> deal in order.",
+        ge=1,
+        le=50,
+    )
+    batch: bool = Field(
+        default=True,
+        description="Use HubSpot batch endpoints (a few calls per 100 prospects). Set false to sync one prospect at a time.",
+    )
+    full: bool = Field(
+        default=False,
+        description="Re-send every row, ignoring the local sync state (rows unchanged since the last sync are skipped by default).",
+    )
+
+
 class LogActivityInput(BaseModel):
     """Input for logging a LinkedIn activity as a HubSpot note."""
     model_config = ConfigDict(str_strip_whitespace=True, extra="forbid")
@@ -717,7 +1550,7 @@ async def crm_sync_prospect(params: SyncProspectInput) -> str:
             return f"Skipped {params.name} — LinkedIn URL is TBD"
 
         firstname, lastname = _split_name(params.name)
-        touch_date = _parse_touch_date(params.last_touch)
+        touch_date = hubspot_date_ms(params.last_touch)
 
         properties: Dict[str, str] = {
             "firstname": firstname,
@@ -742,6 +1575,7 @@ async def crm_sync_prospect(params: SyncProspectInput) -> str:
 
         # Associate company
         company_id = await _ensure_company_association(contact_id, params.company)
+        _get_company_cache().save()
 
         # Create/update deal
         stage = _determine_pipeline_stage(
@@ -775,34 +1609,55 @@ async def crm_sync_prospect(params: SyncProspectInput) -> str:
         "openWorldHint": True,
     },
 )
-async def crm_sync_all() -> str:
+async def crm_sync_all(params: Optional[SyncAllInput] = None) -> str:
     """Batch sync all prospects from icp-prospects.md to HubSpot CRM.
 
     Reads the prospects table from icp-prospects.md, then creates or updates
-    each contact in HubSpot. Skips prospects with TBD profile URLs.
+    each contact in HubSpot. Skips prospects with TBD profile URLs, and rows
+    whose content hasn't changed since the last sync (see sync_state.py).
     Uses linkedin_profile as dedup key — safe to run repeatedly.
 
+    By default writes go through HubSpot batch endpoints (100 records per
+    call). With batch=False, prospects are synced by a bounded worker pool;
+    either way the shared rate limiter keeps the combined request rate within
+    HubSpot's 100 req/10s budget.
+
     Triggered automatically after Afternoon Block and Evening Block.
 
+    Args:
+        params (SyncAllInput): Optional configuration:
+            - concurrency (int): Prospects (or batch chunks) synced in parallel (default: 8)
+            - batch (bool): Use batch endpoints (default: true)
+            - full (bool): Re-send unchanged rows too (default: false)
+
     Returns:
         str: Markdown summary with counts (created, updated, skipped, errors).
     """
     try:
+        params = params or SyncAllInput()
+        throttle_before = rate_limiter.stats()
+
         if not ICP_PROSPECTS_PATH.exists():
             return f"Error: icp-prospects.md not found at {ICP_PROSPECTS_PATH}"
 
-        content = ICP_PROSPECTS_PATH.read_text(encoding="utf-8")
-        prospects = _parse_prospects_table(content)
+        prospects = _load_prospects_table().rows
 
         if not prospects:
             return "Error: No prospects found in icp-prospects.md table"
 
         created = 0
         updated = 0
+        unchanged = 0
         skipped = 0
         errors = []
         results_detail = []
 
+        syncable = [p for p in prospects if p.get("Profile URL", "TBD") not in ("", "TBD")]
+        outcomes = iter(await _sync_prospects(
+            syncable, batch=params.batch, concurrency=params.concurrency, full=params.full
+        ))
+
+        # Tally in file order so the details read the same as a sequential run
         for prospect in prospects:
             name = prospect.get("Name", "Unknown")
             url = prospect.get("Profile URL", "TBD")
@@ -812,35 +1667,20 @@ async def crm_sync_all() -> str:
                 results_detail.append(f"- {name}: skipped (no URL)")
                 continue
 
-            try:
-                properties = _prospect_to_hubspot_properties(prospect)
-                result = await _create_or_update_contact(properties)
-                action = result.get("_action", "synced")
-                contact_id = result["id"]
-
-                if action == "created":
-                    created += 1
-                else:
-                    updated += 1
-
-                # Company association
-                await _ensure_company_association(
-                    contact_id, prospect.get("Company", "")
-                )
-
-                # Deal/pipeline
-                touches = int(prospect.get("Touches", "0").replace("+", "") or "0")
-                stage = _determine_pipeline_stage(
-                    touches,
-                    prospect.get("Connection Status", "none"),
-                    prospect.get("Touch History", ""),
-                )
-                await _ensure_deal(contact_id, stage, name)
-
-                results_detail.append(f"- {name}: {action} (stage: {stage})")
+            outcome = next(outcomes)
+            if isinstance(outcome, BaseException):
+                errors.append(f"- {name}: {_handle_api_error(outcome)}")
+                continue
 
-            except Exception as e:
-                errors.append(f"- {name}: {_handle_api_error(e)}")
+            action, stage, _ = outcome
+            if action == "unchanged":
+                unchanged += 1
+                continue
+            if action == "created":
+                created += 1
+            else:
+                updated += 1
+            results_detail.append(f"- {name}: {action} (stage: {stage})")
 
         # Build summary
         total = len(prospects)
@@ -850,9 +1690,15 @@ async def crm_sync_all() -> str:
             f"**Total:** {total} prospects processed",
             f"- Created: {created}",
             f"- Updated: {updated}",
+            f"- Unchanged: {unchanged} (no changes since last sync)",
             f"- Skipped: {skipped} (no LinkedIn URL)",
             f"- Errors: {len(errors)}",
         ]
+        throttle = rate_limiter.stats()
+        throttled_s = throttle["throttled_seconds"] - throttle_before["throttled_seconds"]
+        retries = throttle["retries"] - throttle_before["retries"]
+        if throttled_s or retries:
+            lines.append(f"- Throttled: {throttled_s:.1f}s total request wait on rate limits ({retries} retries)")
 
         if results_detail:
             lines.extend(["", "### Details", *results_detail[:30]])
@@ -1038,6 +1884,91 @@ async def crm_get_contact(params: GetContactInput) -> str:
         return _handle_api_error(e)
 
 
+class PipelineSource(str, Enum):
+    """Where crm_get_pipeline takes stages from."""
+    HUBSPOT = "hubspot"  # recompute from every HubSpot contact with a linkedin_profile
+    TABLE = "table"  # icp-prospects.md rows with a Profile URL, no API calls
+    SYNC_STATE = "sync_state"  # deal stages as last written by the crm_sync_* tools
+
+
+class PipelineInput(BaseModel):
+    """Input for the pipeline summary."""
+    model_config = ConfigDict(str_strip_whitespace=True, extra="forbid")
+
+    source: PipelineSource = Field(
+        default=PipelineSource.HUBSPOT,
+        description=(
+            "'hubspot' (page through HubSpot contacts), 'table' (icp-prospects.md, instant) "
+            "or 'sync_state' (deal stages recorded by the last syncs, instant)"
+        ),
+    )
+    compare: bool = Field(
+        default=False,
+        description=(
+            "Also compute the other side and show local vs HubSpot counts per stage "
+            "(local = icp-prospects.md when source is 'hubspot')"
+        ),
+    )
+
+
+def _local_stage_counts(source: PipelineSource) -> Dict[str, int]:
+    """Stage histogram from icp-prospects.md or the sync-state file, without API calls."""
+    counts = {stage: 0 for stage in PIPELINE_STAGES}
+    if source == PipelineSource.SYNC_STATE:
+        stage_names = {stage_id: name for name, stage_id in PIPELINE_STAGES.items()}
+        for entry in SyncStateStore(CRM_SYNC_STATE_PATH).rows.values():
+            name = stage_names.get(entry.get("deal_stage", ""))
+            if name:
+                counts[name] += 1
+        return counts
+    if not ICP_PROSPECTS_PATH.exists():
+        raise FileNotFoundError(f"icp-prospects.md not found at {ICP_PROSPECTS_PATH}")
+    # Only rows with a Profile URL are ever synced, so only those are comparable with HubSpot
+    for stage, count in _prospects_snapshot(_load_prospects_table()).stage_counts(with_url_only=True).items():
+        counts[stage] = counts.get(stage, 0) + count
+    return counts
+
+
+async def _hubspot_stage_counts() -> Tuple[Dict[str, int], int]:
+    """Stage histogram over every HubSpot contact with a linkedin_profile; (counts, contacts).
+
+    Pages by ascending hs_object_id (id > last seen) rather than the search
+    `after` cursor, which HubSpot stops at 10,000 results, and fetches only
+    the three properties the stage depends on.
+    """
+    counts = {stage: 0 for stage in PIPELINE_STAGES}
+    total = 0
+    last_id = "0"
+    while True:
+        data = await _make_api_request(
+            "/crm/v3/objects/contacts/search",
+            method="POST",
+            json_data={
+                "filterGroups": [{
+                    "filters": [
+                        {"propertyName": "linkedin_profile", "operator": "HAS_PROPERTY"},
+                        {"propertyName": "hs_object_id", "operator": "GT", "value": last_id},
+                    ]
+                }],
+                "sorts": [{"propertyName": "hs_object_id", "direction": "ASCENDING"}],
+                "properties": ["touch_count", "linkedin_connection_status", "touch_history"],
+                "limit": 200,
+            },
+        )
+        results = data.get("results", [])
+        for contact in results:
+            p = contact.get("properties", {})
+            touches = int(p.get("touch_count", "0") or "0")
+            conn = p.get("linkedin_connection_status", "none") or "none"
+            hist = p.get("touch_history", "") or ""
+            stage = _determine_pipeline_stage(touches, conn, hist)
+            counts[stage] = counts.get(stage, 0) + 1
+        total += len(results)
+        if len(results) < 200:
+            return counts, total
+        last_id = results[-1]["id"]
+
+
 @mcp.tool(
     name="crm_get_pipeline",
     annotations={
@@ -1048,66 +1979,55 @@ async def crm_get_contact(params: GetContactInput) -> str:
         "openWorldHint": True,
     },
 )
-async def crm_get_pipeline() -> str:
+async def crm_get_pipeline(params: Optional[PipelineInput] = None) -> str:
     """Get a pipeline summary showing contact counts per stage.
 
-    Reads all contacts with a linkedin_profile property and groups them
-    by their calculated pipeline stage. Provides a quick overview of the
-    LinkedIn prospect funnel.
+    With source 'hubspot' (default), reads every contact with a
+    linkedin_profile property and groups them by calculated pipeline stage.
+    'table' and 'sync_state' compute the same histogram locally in
+    milliseconds. With compare, both sides are shown with the per-stage
+    difference, which flags prospects that still need a sync.
+
+    Args:
+        params (PipelineInput): Optional configuration:
+            - source (str): 'hubspot' (default), 'table' or 'sync_state'
+            - compare (bool): Show local vs HubSpot counts side by side
 
     Returns:
         str: Markdown table with stage names and counts, plus total.
     """
     try:
-        # Get all contacts with linkedin_profile set
-        all_contacts = []
-        after = None
-        max_pages = 10  # Safety limit
-
-        for _ in range(max_pages):
-            params: Dict[str, Any] = {"limit": 100}
-            if after:
-                params["after"] = after
-
-            data = await _make_api_request(
-                "/crm/v3/objects/contacts/search",
-                method="POST",
-                json_data={
-                    "filterGroups": [{
-                        "filters": [{
-                            "propertyName": "linkedin_profile",
-                            "operator": "HAS_PROPERTY",
-                        }]
-                    }],
-                    "properties": [
-                        "firstname", "lastname", "touch_count",
-                        "linkedin_connection_status", "touch_history",
-                        "lead_classification",
-                    ],
-                    "limit": 100,
-                    "after": after or 0,
-                },
-            )
-            results = data.get("results", [])
-            all_contacts.extend(results)
-
-            paging = data.get("paging", {})
-            next_page = paging.get("next", {})
-            after = next_page.get("after")
-            if not after:
-                break
-
-        # Count by stage
-        stage_counts: Dict[str, int] = {stage: 0 for stage in PIPELINE_STAGES}
-        for contact in all_contacts:
-            p = contact.get("properties", {})
-            touches = int(p.get("touch_count", "0") or "0")
-            conn = p.get("linkedin_connection_status", "none") or "none"
-            hist = p.get("touch_history", "") or ""
-            stage = _determine_pipeline_stage(touches, conn, hist)
-            stage_counts[stage] = stage_counts.get(stage, 0) + 1
+        params = params or PipelineInput()
+        remote: Optional[Dict[str, int]] = None
+        local: Optional[Dict[str, int]] = None
+        local_source = PipelineSource.TABLE if params.source == PipelineSource.HUBSPOT else params.source
+        if params.source == PipelineSource.HUBSPOT or params.compare:
+            remote, _ = await _hubspot_stage_counts()
+        if params.source != PipelineSource.HUBSPOT or params.compare:
+            local = _local_stage_counts(local_source)
+
+        updated = f"_Last updated: {datetime.now().strftime('%d %b %Y %H:%M')}_"
+        if params.compare:
+            lines = [
+                "## LinkedIn Pipeline: Local vs HubSpot",
+                "",
+                f"| Stage | Local ({local_source.value}) | HubSpot | Diff |",
+                "|-------|-------|---------|------|",
+            ]
+            for stage_name in PIPELINE_STAGES:
+                diff = local[stage_name] - remote[stage_name]
+                lines.append(f"| {stage_name} | {local[stage_name]} | {remote[stage_name]} | {diff:+d} |")
+            local_total, remote_total = sum(local.values()), sum(remote.values())
+            lines.extend([
+                f"| **Total** | **{local_total}** | **{remote_total}** | **{local_total - remote_total:+d}** |",
+                "",
+                "Diff = local - HubSpot. Non-zero rows usually mean stage changes not yet synced.",
+                "",
+                updated,
+            ])
+            return "\n".join(lines)
 
-        # Build table
+        stage_counts = remote if remote is not None else local
         lines = [
             "## LinkedIn Pipeline Summary",
             "",
@@ -1120,11 +2040,10 @@ async def crm_get_pipeline() -> str:
             total += count
             bar = "#" * min(count, 20)
             lines.append(f"| {stage_name} | {count} {bar} |")
-        lines.extend([
-            f"| **Total** | **{total}** |",
-            "",
-            f"_Last updated: {datetime.now().strftime('%d %b %Y %H:%M')}_",
-        ])
+        lines.extend([f"| **Total** | **{total}** |", ""])
+        if params.source != PipelineSource.HUBSPOT:
+            lines.append(f"_Source: {params.source.value}_")
+        lines.append(updated)
 
         return "\n".join(lines)
 
@@ -1200,81 +2119,63 @@ async def crm_sync_photos(params: SyncPhotosInput) -> str:
 
 # ─── Email Enrichment Helpers ────────────────────────────────────────────────
 
-def _parse_touch_date_to_datetime(date_str: str) -> Optional[datetime]:
-    """Parse DDMon date string (e.g., '23Jan', '01Feb') into a datetime object."""
-    if not date_str or date_str.strip() == "-":
-        return None
-    date_str = date_str.strip()
-    match = re.match(r"(\d{1,2})([A-Za-z]{3})", date_str)
-    if not match:
-        return None
-    day = int(match.group(1))
-    month_str = match.group(2)
-    try:
-        month = datetime.strptime(month_str, "%b").month
-    except ValueError:
-        return None
-    year = datetime.now().year
-    try:
-        dt = datetime(year, month, day, tzinfo=timezone.utc)
-        if dt > datetime.now(timezone.utc):
-            dt = dt.replace(year=year - 1)
-        return dt
-    except ValueError:
-        return None
+def _prospects_snapshot(table: ProspectsTable) -> ProspectsSnapshot:
+    """Typed columns (dates, touches, statuses, stages) of a loaded table, built once per file version."""
+    return snapshot_for(table, _determine_pipeline_stage, PIPELINE_STAGES)
 
 
 def _filter_email_eligible_prospects(
-    prospects: List[Dict[str, str]], min_days: int = 7
-) -> List[Dict[str, str]]:
-    """Filter prospects: pending connection > min_days ago, no email yet."""
-    eligible = []
-    now = datetime.now(timezone.utc)
-    for p in prospects:
-        conn_status = p.get("Connection Status", "").strip().lower()
-        email = p.get("Email", "-").strip()
-        touch_history = p.get("Touch History", "").strip()
-        last_touch_str = p.get("Last Touch", "-").strip()
-
-        if conn_status != "pending":
-            continue
-        if email and email != "-":
-            continue
-        if "connect_sent" not in touch_history:
-            continue
+    table: ProspectsTable, min_days: int = 7
+) -> List[Tuple[ProspectRow, int]]:
+    """Filter prospects: pending connection > min_days ago, no email yet.
 
-        last_touch_dt = _parse_touch_date_to_datetime(last_touch_str)
-        if not last_touch_dt:
-            continue
-        days_since = (now - last_touch_dt).days
-        if days_since < min_days:
-            continue
+    Runs against the table's compiled snapshot rather than re-parsing each row.
+    Returns (row, days since last touch) pairs; the rows belong to the cached
+    table and are left untouched.
+    """
+    return [
+        (table.rows[index], days_since)
+        for index, days_since in _prospects_snapshot(table).email_eligible(min_days)
+    ]
 
-        p["_days_since_connect"] = str(days_since)
-        eligible.append(p)
 
-    return eligible
+_domain_resolver: Optional[DomainResolver] = None
 
 
-def _extract_company_domain(prospect: Dict[str, str]) -> Optional[str]:
-    """Try to extract a company domain from prospect data."""
-    company = prospect.get("Company", "").strip()
-    notes = prospect.get("Notes", "").strip()
+def _get_domain_resolver() -> DomainResolver:
+    """Process-wide company -> verified domain resolver, cache loaded on first use."""
+    global _domain_resolver
+    if _domain_resolver is None:
+        _domain_resolver = DomainResolver(DomainCache(
+            COMPANY_DOMAIN_CACHE_PATH,
+            ttl_seconds=DOMAIN_CACHE_TTL_DAYS * 86400,
+            negative_ttl_seconds=DOMAIN_CACHE_NEGATIVE_TTL_DAYS * 86400,
+        ))
+    return _domain_resolver
 
-    # Check notes for URLs that might contain domain
-    url_match = re.search(r"https?://(?:www\.)?([a-zA-Z0-9.-]+\.[a-zA-Z]{2,})", notes)
-    if url_match:
-        return url_match.group(1)
 
-    # Derive domain from company name (basic heuristic)
-    if company and company != "-":
-        # Clean up company name for domain guess
-        clean = re.sub(r'\s*(Pte\.?\s*Ltd\.?|Ltd\.?|Inc\.?|Corp\.?|Group|Holdings?|Sdn\.?\s*Bhd\.?)\s*$', '', company, flags=re.IGNORECASE)
-        clean = re.sub(r'[^a-zA-Z0-9]', '', clean).lower()
-        if clean:
-            return f"{clean}.com"
+async def _resolve_company_domain(prospect: Dict[str, str]) -> Optional[str]:
+    """A company domain that receives mail (DNS MX), or None.
 
-    return None
+    Tries a website in Notes, then the company name against the TLDs of the
+    prospect's Location and .com. Hunter and Snov.io are skipped for
+    prospects without one, so no credit is spent on a made-up domain.
+    """
+    return await _get_domain_resolver().resolve(
+        prospect.get("Company", "").strip(),
+        notes=prospect.get("Notes", ""),
+        location=prospect.get("Location", ""),
+    )
+
+
+def _raise_for_provider_status(provider: str, response: httpx.Response) -> None:
+    """A non-200 answer (bad key, rate limit, quota, server error) is an error, not a miss.
+
+    Raising sends it down the waterfall's error path: the credit is refunded,
+    the provider's hit rate is untouched and the person isn't cached as a miss.
+    """
+    if response.status_code != 200:
+        raise ValueError(f"{provider} returned HTTP {response.status_code}")
 
 
 async def _apollo_email_lookup(
@@ -1301,8 +2202,7 @@ async def _apollo_email_lookup(
             json=payload,
             timeout=30.0,
         )
-        if response.status_code != 200:
-            return None
+        _raise_for_provider_status("Apollo", response)
         data = response.json()
 
     person = data.get("person")
@@ -1338,8 +2238,7 @@ async def _hunter_email_lookup(
             params=params,
             timeout=30.0,
         )
-        if response.status_code != 200:
-            return None
+        _raise_for_provider_status("Hunter", response)
         data = response.json()
 
     result = data.get("data", {})
@@ -1356,35 +2255,36 @@ async def _hunter_email_lookup(
     return None
 
 
-# Snov.io token cache (expires after 1 hour)
-_snov_token_cache: Dict[str, Any] = {"token": "", "expires_at": 0.0}
-
+# One token manager per Snov.io client id (tokens expire after 1 hour)
+_snov_tokens: Dict[str, TokenManager] = {}
 
-async def _snov_get_token(client_id: str, client_secret: str) -> str:
-    """Get or refresh Snov.io OAuth access token."""
-    now = time.monotonic()
-    if _snov_token_cache["token"] and _snov_token_cache["expires_at"] > now:
-        return _snov_token_cache["token"]
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"{SNOV_API_BASE}/v1/oauth/access_token",
-            json={
-                "grant_type": "client_credentials",
-                "client_id": client_id,
-                "client_secret": client_secret,
-            },
-            timeout=30.0,
+def _snov_token_manager(client_id: str, client_secret: str) -> TokenManager:
+    manager = _snov_tokens.get(client_id)
+    if manager is None:
+        async def fetch() -> Tuple[str, float]:
+            async with httpx.AsyncClient() as client:
+                response = await client.post(
+                    f"{SNOV_API_BASE}/v1/oauth/access_token",
+                    json={
+                        "grant_type": "client_credentials",
+                        "client_id": client_id,
+                        "client_secret": client_secret,
+                    },
+                    timeout=30.0,
+                )
+                if response.status_code != 200:
+                    raise ValueError(f"Snov.io auth failed: {response.status_code}")
+                data = response.json()
+            return data.get("access_token", ""), float(data.get("expires_in", 3600))
+
+        store_key = "snov:" + hashlib.sha256(client_id.encode("utf-8")).hexdigest()[:16]
+        manager = TokenManager(
+            fetch, store_key, open_token_store(OAUTH_TOKEN_STORE_PATH, OAUTH_TOKEN_SECRET),
+            refresh_margin=OAUTH_TOKEN_REFRESH_MARGIN,
         )
-        if response.status_code != 200:
-            raise ValueError(f"Snov.io auth failed: {response.status_code}")
-        data = response.json()
-
-    token = data.get("access_token", "")
-    expires_in = data.get("expires_in", 3600)
-    _snov_token_cache["token"] = token
-    _snov_token_cache["expires_at"] = now + expires_in - 60  # refresh 1 min early
-    return token
+        _snov_tokens[client_id] = manager
+    return manager
 
 
 async def _snov_email_lookup(
@@ -1395,22 +2295,26 @@ async def _snov_email_lookup(
     if not domain:
         return None
 
-    token = await _snov_get_token(client_id, client_secret)
-    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+    tokens = _snov_token_manager(client_id, client_secret)
 
-    # Step 1: Start the search
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"{SNOV_API_BASE}/v2/emails-by-domain-by-name/start",
-            headers=headers,
-            json={
-                "rows": [{"first_name": first_name, "last_name": last_name, "domain": domain}],
-            },
-            timeout=30.0,
-        )
-        if response.status_code != 200:
-            return None
-        data = response.json()
+    # Step 1: Start the search (re-authenticating once if the token was revoked)
+    for _ in range(2):
+        token = await tokens.get()
+        headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+        async with httpx.AsyncClient() as client:
+            response = await client.post(
+                f"{SNOV_API_BASE}/v2/emails-by-domain-by-name/start",
+                headers=headers,
+                json={
+                    "rows": [{"first_name": first_name, "last_name": last_name, "domain": domain}],
+                },
+                timeout=30.0,
+            )
+        if response.status_code != 401:
+            break
+        tokens.invalidate(token)
+    _raise_for_provider_status("Snov.io", response)
+    data = response.json()
 
     task_hash = data.get("data", {}).get("task_hash")
     if not task_hash:
@@ -1439,6 +2343,7 @@ async def _snov_email_lookup(
                         return {"email": email, "status": "valid", "source": "Snov.io"}
             return None
 
+    _raise_for_provider_status("Snov.io", response)  # the last poll failed
     return None
 
 
@@ -1456,8 +2361,7 @@ async def _getprospect_email_lookup(
             params={"name": full_name, "company": company_or_domain},
             timeout=30.0,
         )
-        if response.status_code != 200:
-            return None
+        _raise_for_provider_status("GetProspect", response)
         data = response.json()
 
     email = data.get("email")
@@ -1500,12 +2404,16 @@ async def _prospeo_email_lookup(
             json=payload,
             timeout=30.0,
         )
-        if response.status_code != 200:
-            return None
-        data = response.json()
+        if response.status_code == 400 and response.headers.get("content-type", "").startswith("application/json"):
+            data = response.json()  # "no match" comes back as a 400 with an error code
+        else:
+            _raise_for_provider_status("Prospeo", response)
+            data = response.json()
 
     if data.get("error"):
-        return None
+        if data.get("error_code") == "NO_MATCH":
+            return None
+        raise ValueError(f"Prospeo error: {data.get('error_code') or response.status_code}")
 
     person = data.get("person", {})
     email_obj = person.get("email", {})
@@ -1518,6 +2426,397 @@ async def _prospeo_email_lookup(
     return None
 
 
+# ─── Email Waterfall Runner ──────────────────────────────────────────────────
+
+class EmailLookupMode(str, Enum):
+    """How the waterfall calls providers."""
+    SEQUENTIAL = "sequential"  # one at a time, stop at the first hit
+    RACE = "race"  # all eligible providers at once, first hit by priority wins
+
+
+# (provider name, zero-arg coroutine factory), in the order to try them
+EmailAttempt = Tuple[str, Callable[[], Awaitable[Optional[Dict[str, str]]]]]
+
+
+class EmailQuery:
+    """The person to look up; every provider plugin draws its inputs from this."""
+
+    __slots__ = ("first", "last", "full_name", "company", "domain", "linkedin_url")
+
+    def __init__(self, name: str, company: str = "", domain: Optional[str] = None, linkedin_url: str = ""):
+        self.first, self.last = _split_name(name)
+        self.full_name = f"{self.first} {self.last}".strip()
+        self.company = "" if company.strip() == "-" else company.strip()
+        self.domain = domain or None
+        self.linkedin_url = "" if linkedin_url.strip() == "TBD" else linkedin_url.strip()
+
+
+class EmailProvider:
+    """An email-finder plugin: credentials, what it needs from a query, and its lookup call.
+
+    lookup(query, credentials) takes the values of env_keys in order.
+    """
+
+    def __init__(
+        self, name: str, env_keys: Tuple[str, ...],
+        lookup: Callable[[EmailQuery, List[str]], Awaitable[Optional[Dict[str, str]]]],
+        needs_domain: bool = False, needs_company: bool = False,
+    ):
+        self.name = name
+        self.env_keys = env_keys
+        self.lookup = lookup
+        self.needs_domain = needs_domain
+        self.needs_company = needs_company
+
+    def credentials(self) -> Optional[List[str]]:
+        """Configured credential values, or None if any is missing."""
+        values = [os.environ.get(key, "") for key in self.env_keys]
+        return values if all(values) else None
+
+    def can_serve(self, query: EmailQuery) -> bool:
+        if self.needs_domain and not query.domain:
+            return False
+        if self.needs_company and not (query.domain or query.company):
+            return False
+        return True
+
+
+# Registry order is the fixed waterfall: Apollo -> Hunter -> Snov.io -> GetProspect -> Prospeo
+EMAIL_PROVIDERS: List[EmailProvider] = [
+    EmailProvider("Apollo", ("APOLLO_API_KEY",), lambda q, k: _apollo_email_lookup(
+        q.first, q.last, q.company, q.linkedin_url, k[0])),
+    EmailProvider("Hunter", ("HUNTER_API_KEY",), lambda q, k: _hunter_email_lookup(
+        q.first, q.last, q.domain, k[0]), needs_domain=True),
+    EmailProvider("Snov.io", ("SNOV_CLIENT_ID", "SNOV_CLIENT_SECRET"), lambda q, k: _snov_email_lookup(
+        q.first, q.last, q.domain, k[0], k[1]), needs_domain=True),
+    EmailProvider("GetProspect", ("GETPROSPECT_API_KEY",), lambda q, k: _getprospect_email_lookup(
+        q.full_name, q.domain or q.company, k[0]), needs_company=True),
+    EmailProvider("Prospeo", ("PROSPEO_API_KEY",), lambda q, k: _prospeo_email_lookup(
+        q.first, q.last, q.company, q.domain, q.linkedin_url, k[0])),
+]
+
+EMAIL_KEYS_SETUP_MESSAGE = (
+    "Error: No email enrichment API keys are set.\n\n"
+    "**Setup:** Add to .mcp.json under hubspot-crm env (any combination):\n"
+    '```json\n'
+    '"APOLLO_API_KEY": "...",        // 50 free/month\n'
+    '"HUNTER_API_KEY": "...",        // 25 free/month\n'
+    '"SNOV_CLIENT_ID": "...",        // 50 free/month\n'
+    '"SNOV_CLIENT_SECRET": "...",    // (pair with client_id)\n'
+    '"GETPROSPECT_API_KEY": "...",   // 50 free/month\n'
+    '"PROSPEO_API_KEY": "..."        // 100 free/month\n'
+    '```'
+)
+
+
+def _configured_email_providers() -> List[Tuple[EmailProvider, List[str]]]:
+    """Providers with credentials set, in registry order."""
+    configured = []
+    for provider in EMAIL_PROVIDERS:
+        credentials = provider.credentials()
+        if credentials:
+            configured.append((provider, credentials))
+    return configured
+
+
+def _resolve_email_mode(mode: Optional[EmailLookupMode]) -> EmailLookupMode:
+    if mode is not None:
+        return mode
+    try:
+        return EmailLookupMode(EMAIL_LOOKUP_MODE)
+    except ValueError:
+        raise ValueError(f"EMAIL_LOOKUP_MODE must be 'sequential' or 'race', got '{EMAIL_LOOKUP_MODE}'")
+
+
+async def _timed_email_lookup(
+    provider: str, lookup: Callable[[], Awaitable[Optional[Dict[str, str]]]]
+) -> Tuple[str, Optional[Dict[str, str]]]:
+    """Run one provider lookup under its deadline. Returns (outcome, result)."""
+    deadline = EMAIL_PROVIDER_DEADLINES.get(provider, EMAIL_PROVIDER_TIMEOUT)
+    try:
+        result = await asyncio.wait_for(lookup(), timeout=deadline)
+    except asyncio.TimeoutError:
+        return "timeout", None
+    except Exception as e:
+        return f"error: {e}", None
+    return ("hit" if result else "miss"), result
+
+
+_credit_ledger: Optional[CreditLedger] = None
+
+
+def _get_credit_ledger() -> CreditLedger:
+    """Process-wide monthly credit ledger, opened on first use."""
+    global _credit_ledger
+    if _credit_ledger is None:
+        _credit_ledger = CreditLedger(EMAIL_CREDIT_LEDGER_PATH)
+    return _credit_ledger
+
+
+class EmailProviderPool:
+    """Per-provider limits shared by concurrent email lookups.
+
+    Bounds in-flight calls per provider, paces them with a per-provider
+    RateLimiter and charges credits against the persistent monthly ledger.
+    A credit is reserved right before the call (an atomic check-and-increment,
+    so concurrent lookups can't overshoot a limit) and refunded if the call
+    errors, including an HTTP error answer. Calls cancelled by race mode keep
+    their credit. `credits` counts what this pool spent.
+    """
+
+    def __init__(
+        self, limits: Dict[str, int], ledger: Optional[CreditLedger] = None,
+        concurrency: int = EMAIL_PROVIDER_CONCURRENCY,
+    ):
+        self.limits = limits
+        self.ledger = ledger or _get_credit_ledger()
+        self.credits = {provider: 0 for provider in limits}
+        self._slots = {provider: asyncio.Semaphore(max(1, concurrency)) for provider in limits}
+        self._rates = {
+            provider: RateLimiter(*EMAIL_PROVIDER_RATES.get(provider, (60, 60)))
+            for provider in limits
+        }
+
+    def available(self, provider: str) -> bool:
+        return self.ledger.remaining(provider, self.limits[provider]) > 0
+
+    def month_used(self, provider: str) -> int:
+        return self.ledger.used(provider)
+
+    def exhausted(self, providers: List[str]) -> bool:
+        return not any(self.available(p) for p in providers)
+
+    async def call(
+        self, provider: str, lookup: Callable[[], Awaitable[Optional[Dict[str, str]]]]
+    ) -> Tuple[str, Optional[Dict[str, str]]]:
+        """Run one lookup within the provider's limits. Outcome "limit" means no credit was left."""
+        async with self._slots[provider]:
+            await self._rates[provider].acquire()
+            if not self.ledger.try_consume(provider, self.limits[provider]):
+                return "limit", None
+            self.credits[provider] += 1
+            started = time.monotonic()
+            outcome, result = await _timed_email_lookup(provider, lookup)
+            if outcome.startswith("error"):
+                self.credits[provider] -= 1
+                self.ledger.refund(provider)
+            elif outcome in ("hit", "miss", "timeout"):
+                self.ledger.record_call(provider, outcome == "hit", time.monotonic() - started)
+            return outcome, result
+
+
+async def _run_email_waterfall(
+    attempts: List[EmailAttempt], mode: EmailLookupMode, pool: Optional[EmailProviderPool] = None
+) -> Tuple[Optional[Dict[str, str]], Dict[str, str]]:
+    """Run provider lookups and return (first hit by priority or None, {provider: outcome}).
+
+    Outcomes are "hit", "miss", "timeout", "cancelled", "limit" or
+    "error: ...", in priority order; providers never started are absent.
+    With a pool, calls go through its concurrency, pacing and credit limits.
+    Sequential mode stops at the first hit. Race mode starts every attempt at
+    once, waits on them in priority order (each bounded by its deadline) and
+    cancels the rest as soon as the best-ranked hit is known — faster, but
+    every started provider may have been charged a credit.
+    """
+    outcomes: Dict[str, str] = {}
+    run = pool.call if pool else _timed_email_lookup
+
+    if mode == EmailLookupMode.SEQUENTIAL:
+        for provider, lookup in attempts:
+            outcome, result = await run(provider, lookup)
+            outcomes[provider] = outcome
+            if result:
+                return result, outcomes
+        return None, outcomes
+
+    tasks = [
+        (provider, asyncio.create_task(run(provider, lookup)))
+        for provider, lookup in attempts
+    ]
+    try:
+        for provider, task in tasks:
+            outcome, result = await task
+            outcomes[provider] = outcome
+            if result:
+                return result, outcomes
+        return None, outcomes
+    finally:
+        pending = []
+        for provider, task in tasks:
+            if provider in outcomes:
+                continue
+            if task.done():
+                outcomes[provider] = task.result()[0]  # finished behind the winner; still charged
+            else:
+                task.cancel()
+                pending.append(task)
+                outcomes[provider] = "cancelled"
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+def _expected_cost_per_hit(name: str, stats: Dict[str, Dict[str, float]], pool: EmailProviderPool) -> float:
+    """Expected credits-equivalent spent per email found by this provider (see credit_ledger)."""
+    return expected_cost_per_hit(
+        stats.get(name), pool.ledger.remaining(name, pool.limits[name]),
+        max(pool.limits.values()), EMAIL_LATENCY_WEIGHT,
+    )
+
+
+def _schedule_email_providers(
+    query: EmailQuery, providers: List[Tuple[EmailProvider, List[str]]], pool: EmailProviderPool
+) -> Tuple[List[EmailAttempt], List[str]]:
+    """Order the providers able to serve this query; returns (attempts, exhausted names).
+
+    Providers that can't use the query (e.g. domain-only ones without a
+    domain) are dropped, as are those out of monthly credits. With
+    EMAIL_PROVIDER_ORDER=adaptive the rest are sorted by expected cost per
+    found email; "fixed" keeps the registry order.
+    """
+    eligible = [(provider, creds) for provider, creds in providers if provider.can_serve(query)]
+    exhausted = [provider.name for provider, _ in eligible if not pool.available(provider.name)]
+    eligible = [(provider, creds) for provider, creds in eligible if provider.name not in exhausted]
+    if EMAIL_PROVIDER_ORDER == "adaptive" and len(eligible) > 1:
+        stats = pool.ledger.provider_stats()
+        eligible.sort(key=lambda pc: _expected_cost_per_hit(pc[0].name, stats, pool))
+    attempts: List[EmailAttempt] = [
+        (provider.name, lambda provider=provider, creds=creds: provider.lookup(query, creds))
+        for provider, creds in eligible
+    ]
+    return attempts, exhausted
+
+
+async def _find_email(
+    query: EmailQuery, providers: List[Tuple[EmailProvider, List[str]]],
+    mode: EmailLookupMode, pool: EmailProviderPool, refresh: bool = False,
+) -> Tuple[Optional[Dict[str, str]], Dict[str, str], bool]:
+    """Cache, then scheduled waterfall, for one person.
+
+    Returns (result, {provider: outcome}, served_from_cache). Providers
+    skipped for lack of credits appear with outcome "limit".
+    """
+    cache = _get_email_cache()
+    if not refresh:
+        cached = cache.get(query.full_name, query.domain, query.linkedin_url)
+        if cached is not None:
+            return _cached_email_result(cached), {}, True
+
+    attempts, exhausted = _schedule_email_providers(query, providers, pool)
+    result, outcomes = await _run_email_waterfall(attempts, mode, pool)
+    outcomes.update((name, "limit") for name in exhausted)
+    _remember_email_lookup(query.full_name, query.domain, query.linkedin_url, result, outcomes)
+    return result, outcomes, False
+
+
+_email_cache: Optional[EmailLookupCache] = None
+
+
+def _get_email_cache() -> EmailLookupCache:
+    """Process-wide email-lookup cache, opened on first use."""
+    global _email_cache
+    if _email_cache is None:
+        _email_cache = EmailLookupCache(
+            EMAIL_LOOKUP_CACHE_PATH,
+            ttl_seconds=EMAIL_CACHE_TTL_DAYS * 86400,
+            negative_ttl_seconds=EMAIL_CACHE_NEGATIVE_TTL_DAYS * 86400,
+        )
+    return _email_cache
+
+
+def _cached_email_result(entry: Dict[str, Any]) -> Optional[Dict[str, str]]:
+    """Waterfall-style result for a cache entry (None for a cached miss)."""
+    if not entry["email"]:
+        return None
+    return {"email": entry["email"], "status": entry["status"], "source": f"{entry['source']} (cached)"}
+
+
+def _remember_email_lookup(
+    name: str, domain: Optional[str], linkedin_url: str,
+    result: Optional[Dict[str, str]], outcomes: Dict[str, str],
+) -> None:
+    """Cache a waterfall result.
+
+    A miss is cached only if every provider called answered "miss" (those out
+    of credits don't block it; the negative TTL brings them back next month).
+    """
+    credits = sum(1 for o in outcomes.values() if o in ("hit", "miss", "timeout", "cancelled"))
+    cache = _get_email_cache()
+    if result:
+        cache.put_hit(name, domain, linkedin_url, result, credits)
+    elif credits and all(o in ("miss", "limit") for o in outcomes.values()):
+        cache.put_miss(name, domain, linkedin_url, credits)
+
+
+def _email_outcome_label(provider: str, outcome: str) -> str:
+    if outcome in ("hit", "miss"):
+        return provider
+    if outcome == "limit":
+        return f"{provider} (monthly limit reached)"
+    return f"{provider} ({'error' if outcome.startswith('error') else outcome})"
+
+
+def _email_provider_stats_lines(pool: EmailProviderPool, names: List[str]) -> List[str]:
+    """Markdown table of the scheduler's view of each provider."""
+    stats = pool.ledger.provider_stats()
+    lines = [
+        "| Provider | Hit rate | Avg latency | Credits per hit |",
+        "|----------|----------|-------------|-----------------|",
+    ]
+    for name in names:
+        entry = stats.get(name)
+        if not entry or entry["calls"] < 1:
+            lines.append(f"| {name} | - | - | - |")
+            continue
+        hit_rate = entry["hits"] / entry["calls"]
+        per_hit = f"{entry['calls'] / entry['hits']:.1f}" if entry["hits"] else "-"
+        lines.append(
+            f"| {name} | {hit_rate:.0%} | {entry['latency_total'] / entry['calls']:.1f}s | {per_hit} |"
+        )
+    return lines
+
+
+async def _write_prospect_emails(
+    emails: Dict[str, str], key_column: str = "Profile URL"
+) -> Tuple[int, List[str]]:
+    """Fill the Email column of icp-prospects.md for {Profile URL or #: email}.
+
+    One locked, atomic pass over the file; emails already in the file are
+    never overwritten. Returns (rows updated, keys not found).
+    """
+    if not emails:
+        return 0, []
+    return await asyncio.to_thread(
+        write_updates, ICP_PROSPECTS_PATH,
+        {key: {"Email": email} for key, email in emails.items()}, key_column, False,
+    )
+
+
+async def _batch_update_contact_emails(emails_by_url: Dict[str, str]) -> Tuple[int, List[str]]:
+    """Write found emails to existing HubSpot contacts, keyed on LinkedIn URL.
+
+    One IN-filter search and one batch update per 100 prospects instead of a
+    search + PATCH each. Returns (contacts updated, error messages).
+    """
+    updated = 0
+    errors: List[str] = []
+    urls = list(emails_by_url)
+    for chunk in _chunks(urls):
+        try:
+            contacts = await _batch_search_by_values(
+                "contacts", "linkedin_profile", chunk, ["linkedin_profile"]
+            )
+            inputs = [
+                {"id": contacts[url.lower()]["id"], "properties": {"email": emails_by_url[url]}}
+                for url in chunk if url.lower() in contacts
+            ]
+            if inputs:
+                await _batch_write("contacts", "update", inputs)
+                updated += len(inputs)
+        except Exception as e:
+            errors.append(f"HubSpot batch email update error: {e}")
+    return updated, errors
+
+
 class FindEmailAdhocInput(BaseModel):
     """Input for ad-hoc single email lookup."""
     model_config = ConfigDict(str_strip_whitespace=True, extra="forbid")
@@ -1528,7 +2827,18 @@ class FindEmailAdhocInput(BaseModel):
     domain: str = Field(default="", description="Company domain (e.g., 'acme.com'). Auto-derived from company if empty.")
     add_to_prospects: bool = Field(
         default=False,
-        description="If true and email found, add/update the prospect in icp-prospects.md",
+        description="If true and email found, fill the prospect's Email column in icp-prospects.md (matched by LinkedIn URL, else name)",
+    )
+    mode: Optional[EmailLookupMode] = Field(
+        default=None,
+        description=(
+            "Provider strategy: 'sequential' (one at a time, fewest credits) or 'race' "
+            "(query providers concurrently, lowest latency). Defaults to EMAIL_LOOKUP_MODE (sequential)."
+        ),
+    )
+    refresh: bool = Field(
+        default=False,
+        description="Ignore cached lookup results (hits and misses) and query providers again",
     )
 
 
@@ -1545,6 +2855,40 @@ class FindEmailsInput(BaseModel):
         default=False,
         description="If true, only show eligible prospects without calling APIs",
     )
+    concurrency: int = Field(
+        default=EMAIL_ENRICH_CONCURRENCY,
+        description="Prospects enriched in parallel (default 4). Per-provider limits still apply.",
+        ge=1,
+        le=20,
+    )
+    mode: Optional[EmailLookupMode] = Field(
+        default=None,
+        description=(
+            "Provider strategy: 'sequential' (one at a time, fewest credits) or 'race' "
+            "(query providers concurrently, lowest latency). Defaults to EMAIL_LOOKUP_MODE (sequential)."
+        ),
+    )
+    refresh: bool = Field(
+        default=False,
+        description="Ignore cached lookup results (hits and misses) and query providers again",
+    )
+
+
+async def _add_email_to_prospects(name: str, linkedin_url: str, email: str) -> str:
+    """Write one found email into icp-prospects.md; returns a status for the report."""
+    if not ICP_PROSPECTS_PATH.exists():
+        return "Not updated (file not found)"
+    if linkedin_url:
+        key, key_column = linkedin_url, "Profile URL"
+    else:
+        row = _load_prospects_table().find_by_name(name)
+        if row is None:
+            return "Not updated (no matching prospect)"
+        key, key_column = row.get("#", ""), "#"
+    updated, missing = await _write_prospect_emails({key: email}, key_column)
+    if updated:
+        return "Email column updated"
+    return "Not updated (no matching prospect)" if missing else "Not updated (Email already set)"
 
 
 @mcp.tool(
@@ -1560,8 +2904,8 @@ class FindEmailsInput(BaseModel):
 async def crm_find_email(params: FindEmailAdhocInput) -> str:
     """Ad-hoc email lookup for a single person by name + company/domain/LinkedIn URL.
 
-    Runs the same 5-provider waterfall (Apollo -> Hunter -> Snov.io -> GetProspect -> Prospeo)
-    but for one person on demand. Does NOT require the person to be in icp-prospects.md.
+    Runs the same 5-provider waterfall as crm_find_emails (same provider
+    ordering and credit ledger) but for one person on demand. Does NOT require the person to be in icp-prospects.md.
 
     Args:
         params (FindEmailAdhocInput): Lookup data containing:
@@ -1575,27 +2919,9 @@ async def crm_find_email(params: FindEmailAdhocInput) -> str:
         str: Email found with source/status, or 'not found' with providers tried.
     """
     try:
-        apollo_key = os.environ.get("APOLLO_API_KEY", "")
-        hunter_key = os.environ.get("HUNTER_API_KEY", "")
-        snov_id = os.environ.get("SNOV_CLIENT_ID", "")
-        snov_secret = os.environ.get("SNOV_CLIENT_SECRET", "")
-        getprospect_key = os.environ.get("GETPROSPECT_API_KEY", "")
-        prospeo_key = os.environ.get("PROSPEO_API_KEY", "")
-
-        has_any_key = any([apollo_key, hunter_key, snov_id and snov_secret, getprospect_key, prospeo_key])
-        if not has_any_key:
-            return (
-                "Error: No email enrichment API keys are set.\n\n"
-                "**Setup:** Add to .mcp.json under hubspot-crm env (any combination):\n"
-                '```json\n'
-                '"APOLLO_API_KEY": "...",        // 50 free/month\n'
-                '"HUNTER_API_KEY": "...",        // 25 free/month\n'
-                '"SNOV_CLIENT_ID": "...",        // 50 free/month\n'
-                '"SNOV_CLIENT_SECRET": "...",    // (pair with client_id)\n'
-                '"GETPROSPECT_API_KEY": "...",   // 50 free/month\n'
-                '"PROSPEO_API_KEY": "..."        // 100 free/month\n'
-                '```'
-            )
+        providers = _configured_email_providers()
+        if not providers:
+            return EMAIL_KEYS_SETUP_MESSAGE
 
         first, last = _split_name(params.name)
         full_name = f"{first} {last}".strip()
@@ -1603,63 +2929,20 @@ async def crm_find_email(params: FindEmailAdhocInput) -> str:
         linkedin_url = params.linkedin_url
         domain = params.domain
 
-        # Auto-derive domain from company if not provided
+        # Auto-derive a verified domain from company if not provided
         if not domain and company:
-            fake_prospect = {"Company": company, "Notes": ""}
-            domain = _extract_company_domain(fake_prospect) or ""
+            domain = await _resolve_company_domain({"Company": company}) or ""
+            _get_domain_resolver().cache.save()
 
-        email_result = None
-        providers_tried = []
-
-        # 1. Apollo
-        if not email_result and apollo_key:
-            try:
-                email_result = await _apollo_email_lookup(
-                    first, last, company, linkedin_url, apollo_key
-                )
-                providers_tried.append("Apollo")
-            except Exception:
-                providers_tried.append("Apollo (error)")
-
-        # 2. Hunter
-        if not email_result and hunter_key and domain:
-            try:
-                email_result = await _hunter_email_lookup(
-                    first, last, domain, hunter_key
-                )
-                providers_tried.append("Hunter")
-            except Exception:
-                providers_tried.append("Hunter (error)")
-
-        # 3. Snov.io
-        if not email_result and snov_id and snov_secret and domain:
-            try:
-                email_result = await _snov_email_lookup(
-                    first, last, domain, snov_id, snov_secret
-                )
-                providers_tried.append("Snov.io")
-            except Exception:
-                providers_tried.append("Snov.io (error)")
-
-        # 4. GetProspect
-        if not email_result and getprospect_key:
-            try:
-                email_result = await _getprospect_email_lookup(
-                    full_name, domain or company, getprospect_key
-                )
-                providers_tried.append("GetProspect")
-            except Exception:
-                providers_tried.append("GetProspect (error)")
-
-        # 5. Prospeo
-        if not email_result and prospeo_key:
-            try:
-                email_result = await _prospeo_email_lookup(
-                    first, last, company, domain or None, linkedin_url, prospeo_key
-                )
-                providers_tried.append("Prospeo")
-            except Exception:
-                providers_tried.append("Prospeo (error)")
+        query = EmailQuery(params.name, company, domain, linkedin_url)
+        email_result, outcomes, from_cache = await _find_email(
+            query, providers, _resolve_email_mode(params.mode),
+            EmailProviderPool(EMAIL_MONTHLY_LIMITS), refresh=params.refresh,
+        )
+        if from_cache:
+            providers_tried = ["none (cached result — pass refresh: true to query again)"]
+        else:
+            providers_tried = [_email_outcome_label(p, o) for p, o in outcomes.items()]
 
         if email_result:
             lines = [
@@ -1688,17 +2971,14 @@ async def crm_find_email(params: FindEmailAdhocInput) -> str:
                     pass
 
             if params.add_to_prospects:
-                lines.extend([
-                    "",
-                    f"Update `icp-prospects.md` Email column for **{full_name}** → `{email_result['email']}` (source: {email_result['source']})",
-                ])
+                lines.append(f"| **icp-prospects.md** | {await _add_email_to_prospects(params.name, linkedin_url, email_result['email'])} |")
 
             return "\n".join(lines)
         else:
             return (
                 f"## No Email Found for {full_name}\n\n"
                 f"- **Company:** {company or '(not provided)'}\n"
-                f"- **Domain:** {domain or '(not provided)'}\n"
+                f"- **Domain:** {domain or ('(no mail domain found)' if company else '(not provided)')}\n"
                 f"- **LinkedIn:** {linkedin_url or '(not provided)'}\n"
                 f"- **Providers tried:** {', '.join(providers_tried)}\n\n"
                 "**Tips:** Provide a LinkedIn URL or company domain for better match rates."
@@ -1727,49 +3007,37 @@ async def crm_find_emails(params: FindEmailsInput) -> str:
     - Last Touch > min_days_pending days ago
     - Email = "-" (not yet populated)
 
-    Then enriches via waterfall: Apollo -> Hunter -> Snov.io -> GetProspect -> Prospeo.
-    Only accepts verified/high-confidence emails. Updates HubSpot contact email property.
+    Then enriches via waterfall over Apollo, Hunter, Snov.io, GetProspect and
+    Prospeo, cheapest expected cost per found email first (see
+    EMAIL_PROVIDER_ORDER); providers that can't use a prospect's data are
+    skipped. Only accepts verified/high-confidence emails. Prospects are enriched
+    concurrently within per-provider concurrency, pacing and credit limits;
+    found emails are written to HubSpot contacts in one batch update at the end.
 
     Args:
         params (FindEmailsInput): Configuration:
             - min_days_pending (int): Days since connect_sent (default: 7)
             - dry_run (bool): If true, list eligible prospects without API calls
+            - mode (str): 'sequential' or 'race' provider strategy
+            - concurrency (int): Prospects enriched in parallel (default: 4)
 
     Returns:
         str: Markdown report with emails found, credits used, and missed prospects.
     """
     try:
-        apollo_key = os.environ.get("APOLLO_API_KEY", "")
-        hunter_key = os.environ.get("HUNTER_API_KEY", "")
-        snov_id = os.environ.get("SNOV_CLIENT_ID", "")
-        snov_secret = os.environ.get("SNOV_CLIENT_SECRET", "")
-        getprospect_key = os.environ.get("GETPROSPECT_API_KEY", "")
-        prospeo_key = os.environ.get("PROSPEO_API_KEY", "")
-
-        has_any_key = any([apollo_key, hunter_key, snov_id and snov_secret, getprospect_key, prospeo_key])
-        if not has_any_key:
-            return (
-                "Error: No email enrichment API keys are set.\n\n"
-                "**Setup:** Add to .mcp.json under hubspot-crm env (any combination):\n"
-                '```json\n'
-                '"APOLLO_API_KEY": "...",        // 50 free/month\n'
-                '"HUNTER_API_KEY": "...",        // 25 free/month\n'
-                '"SNOV_CLIENT_ID": "...",        // 50 free/month\n'
-                '"SNOV_CLIENT_SECRET": "...",    // (pair with client_id)\n'
-                '"GETPROSPECT_API_KEY": "...",   // 50 free/month\n'
-                '"PROSPEO_API_KEY": "..."        // 100 free/month\n'
-                '```'
-            )
+        providers = _configured_email_providers()
+        if not providers:
+            return EMAIL_KEYS_SETUP_MESSAGE
 
         if not ICP_PROSPECTS_PATH.exists():
             return f"Error: icp-prospects.md not found at {ICP_PROSPECTS_PATH}"
 
-        content = ICP_PROSPECTS_PATH.read_text(encoding="utf-8")
-        prospects = _parse_prospects_table(content)
+        table = _load_prospects_table()
+        prospects = table.rows
         if not prospects:
             return "Error: No prospects found in icp-prospects.md table"
 
-        eligible = _filter_email_eligible_prospects(prospects, params.min_days_pending)
+        eligible = _filter_email_eligible_prospects(table, params.min_days_pending)
 
         if not eligible:
             return (
@@ -1788,19 +3056,16 @@ async def crm_find_emails(params: FindEmailsInput) -> str:
                 "| # | Name | Company | Days Pending | Profile URL |",
                 "|---|------|---------|-------------|-------------|",
             ]
-            for p in eligible:
+            for p, days_since in eligible:
                 lines.append(
                     f"| {p.get('#', '-')} | {p.get('Name', '-')} | "
-                    f"{p.get('Company', '-')} | {p.get('_days_since_connect', '?')} | "
+                    f"{p.get('Company', '-')} | {days_since} | "
                     f"{p.get('Profile URL', 'TBD')} |"
                 )
-            keys_status = " | ".join([
-                f"Apollo: {'Yes' if apollo_key else 'No'}",
-                f"Hunter: {'Yes' if hunter_key else 'No'}",
-                f"Snov.io: {'Yes' if snov_id and snov_secret else 'No'}",
-                f"GetProspect: {'Yes' if getprospect_key else 'No'}",
-                f"Prospeo: {'Yes' if prospeo_key else 'No'}",
-            ])
+            keys_status = " | ".join(
+                f"{provider.name}: {'Yes' if provider.credentials() else 'No'}"
+                for provider in EMAIL_PROVIDERS
+            )
             lines.extend([
                 "",
                 f"**API keys available:** {keys_status}",
@@ -1810,80 +3075,53 @@ async def crm_find_emails(params: FindEmailsInput) -> str:
             return "\n".join(lines)
 
         # Execute enrichment
-        credits = {
-            "Apollo": 0, "Hunter": 0, "Snov.io": 0,
-            "GetProspect": 0, "Prospeo": 0,
-        }
-        limits = {
-            "Apollo": APOLLO_MONTHLY_LIMIT, "Hunter": HUNTER_MONTHLY_LIMIT,
-            "Snov.io": SNOV_MONTHLY_LIMIT, "GetProspect": GETPROSPECT_MONTHLY_LIMIT,
-            "Prospeo": PROSPEO_MONTHLY_LIMIT,
-        }
+        limits = EMAIL_MONTHLY_LIMITS
+        configured = [provider.name for provider, _ in providers]
+        pool = EmailProviderPool(limits)
+        mode = _resolve_email_mode(params.mode)
+        cache = _get_email_cache()
+        cache_before = cache.stats()
+
+        async def enrich(p: Dict[str, str]) -> Optional[Tuple[Optional[Dict[str, str]], List[str]]]:
+            """Run the waterfall for one prospect; None if every credit pool is used up."""
+            name = p.get("Name", "Unknown")
+            query = EmailQuery(
+                name, p.get("Company", ""), await _resolve_company_domain(p), p.get("Profile URL", "TBD")
+            )
+            email_result, outcomes, from_cache = await _find_email(
+                query, providers, mode, pool, refresh=params.refresh
+            )
+            if not from_cache and all(o == "limit" for o in outcomes.values()) and pool.exhausted(configured):
+                return None
+            prospect_errors = []
+            for provider, outcome in outcomes.items():
+                if outcome.startswith("error"):
+                    prospect_errors.append(f"{provider} error for {name}: {outcome[len('error: '):]}")
+                elif outcome == "timeout":
+                    prospect_errors.append(f"{provider} timed out for {name}")
+            return email_result, prospect_errors
+
+        eligible_rows = [p for p, _ in eligible]
+        results = await _run_bounded(eligible_rows, enrich, params.concurrency)
+        _get_domain_resolver().cache.save()
+
         found = []
         missed = []
         errors = []
+        not_attempted = 0
+        emails_by_url: Dict[str, str] = {}
 
-        for p in eligible:
+        for p, outcome in zip(eligible_rows, results):
             name = p.get("Name", "Unknown")
-            first, last = _split_name(name)
-            company = p.get("Company", "")
+            if isinstance(outcome, Exception):
+                errors.append(f"Lookup error for {name}: {outcome}")
+                continue
+            if outcome is None:
+                not_attempted += 1
+                continue
+            email_result, prospect_errors = outcome
+            errors.extend(prospect_errors)
             linkedin_url = p.get("Profile URL", "TBD")
-            domain = _extract_company_domain(p)
-            full_name = f"{first} {last}".strip()
-            email_result = None
-
-            # Waterfall: Apollo -> Hunter -> Snov.io -> GetProspect -> Prospeo
-
-            # 1. Apollo
-            if not email_result and apollo_key and credits["Apollo"] < limits["Apollo"]:
-                try:
-                    email_result = await _apollo_email_lookup(
-                        first, last, company, linkedin_url, apollo_key
-                    )
-                    credits["Apollo"] += 1
-                except Exception as e:
-                    errors.append(f"Apollo error for {name}: {e}")
-
-            # 2. Hunter
-            if not email_result and hunter_key and credits["Hunter"] < limits["Hunter"]:
-                try:
-                    email_result = await _hunter_email_lookup(
-                        first, last, domain or "", hunter_key
-                    )
-                    credits["Hunter"] += 1
-                except Exception as e:
-                    errors.append(f"Hunter error for {name}: {e}")
-
-            # 3. Snov.io
-            if not email_result and snov_id and snov_secret and credits["Snov.io"] < limits["Snov.io"]:
-                try:
-                    email_result = await _snov_email_lookup(
-                        first, last, domain or "", snov_id, snov_secret
-                    )
-                    credits["Snov.io"] += 1
-                except Exception as e:
-                    errors.append(f"Snov.io error for {name}: {e}")
-
-            # 4. GetProspect
-            if not email_result and getprospect_key and credits["GetProspect"] < limits["GetProspect"]:
-                try:
-                    email_result = await _getprospect_email_lookup(
-                        full_name, domain or company, getprospect_key
-                    )
-                    credits["GetProspect"] += 1
-                except Exception as e:
-                    errors.append(f"GetProspect error for {name}: {e}")
-
-            # 5. Prospeo
-            if not email_result and prospeo_key and credits["Prospeo"] < limits["Prospeo"]:
-                try:
-                    email_result = await _prospeo_email_lookup(
-                        first, last, company, domain, linkedin_url, prospeo_key
-                    )
-                    credits["Prospeo"] += 1
-                except Exception as e:
-                    errors.append(f"Prospeo error for {name}: {e}")
-
             if email_result:
                 found.append({
                     "number": p.get("#", "-"),
@@ -1893,39 +3131,27 @@ async def crm_find_emails(params: FindEmailsInput) -> str:
                     "status": email_result["status"],
                     "linkedin_url": linkedin_url,
                 })
-                # Update HubSpot contact email
-                try:
-                    existing = await _search_contact_by_linkedin_url(linkedin_url)
-                    if existing:
-                        await _make_api_request(
-                            f"/crm/v3/objects/contacts/{existing['id']}",
-                            method="PATCH",
-                            json_data={"properties": {"email": email_result["email"]}},
-                        )
-                except Exception as e:
-                    errors.append(f"HubSpot update error for {name}: {e}")
+                if linkedin_url and linkedin_url != "TBD":
+                    emails_by_url[linkedin_url] = email_result["email"]
             else:
                 missed.append({
                     "number": p.get("#", "-"),
                     "name": name,
-                    "company": company,
+                    "company": p.get("Company", ""),
                 })
 
-            # Stop if all credit pools exhausted
-            all_exhausted = True
-            if apollo_key and credits["Apollo"] < limits["Apollo"]:
-                all_exhausted = False
-            if hunter_key and credits["Hunter"] < limits["Hunter"]:
-                all_exhausted = False
-            if snov_id and snov_secret and credits["Snov.io"] < limits["Snov.io"]:
-                all_exhausted = False
-            if getprospect_key and credits["GetProspect"] < limits["GetProspect"]:
-                all_exhausted = False
-            if prospeo_key and credits["Prospeo"] < limits["Prospeo"]:
-                all_exhausted = False
-            if all_exhausted:
-                errors.append("All credit limits reached — stopping enrichment")
-                break
+        if not_attempted:
+            errors.append(
+                f"All monthly credit limits reached — stopping enrichment ({not_attempted} prospects not attempted)"
+            )
+
+        # Update HubSpot contact emails in one batch pass
+        hubspot_updated, update_errors = await _batch_update_contact_emails(emails_by_url)
+        errors.extend(update_errors)
+        file_updated, _ = await _write_prospect_emails(emails_by_url)
+        emails_by_number = {f["number"]: f["email"] for f in found if f["linkedin_url"] in ("", "TBD")}
+        file_updated += (await _write_prospect_emails(emails_by_number, "#"))[0]
+        credits = pool.credits
 
         # Build report
         lines = [
@@ -1958,21 +3184,42 @@ async def crm_find_emails(params: FindEmailsInput) -> str:
                 lines.append(f"| {m['number']} | {m['name']} | {m['company']} |")
             lines.append("")
 
+        cache_stats = cache.stats()
+        cache_lookups = cache_stats["lookups"] - cache_before["lookups"]
+        cache_hits = cache_stats["hits"] - cache_before["hits"]
+        cache_lines = []
+        if cache_lookups:
+            cache_lines.append(
+                f"- **Lookup cache:** {cache_hits}/{cache_lookups} hits ({cache_hits / cache_lookups:.0%}, "
+                f"{cache_stats['negative_hits'] - cache_before['negative_hits']} cached misses), "
+                f"{cache_stats['credits_saved'] - cache_before['credits_saved']} credits saved"
+            )
+
         credit_lines = []
         for provider, used in credits.items():
-            if used > 0 or (provider == "Apollo" and apollo_key) or \
-               (provider == "Hunter" and hunter_key) or \
-               (provider == "Snov.io" and snov_id) or \
-               (provider == "GetProspect" and getprospect_key) or \
-               (provider == "Prospeo" and prospeo_key):
-                credit_lines.append(f"- **{provider} credits used:** {used}/{limits[provider]}")
+            if used > 0 or provider in configured:
+                credit_lines.append(
+                    f"- **{provider} credits used:** {used} this run, "
+                    f"{pool.month_used(provider)}/{limits[provider]} this month"
+                )
 
         lines.extend([
             "### Summary",
             "",
             f"- **Found:** {len(found)} emails",
             f"- **Missed:** {len(missed)} prospects",
+            f"- **HubSpot contacts updated:** {hubspot_updated}",
+            f"- **icp-prospects.md rows updated:** {file_updated}",
+            f"- **Provider mode:** {mode.value}",
             *credit_lines,
+            *cache_lines,
+        ])
+
+        lines.extend([
+            "",
+            f"### Provider Stats ({'adaptive' if EMAIL_PROVIDER_ORDER == 'adaptive' else 'fixed'} order)",
+            "",
+            *_email_provider_stats_lines(pool, configured),
         ])
 
         if errors:
@@ -1985,8 +3232,7 @@ async def crm_find_emails(params: FindEmailsInput) -> str:
                 "",
                 "### Next Steps",
                 "",
-                "Update `icp-prospects.md` Email column for found emails.",
-                "HubSpot contacts have been updated automatically.",
+                "Found emails have been written to HubSpot and the `icp-prospects.md` Email column.",
             ])
 
         return "\n".join(lines)
@@ -1999,7 +3245,7 @@ async def crm_find_emails(params: FindEmailsInput) -> str:
     name="crm_pull_emails",
     annotations={
         "title": "Pull Emails from HubSpot to Prospects File",
-        "readOnlyHint": True,
+        "readOnlyHint": False,
         "destructiveHint": False,
         "idempotentHint": True,
         "openWorldHint": True,
@@ -2009,30 +3255,28 @@ async def crm_pull_emails() -> str:
     """Reverse sync: pull emails from HubSpot contacts back to icp-prospects.md.
 
     Searches HubSpot for contacts that have both a linkedin_profile and email set.
-    Cross-references against icp-prospects.md by Profile URL.
-    Reports which prospects have emails in HubSpot but not in the local file.
+    Cross-references against icp-prospects.md by Profile URL and writes
+    HubSpot emails into the Email column of prospects that have none, in one
+    locked, atomic pass over the file.
 
     Use this to catch emails added manually in HubSpot or via other integrations.
 
     Returns:
-        str: Markdown report listing prospects whose Email column should be updated.
+        str: Markdown report listing the prospects whose Email column was filled.
     """
     try:
         if not ICP_PROSPECTS_PATH.exists():
             return f"Error: icp-prospects.md not found at {ICP_PROSPECTS_PATH}"
 
-        content = ICP_PROSPECTS_PATH.read_text(encoding="utf-8")
-        prospects = _parse_prospects_table(content)
-        if not prospects:
+        table = _load_prospects_table()
+        if not table.rows:
             return "Error: No prospects found in icp-prospects.md table"
 
-        # Build lookup: linkedin_url -> prospect row
-        prospects_missing_email = {}
-        for p in prospects:
-            email = p.get("Email", "-").strip()
-            url = p.get("Profile URL", "").strip()
-            if url and url != "TBD" and (not email or email == "-"):
-                prospects_missing_email[url] = p
+        # Profile URL index (normalized) restricted to rows without an email
+        prospects_missing_email = {
+            url: p for url, p in table.by_url.items()
+            if p.get("Email", "-").strip() in ("", "-")
+        }
 
         if not prospects_missing_email:
             return "All prospects with LinkedIn URLs already have emails populated."
@@ -2078,8 +3322,8 @@ async def crm_pull_emails() -> str:
             linkedin_url = props.get("linkedin_profile", "")
             email = props.get("email", "")
 
-            if linkedin_url in prospects_missing_email and email:
-                p = prospects_missing_email[linkedin_url]
+            p = prospects_missing_email.get(normalize_url(linkedin_url)) if linkedin_url else None
+            if p and email:
                 updates.append({
                     "number": p.get("#", "-"),
                     "name": p.get("Name", "Unknown"),
@@ -2094,10 +3338,12 @@ async def crm_pull_emails() -> str:
                 f"{len(prospects_missing_email)} prospects missing emails."
             )
 
+        written, _ = await _write_prospect_emails({u["linkedin_url"]: u["email"] for u in updates})
+
         lines = [
             "## Emails Found in HubSpot (Reverse Sync)",
             "",
-            "These prospects have emails in HubSpot but not in `icp-prospects.md`:",
+            "These prospects had emails in HubSpot but not in `icp-prospects.md`:",
             "",
             "| # | Name | Email | LinkedIn URL |",
             "|---|------|-------|-------------|",
@@ -2108,10 +3354,10 @@ async def crm_pull_emails() -> str:
             )
         lines.extend([
             "",
-            f"**Total:** {len(updates)} emails to sync back to icp-prospects.md",
-            "",
-            "Update the Email column in `icp-prospects.md` for these prospects.",
+            f"**Total:** {len(updates)} emails found, {written} written to the Email column of `icp-prospects.md`",
         ])
+        if written < len(updates):
+            lines.append("(The rest were filled in or removed from the file since it was read.)")
 
         return "\n".join(lines)
 
@@ -0,0 +1,149 @@
+"""
+Typed columnar snapshot of the prospects table, for filters and aggregations.
+
+Eligibility filters and pipeline counts only need a few columns, but reading
+them from ProspectRow means re-parsing "Touches", "Last Touch" and the status
+strings on every call. ProspectsSnapshot compiles them once per table:
+
+- last_touch: "07Feb"-style dates as days since 1970-01-01 (NO_DATE if unset),
+  with the year inferred as of the snapshot's `today` (see prospects_store.dates);
+- touches: int;
+- status / stage: categorical codes into STATUSES / the stage names;
+- has_email, connect_sent, has_url (a Profile URL other than TBD): booleans.
+
+Columns are NumPy arrays when NumPy is installed (pip install numpy), so
+filters run vectorized; otherwise plain lists with the same API.
+snapshot_for() keeps one snapshot per loaded table and UTC day, so it is
+rebuilt only when icp-prospects.md changes (a new ProspectsTable from
+load_table()) or the date rolls over.
+"""
+
+import weakref
+from datetime import date
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from prospects_store import ProspectRow, ProspectsTable
+from prospects_store.dates import EPOCH, NO_DATE, epoch_days, today_utc
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# (touches, connection status, touch history) -> pipeline stage name
+StageFunc = Callable[[int, str, str], str]
+
+STATUSES = ("none", "pending", "connected", "rejected", "other")
+
+
+def _touches(value: str) -> int:
+    try:
+        return int((value or "0").strip().replace("+", "") or "0")
+    except ValueError:
+        return 0
+
+
+def _status_code(value: str) -> int:
+    status = (value or "none").strip().lower() or "none"
+    return STATUSES.index(status) if status in STATUSES else STATUSES.index("other")
+
+
+class ProspectsSnapshot:
+    """Typed columns for the rows of one ProspectsTable, in table order."""
+
+    def __init__(self, columns: Dict[str, Sequence], stages: Tuple[str, ...], today: date):
+        self.columns = columns
+        self.stages = stages
+        self.today = today
+        self.today_day = (today - EPOCH).days
+
+    @classmethod
+    def build(
+        cls, rows: Sequence[ProspectRow], today: Optional[date] = None,
+        stage_of: Optional[StageFunc] = None, stages: Sequence[str] = (),
+    ) -> "ProspectsSnapshot":
+        """Compile `rows`; stage_of names each row's pipeline stage (see StageFunc)."""
+        today = today or today_utc()
+        touches = [_touches(row.get("Touches", "0")) for row in rows]
+        stage_names = list(stages)
+        stage_codes = []
+        for row, count in zip(rows, touches):
+            name = stage_of(
+                count, row.get("Connection Status", "none"), row.get("Touch History", "")
+            ) if stage_of else ""
+            if name not in stage_names:
+                stage_names.append(name)
+            stage_codes.append(stage_names.index(name))
+        data = {
+            "last_touch": epoch_days((row.get("Last Touch", "") for row in rows), today),
+            "touches": touches,
+            "status": [_status_code(row.get("Connection Status", "")) for row in rows],
+            "stage": stage_codes,
+            "has_email": [row.get("Email", "-").strip() not in ("", "-") for row in rows],
+            "connect_sent": ["connect_sent" in row.get("Touch History", "") for row in rows],
+            "has_url": [row.get("Profile URL", "").strip() not in ("", "TBD") for row in rows],
+        }
+        if np is not None:
+            dtypes = {"last_touch": np.int32, "touches": np.int32, "status": np.uint8,
+                      "stage": np.uint8, "has_email": np.bool_, "connect_sent": np.bool_,
+                      "has_url": np.bool_}
+            data = {name: np.asarray(values, dtype=dtypes[name]) for name, values in data.items()}
+        return cls(data, tuple(stage_names), today)
+
+    def __len__(self) -> int:
+        return len(self.columns["touches"])
+
+    def email_eligible(self, min_days: int) -> List[Tuple[int, int]]:
+        """(row index, days since last touch) for pending, connect_sent rows
+        without an email whose last touch is at least min_days old."""
+        pending = STATUSES.index("pending")
+        c = self.columns
+        if np is not None:
+            days = self.today_day - c["last_touch"]
+            mask = ((c["status"] == pending) & c["connect_sent"] & ~c["has_email"]
+                    & (c["last_touch"] != NO_DATE) & (days >= min_days))
+            indices = np.flatnonzero(mask)
+            return list(zip(indices.tolist(), days[indices].tolist()))
+        return [
+            (i, self.today_day - day)
+            for i, (day, status, sent, has_email) in enumerate(
+                zip(c["last_touch"], c["status"], c["connect_sent"], c["has_email"])
+            )
+            if status == pending and sent and not has_email
+            and day != NO_DATE and self.today_day - day >= min_days
+        ]
+
+    def _counts(self, column: str, labels: Sequence[str], where: Optional[str] = None) -> Dict[str, int]:
+        """Rows per code of `column`, optionally only where boolean column `where` is set."""
+        values = self.columns[column]
+        if np is not None:
+            if where:
+                values = values[self.columns[where]]
+            counts = np.bincount(values, minlength=len(labels)).tolist()
+        else:
+            counts = [0] * len(labels)
+            keep = self.columns[where] if where else None
+            for i, code in enumerate(values):
+                if keep is None or keep[i]:
+                    counts[code] += 1
+        return dict(zip(labels, counts))
+
+    def stage_counts(self, with_url_only: bool = False) -> Dict[str, int]:
+        """Rows per pipeline stage, in stage order; with_url_only counts only
+        rows that can be synced to HubSpot."""
+        return self._counts("stage", self.stages, "has_url" if with_url_only else None)
+
+
+_snapshots: "weakref.WeakKeyDictionary[ProspectsTable, ProspectsSnapshot]" = weakref.WeakKeyDictionary()
+
+
+def snapshot_for(
+    table: ProspectsTable, stage_of: Optional[StageFunc] = None,
+    stages: Sequence[str] = (),
+) -> ProspectsSnapshot:
+    """In-memory snapshot of a loaded table, reused until the table or the UTC day changes."""
+    snapshot = _snapshots.get(table)
+    if snapshot is None or snapshot.today != today_utc():
+        snapshot = ProspectsSnapshot.build(table.rows, stage_of=stage_of, stages=stages)
+        _snapshots[table] = snapshot
+    return snapshot
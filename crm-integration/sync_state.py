@@ -0,0 +1,176 @@
+"""
+Local sync-state stores for the HubSpot CRM sync.
+
+SyncStateStore remembers, per prospect (keyed on lowercased Profile URL), the
+HubSpot contact/company/deal IDs and a content hash of the row as it was last
+synced. crm_sync_all and cli_sync.py use it to skip rows that haven't changed
+and to skip ID lookups for contacts HubSpot already knows about.
+
+CompanyCache maps normalized company names to HubSpot company IDs (with a
+TTL) and remembers contact->company associations already created.
+
+Both are JSON files next to icp-prospects.md (override with
+CRM_SYNC_STATE_PATH / CRM_COMPANY_CACHE_PATH). domain_resolver.DomainCache
+reuses the same file helpers.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+STATE_VERSION = 1
+
+
+def _atomic_write_json(path: Path, data: Any) -> None:
+    """Write JSON via temp file + rename so a crash can't leave a truncated file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.stem}-", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _read_json(path: Path) -> Dict[str, Any]:
+    """Read a JSON state file; missing or corrupt files read as empty."""
+    if not path.exists():
+        return {}
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def row_hash(payload: Dict[str, Any]) -> str:
+    """Stable content hash of whatever a row pushes to HubSpot."""
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class SyncStateStore:
+    """JSON-backed map of Profile URL -> {hash, contact_id, company_id, deal_id, deal_stage, deal_name}."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.rows: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        self.load()
+
+    @staticmethod
+    def key(linkedin_url: str) -> str:
+        return linkedin_url.strip().lower()
+
+    def load(self) -> None:
+        """Read state from disk. A missing or corrupt file starts empty."""
+        data = _read_json(self.path)
+        self.rows = data.get("rows", {}) if data.get("version") == STATE_VERSION else {}
+
+    def get(self, linkedin_url: str) -> Optional[Dict[str, Any]]:
+        return self.rows.get(self.key(linkedin_url))
+
+    def is_current(self, linkedin_url: str, content_hash: str) -> bool:
+        """True if this row was synced before with exactly this content."""
+        entry = self.get(linkedin_url)
+        return bool(entry and entry.get("contact_id") and entry.get("hash") == content_hash)
+
+    def record(self, linkedin_url: str, content_hash: str, **fields: Optional[str]) -> None:
+        """Store the hash and any non-empty HubSpot IDs/fields for a synced row."""
+        entry = self.rows.setdefault(self.key(linkedin_url), {})
+        entry["hash"] = content_hash
+        entry.update({k: v for k, v in fields.items() if v})
+        entry["synced_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self._dirty = True
+
+    def forget(self, linkedin_url: str) -> None:
+        if self.rows.pop(self.key(linkedin_url), None) is not None:
+            self._dirty = True
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        _atomic_write_json(self.path, {"version": STATE_VERSION, "rows": self.rows})
+        self._dirty = False
+
+
+def normalize_company_name(name: str) -> str:
+    """Cache key for a company name: case-folded, whitespace collapsed."""
+    return " ".join(name.split()).casefold()
+
+
+class CompanyCache:
+    """Company name -> HubSpot company ID, plus known contact->company associations.
+
+    Entries older than ttl_seconds are treated as missing. invalidate() drops
+    a company ID (e.g. after HubSpot returns 404 for it) along with every
+    association that referenced it.
+    """
+
+    def __init__(self, path: Path, ttl_seconds: float):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.companies: Dict[str, Dict[str, Any]] = {}
+        self.associations: set[str] = set()
+        self.warmed_at = 0.0
+        self._dirty = False
+        self.load()
+
+    def load(self) -> None:
+        data = _read_json(self.path)
+        if data.get("version") != STATE_VERSION:
+            data = {}
+        self.companies = data.get("companies", {})
+        self.associations = set(data.get("associations", []))
+        self.warmed_at = float(data.get("warmed_at", 0.0))
+
+    def get(self, company_name: str) -> Optional[str]:
+        entry = self.companies.get(normalize_company_name(company_name))
+        if not entry or time.time() - entry.get("cached_at", 0) > self.ttl_seconds:
+            return None
+        return entry["id"]
+
+    def put(self, company_name: str, company_id: str, overwrite: bool = True) -> None:
+        key = normalize_company_name(company_name)
+        if not key or (not overwrite and self.get(company_name)):
+            return
+        self.companies[key] = {"id": str(company_id), "cached_at": time.time()}
+        self._dirty = True
+
+    def invalidate(self, company_id: str) -> None:
+        company_id = str(company_id)
+        self.companies = {k: v for k, v in self.companies.items() if v["id"] != company_id}
+        self.associations = {a for a in self.associations if not a.endswith(f":{company_id}")}
+        self._dirty = True
+
+    def has_association(self, contact_id: str, company_id: str) -> bool:
+        return f"{contact_id}:{company_id}" in self.associations
+
+    def add_association(self, contact_id: str, company_id: str) -> None:
+        self.associations.add(f"{contact_id}:{company_id}")
+        self._dirty = True
+
+    def needs_warm(self) -> bool:
+        return time.time() - self.warmed_at > self.ttl_seconds
+
+    def mark_warmed(self) -> None:
+        self.warmed_at = time.time()
+        self._dirty = True
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        _atomic_write_json(self.path, {
+            "version": STATE_VERSION,
+            "warmed_at": self.warmed_at,
+            "companies": self.companies,
+            "associations": sorted(self.associations),
+        })
+        self._dirty = False
@@ -0,0 +1,144 @@
+"""
+Access-token management for OAuth client-credentials providers (Snov.io, ...).
+
+TokenManager hands out a cached bearer token and refreshes it:
+
+- single-flight: however many lookups find the token stale at once, one
+  refresh request is made and every caller awaits its result;
+- proactively: within `refresh_margin` seconds of expiry the current token
+  is still returned, while a background refresh replaces it;
+- on demand: invalidate() drops a token the provider rejected (HTTP 401).
+
+Tokens can optionally outlive the process in an encrypted file
+(EncryptedTokenStore), so each CLI run doesn't re-authenticate. Encryption
+uses Fernet from the `cryptography` package (pip install cryptography) with a
+key derived from a passphrase; without the package or a passphrase, tokens
+are kept in memory only.
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+# Returns (access_token, expires_in_seconds)
+TokenFetcher = Callable[[], Awaitable[Tuple[str, float]]]
+
+
+class EncryptedTokenStore:
+    """{key: (token, expires_at)} in a Fernet-encrypted JSON file.
+
+    expires_at is wall-clock (time.time()) so it stays meaningful across
+    runs. An unreadable file (wrong passphrase, corruption) reads as empty.
+    """
+
+    def __init__(self, path: Path, passphrase: str):
+        from cryptography.fernet import Fernet
+
+        self.path = Path(path)
+        key = base64.urlsafe_b64encode(hashlib.sha256(passphrase.encode("utf-8")).digest())
+        self._fernet = Fernet(key)
+
+    def _load(self) -> Dict[str, list]:
+        from cryptography.fernet import InvalidToken
+
+        try:
+            return json.loads(self._fernet.decrypt(self.path.read_bytes()))
+        except (OSError, InvalidToken, ValueError):
+            return {}
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        entry = self._load().get(key)
+        return (entry[0], entry[1]) if entry else None
+
+    def _save(self, entries: Dict[str, list]) -> None:
+        now = time.time()
+        entries = {k: v for k, v in entries.items() if v[1] > now}  # Drop expired tokens
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_bytes(self._fernet.encrypt(json.dumps(entries).encode("utf-8")))
+        os.chmod(tmp, 0o600)
+        os.replace(tmp, self.path)
+
+    def put(self, key: str, token: str, expires_at: float) -> None:
+        entries = self._load()
+        entries[key] = [token, expires_at]
+        self._save(entries)
+
+    def delete(self, key: str) -> None:
+        entries = self._load()
+        if entries.pop(key, None) is not None:
+            self._save(entries)
+
+
+def open_token_store(path: Path, passphrase: str) -> Optional[EncryptedTokenStore]:
+    """An encrypted store, or None if there's no passphrase or `cryptography` isn't installed."""
+    if not passphrase:
+        return None
+    try:
+        return EncryptedTokenStore(path, passphrase)
+    except ImportError:
+        return None
+
+
+class TokenManager:
+    """Cached access token for one set of client credentials.
+
+    `store_key` identifies the credentials in the persistent store; derive it
+    from the client id (not the secret) so rotated credentials get a new entry.
+    """
+
+    def __init__(
+        self, fetch: TokenFetcher, store_key: str,
+        store: Optional[EncryptedTokenStore] = None, refresh_margin: float = 300.0,
+    ):
+        self.fetch = fetch
+        self.store_key = store_key
+        self.store = store
+        self.refresh_margin = refresh_margin
+        self._token = ""
+        self._expires_at = 0.0  # time.time()
+        self._refresh: Optional["asyncio.Future[str]"] = None
+        if store is not None:
+            cached = store.get(store_key)
+            if cached:
+                self._token, self._expires_at = cached
+
+    async def get(self) -> str:
+        """A valid token, refreshing first if it has expired."""
+        now = time.time()
+        if self._token and now < self._expires_at:
+            if now >= self._expires_at - self.refresh_margin:
+                self._start_refresh()  # Still valid: serve it, renew in the background
+            return self._token
+        return await asyncio.shield(self._start_refresh())
+
+    def invalidate(self, token: str) -> None:
+        """Forget `token` (e.g. after a 401), unless it was already replaced."""
+        if token and token == self._token:
+            self._token, self._expires_at = "", 0.0
+            if self.store is not None:
+                self.store.delete(self.store_key)
+
+    def _start_refresh(self) -> "asyncio.Future[str]":
+        loop = asyncio.get_running_loop()
+        refresh = self._refresh
+        # A refresh from a previous event loop (one asyncio.run() per CLI call) can't be awaited here
+        if refresh is None or refresh.done() or refresh.get_loop() is not loop:
+            refresh = loop.create_task(self._do_refresh())
+            # A failed background refresh is retried by the next get(); don't log it as unhandled
+            refresh.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._refresh = refresh
+        return refresh
+
+    async def _do_refresh(self) -> str:
+        token, expires_in = await self.fetch()
+        self._token = token
+        self._expires_at = time.time() + expires_in
+        if self.store is not None:
+            self.store.put(self.store_key, token, self._expires_at)
+        return token
@@ -2,6 +2,11 @@
 """
 Validate email enrichment API keys by making a lightweight test call to each provider.
 Uses a known test lookup (Tim Cook at Apple) to confirm authentication works.
+Also shows each provider's remaining budget this month from the CRM
+integration's credit ledger (email-credit-ledger.sqlite3 next to icp-prospects.md),
+and the order the waterfall will try the working providers in: with
+EMAIL_PROVIDER_ORDER=adaptive (the default) that is ranked from the ledger's
+hit-rate and latency stats, the same way the CRM integration's scheduler does.
 Exit code 0 if at least one provider passes, 1 if all fail or none configured.
 """
 
@@ -13,6 +18,10 @@ from pathlib import Path
 
 import httpx
 
+# Monthly credit ledger lives with the CRM integration
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "crm-integration"))
+from credit_ledger import CreditLedger, expected_cost_per_hit
+
 # Test data — public figure, high match rate
 TEST_FIRST = "Tim"
 TEST_LAST = "Cook"
@@ -110,6 +119,37 @@ async def validate_prospeo(api_key: str) -> tuple[bool, str]:
     return False, f"HTTP {resp.status_code}"
 
 
+def ledger_path(get_key) -> Path:
+    """Same default as hubspot_mcp: next to icp-prospects.md unless overridden."""
+    explicit = get_key("EMAIL_CREDIT_LEDGER_PATH")
+    if explicit:
+        return Path(explicit)
+    prospects = get_key("ICP_PROSPECTS_PATH") or str(
+        Path.home() / ".claude" / "skills" / "shared" / "logs" / "icp-prospects.md"
+    )
+    return Path(prospects).parent / "email-credit-ledger.sqlite3"
+
+
+def read_ledger(path: Path) -> tuple[dict, dict]:
+    """(credits used per provider this month, provider call stats); empty if no ledger yet."""
+    if not path.exists():
+        return {}, {}
+    ledger = CreditLedger(path)
+    try:
+        return ledger.usage(), ledger.provider_stats()
+    finally:
+        ledger.close()
+
+
+def provider_order(names: list, remaining: dict, stats: dict, mode: str, latency_weight: float) -> list:
+    """Providers in the order the waterfall tries them: registry order, or by expected cost per hit."""
+    if mode != "adaptive":
+        return [name for name in PROVIDERS if name in names]
+    max_limit = max(p["credits"] for p in PROVIDERS.values())
+    return sorted(names, key=lambda name: expected_cost_per_hit(
+        stats.get(name), remaining[name], max_limit, latency_weight))
+
+
 async def main():
     # Try loading keys from .mcp.json first, fall back to env vars
     mcp_json_path = Path(__file__).resolve().parent.parent / ".mcp.json"
@@ -189,11 +229,16 @@ async def main():
     else:
         results["Prospeo"] = (None, "not configured")
 
+    usage, stats = read_ledger(ledger_path(get_key))
+    remaining = {}
+
     # Display results
     for provider, (ok, msg) in results.items():
         credits = PROVIDERS[provider]["credits"]
         if ok is True:
-            print(f"  PASS  {provider} ({credits} credits/month) — {msg}")
+            left = max(0, credits - usage.get(provider, 0))
+            remaining[provider] = left
+            print(f"  PASS  {provider} ({left}/{credits} credits left this month) — {msg}")
         elif ok is False:
             print(f"  FAIL  {provider} — {msg}")
         else:
@@ -203,10 +248,21 @@ async def main():
     print("-" * 55)
 
     if active_count > 0:
-        print(f"  {active_count} provider(s) active | {total_credits} lookups/month")
+        print(f"  {active_count} provider(s) active | {total_credits} lookups/month | "
+              f"{sum(remaining.values())} left this month")
         print()
-        print("  Waterfall order: Apollo > Hunter > Snov.io > GetProspect > Prospeo")
-        print("  Each miss falls through to the next active provider.")
+        mode = (get_key("EMAIL_PROVIDER_ORDER") or "adaptive").strip().lower()
+        latency_weight = float(get_key("EMAIL_LATENCY_WEIGHT") or "0.1")
+        usable = [name for name, left in remaining.items() if left > 0]
+        order = provider_order(usable, remaining, stats, mode, latency_weight)
+        if mode == "adaptive":
+            print("  Waterfall order (adaptive — cheapest expected cost per found email first,")
+            print("  from this month's credits and the ledger's hit rate/latency stats):")
+        else:
+            print("  Waterfall order (fixed — registry order):")
+        print(f"    {' > '.join(order) if order else 'none (every active provider is out of credits)'}")
+        print("  Each miss falls through to the next active provider; Hunter and Snov.io")
+        print("  are skipped for prospects without a company domain.")
     else:
         print("  No providers configured or validated.")
         print()
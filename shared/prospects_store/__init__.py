@@ -0,0 +1,60 @@
+"""
+prospects_store — the one way to read and write icp-prospects.md.
+
+Shared by the CRM integration (hubspot_mcp.py, cli_sync.py), the Sheets sync
+(shared/scripts/sync-prospects-to-sheets.py) and, through its command line,
+shell scripts such as shared/scripts/check-contact.sh:
+
+- table: the streaming parser (iter_prospects), the indexed ProspectsTable
+  with its per-file parse cache (load_table), and the in-place writer
+  (write_updates);
+- dates: DDMon touch dates ("07Feb") resolved to real dates;
+- __main__: `python -m prospects_store` prints rows as JSON (or shell
+  assignments) and applies updates, so no script needs its own parser or
+  hard-coded column positions.
+
+Import it with shared/ on sys.path (what the scripts in this repo do), or
+install it: pip install -e shared
+"""
+
+import os
+from pathlib import Path
+
+from .dates import NO_DATE, epoch_day, hubspot_date_ms, parse_day_month, today_utc, touch_date
+from .table import (
+    ProspectRow,
+    ProspectsHeader,
+    ProspectsTable,
+    clear_table_cache,
+    iter_prospects,
+    iter_prospects_file,
+    load_table,
+    normalize_name,
+    normalize_url,
+    write_updates,
+)
+
+PROSPECTS_PATH = Path(os.environ.get(
+    "ICP_PROSPECTS_PATH",
+    str(Path.home() / ".claude" / "skills" / "shared" / "logs" / "icp-prospects.md"),
+))
+
+__all__ = [
+    "NO_DATE",
+    "PROSPECTS_PATH",
+    "ProspectRow",
+    "ProspectsHeader",
+    "ProspectsTable",
+    "clear_table_cache",
+    "epoch_day",
+    "hubspot_date_ms",
+    "iter_prospects",
+    "iter_prospects_file",
+    "load_table",
+    "normalize_name",
+    "normalize_url",
+    "parse_day_month",
+    "today_utc",
+    "touch_date",
+    "write_updates",
+]
@@ -0,0 +1,148 @@
+"""
+Command line for the prospects table, for shell scripts and quick checks.
+
+Usage (with shared/ on PYTHONPATH, or after pip install -e shared):
+    python -m prospects_store columns
+    python -m prospects_store find "Hsien Naidu"
+    python -m prospects_store find https://linkedin.com/in/x --by url
+    python -m prospects_store find "Hsien" --columns "Last Touch" Touches --format shell
+    python -m prospects_store list --where "Connection Status=pending"
+    python -m prospects_store update 42 --by number --set "Email=a@b.co" --fill-only
+
+Rows print as JSON objects keyed on column name, plus two computed fields:
+_line (line number in the file) and _days_since_last_touch (null without a
+Last Touch date). `--format shell` prints NAME='value' lines instead, one per
+requested column, for `eval` ("Last Touch" -> LAST_TOUCH). `find` exits 1
+when nothing matches; all commands exit 2 if the file is missing.
+"""
+
+import argparse
+import json
+import re
+import shlex
+import sys
+from pathlib import Path
+
+from . import PROSPECTS_PATH
+from .dates import today_utc, touch_date
+from .table import ProspectsTable, load_table, write_updates
+
+
+def row_record(row, today=None):
+    """A row as a JSON-ready dict: its cells plus _line and _days_since_last_touch."""
+    today = today or today_utc()
+    record = {column: row[column] for column in row.header.columns}
+    touched = touch_date(row.get("Last Touch", ""), today)
+    record["_line"] = row.line_no
+    record["_days_since_last_touch"] = (today - touched).days if touched else None
+    return record
+
+
+def shell_name(column):
+    """Shell variable name for a column: "Last Touch" -> LAST_TOUCH, "#" -> NUMBER."""
+    return re.sub(r"\W+", "_", column).strip("_").upper() or "NUMBER"
+
+
+def _select(record, columns):
+    if not columns:
+        return record
+    missing = [c for c in columns if c not in record]
+    if missing:
+        raise SystemExit(f"Unknown column(s): {', '.join(missing)}")
+    return {c: record[c] for c in columns}
+
+
+def _emit(records, fmt, many):
+    if fmt == "shell":
+        for column, value in records[0].items():
+            print(f"{shell_name(column)}={shlex.quote('' if value is None else str(value))}")
+    else:
+        print(json.dumps(records if many else records[0], ensure_ascii=False, indent=2))
+
+
+def _find(table, query, by):
+    if by == "url":
+        row = table.find_by_url(query)
+    elif by == "number":
+        row = table.find_by_number(query)
+    else:
+        row = table.find_by_name(query)
+    return [row] if row is not None else []
+
+
+def _parse_pairs(pairs, option):
+    parsed = {}
+    for pair in pairs:
+        column, sep, value = pair.partition("=")
+        if not sep:
+            raise SystemExit(f"{option} expects COLUMN=VALUE, got {pair!r}")
+        parsed[column.strip()] = value.strip()
+    return parsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="prospects_store", description="Read and update icp-prospects.md")
+    parser.add_argument("--file", type=Path, default=PROSPECTS_PATH,
+                        help="Prospects table (default: ICP_PROSPECTS_PATH or ~/.claude/skills/shared/logs/icp-prospects.md)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("columns", help="List the table's columns")
+
+    find = sub.add_parser("find", help="One row by name (exact, else partial), Profile URL or #")
+    find.add_argument("query")
+    find.add_argument("--by", choices=("name", "url", "number"), default="name")
+
+    listing = sub.add_parser("list", help="All rows, optionally filtered")
+    listing.add_argument("--where", action="append", default=[], metavar="COLUMN=VALUE",
+                         help="Keep rows whose cell equals VALUE (case-insensitive); repeatable")
+
+    for command in (find, listing):
+        command.add_argument("--columns", nargs="+", metavar="COLUMN", help="Only these columns (and computed fields)")
+    find.add_argument("--format", choices=("json", "shell"), default="json",
+                      help="shell: NAME='value' lines for eval")
+
+    update = sub.add_parser("update", help="Set cells of one row, matched by Profile URL or #")
+    update.add_argument("key")
+    update.add_argument("--by", choices=("url", "number"), default="url")
+    update.add_argument("--set", action="append", required=True, metavar="COLUMN=VALUE", dest="changes")
+    update.add_argument("--fill-only", action="store_true", help="Only fill empty or '-' cells")
+
+    args = parser.parse_args(argv)
+    if not args.file.exists():
+        print(f"ERROR: Prospects file not found: {args.file}", file=sys.stderr)
+        return 2
+
+    if args.command == "update":
+        changes = _parse_pairs(args.changes, "--set")
+        key_column = "Profile URL" if args.by == "url" else "#"
+        try:
+            updated, not_found = write_updates(args.file, {args.key: changes}, key_column, overwrite=not args.fill_only)
+        except KeyError as e:
+            print(f"ERROR: Unknown column: {e.args[0]}", file=sys.stderr)
+            return 2
+        print(json.dumps({"updated": updated, "not_found": not_found}))
+        return 0 if not not_found else 1
+
+    table: ProspectsTable = load_table(args.file)
+    if args.command == "columns":
+        print(json.dumps(list(table.columns), ensure_ascii=False))
+        return 0
+
+    if args.command == "find":
+        rows = _find(table, args.query, args.by)
+    else:
+        where = {column: value.casefold() for column, value in _parse_pairs(args.where, "--where").items()}
+        unknown = [c for c in where if c not in table.columns]
+        if unknown:
+            raise SystemExit(f"Unknown column(s): {', '.join(unknown)}")
+        rows = [row for row in table if all(row.get(c, "").strip().casefold() == v for c, v in where.items())]
+    today = today_utc()
+    records = [_select(row_record(row, today), args.columns) for row in rows]
+    if args.command == "find" and not records:
+        return 1
+    _emit(records, getattr(args, "format", "json"), many=args.command == "list")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
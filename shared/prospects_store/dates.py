@@ -0,0 +1,79 @@
+"""
+The DDMon dates of icp-prospects.md ("07Feb", "23Jan 17:45"), parsed once.
+
+The table stores day and month only; the year is inferred as the most recent
+such date that isn't after today (UTC), so "28Dec" read on 3 Jan is last year.
+Every consumer (HubSpot sync, eligibility filters, the compiled snapshot, the
+prospects_store CLI) goes through this module.
+
+- parse_day_month() is LRU-memoized: a table has only a few hundred distinct
+  values, so each is matched once per process.
+- touch_date() resolves the year against `today`, also memoized.
+- epoch_days() converts a whole column in one pass, taking "today" once so
+  every row of a run is resolved against the same date.
+"""
+
+import re
+from datetime import date, datetime, timezone
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+EPOCH = date(1970, 1, 1)
+NO_DATE = -1  # epoch_day() of a missing or unparseable value
+MONTHS = {m: i for i, m in enumerate(
+    ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), start=1
+)}
+DATE_PATTERN = re.compile(r"(\d{1,2})([A-Za-z]{3})")
+
+
+def today_utc() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+@lru_cache(maxsize=2048)
+def parse_day_month(value: str) -> Optional[Tuple[int, int]]:
+    """(month, day) of '07Feb' or '23Jan 17:45'; None for '-', '' or anything else."""
+    match = DATE_PATTERN.match((value or "").strip())
+    if not match:
+        return None
+    month = MONTHS.get(match.group(2).lower())
+    return (month, int(match.group(1))) if month else None
+
+
+@lru_cache(maxsize=4096)
+def _resolve(value: str, today: date) -> Optional[date]:
+    parsed = parse_day_month(value)
+    if parsed is None:
+        return None
+    month, day = parsed
+    try:
+        resolved = date(today.year, month, day)
+        if resolved > today:
+            resolved = resolved.replace(year=today.year - 1)
+    except ValueError:  # 30Feb, or 29Feb rolled back into a non-leap year
+        return None
+    return resolved
+
+
+def touch_date(value: str, today: Optional[date] = None) -> Optional[date]:
+    """The date a DDMon value refers to, as of `today` (default: today in UTC)."""
+    return _resolve(value or "", today or today_utc())
+
+
+def epoch_day(value: str, today: Optional[date] = None) -> int:
+    """Days since 1970-01-01 of a DDMon value, or NO_DATE."""
+    resolved = touch_date(value, today)
+    return (resolved - EPOCH).days if resolved else NO_DATE
+
+
+def epoch_days(values: Iterable[str], today: Optional[date] = None) -> List[int]:
+    """epoch_day() for a whole column, with one reference date for all of it."""
+    today = today or today_utc()
+    resolved = (_resolve(value or "", today) for value in values)
+    return [(d - EPOCH).days if d else NO_DATE for d in resolved]
+
+
+def hubspot_date_ms(value: str, today: Optional[date] = None) -> Optional[str]:
+    """A DDMon value as HubSpot expects date properties: midnight UTC in milliseconds."""
+    day = epoch_day(value, today)
+    return str(day * 86400 * 1000) if day != NO_DATE else None
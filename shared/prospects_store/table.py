@@ -0,0 +1,369 @@
+"""
+Streaming, indexed parser and writer for the icp-prospects.md markdown table.
+
+- iter_prospects() is a generator over lines: it yields rows as they are
+  parsed and stops at the end of the table, so nothing after it is read.
+- ProspectRow is a compact __slots__ row (a cell list plus a shared header
+  index) that reads like a dict: row["Name"], row.get("Email", "-").
+- ProspectsTable adds O(1) lookups by Profile URL, normalized name and row #.
+- load_table() caches the parsed table per path until the file changes, for
+  long-lived processes like the MCP server.
+- write_updates() applies a batch of cell updates in one pass, rewriting only
+  the touched cells, atomically and under a file lock.
+"""
+
+import hashlib
+import os
+import tempfile
+import time
+from collections.abc import Mapping
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+PIPE_PLACEHOLDER = "\x00PIPE\x00"
+
+
+class ProspectsHeader:
+    """Column names plus a name -> position index, shared by every row."""
+
+    __slots__ = ("columns", "positions")
+
+    def __init__(self, columns: List[str]):
+        self.columns: Tuple[str, ...] = tuple(columns)
+        self.positions: Dict[str, int] = {name: i for i, name in enumerate(self.columns)}
+
+
+class ProspectRow(Mapping):
+    """One table row. Reads like a dict keyed on column name.
+
+    Assigning to a key that isn't a column (e.g. "_note") keeps
+    it alongside the row without changing the table's columns.
+    """
+
+    __slots__ = ("header", "cells", "line_no", "_extra")
+
+    def __init__(self, header: ProspectsHeader, cells: List[str], line_no: int = 0):
+        self.header = header
+        self.cells = cells
+        self.line_no = line_no
+        self._extra: Optional[Dict[str, str]] = None
+
+    def __getitem__(self, key: str) -> str:
+        pos = self.header.positions.get(key)
+        if pos is not None:
+            return self.cells[pos]
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: str) -> None:
+        pos = self.header.positions.get(key)
+        if pos is not None:
+            self.cells[pos] = value
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.header.columns
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return len(self.header.columns) + (len(self._extra) if self._extra else 0)
+
+    def __repr__(self) -> str:
+        return f"ProspectRow({self.get('#', '?')!r}, {self.get('Name', '')!r})"
+
+
+def split_row(line: str) -> List[str]:
+    """Split a markdown table line into cells, honouring escaped pipes (\\|)."""
+    safe_line = line.strip().replace("\\|", PIPE_PLACEHOLDER)
+    cells = [c.strip().replace(PIPE_PLACEHOLDER, "|") for c in safe_line.split("|")]
+    # Remove empty first/last from leading/trailing pipes
+    return cells[1:-1] if len(cells) > 2 else cells
+
+
+def _is_separator(cells: List[str]) -> bool:
+    return all(c.replace("-", "").replace(":", "").strip() == "" for c in cells)
+
+
+def iter_prospects(lines: Iterable[str]) -> Iterator[ProspectRow]:
+    """Yield rows of the prospects table (the first table with # and Name columns).
+
+    Escaped pipes in any column are kept as literal "|". Extra unescaped pipes
+    are folded into the last column; rows with too few cells are dropped.
+    """
+    header: Optional[ProspectsHeader] = None
+    width = 0
+
+    for line_no, line in enumerate(lines, start=1):
+        stripped = line.strip()
+        if not stripped.startswith("|"):
+            if header is not None:
+                return  # End of table
+            continue
+
+        cells = split_row(stripped)
+        if header is None:
+            if "#" in cells and "Name" in cells:
+                header = ProspectsHeader(cells)
+                width = len(cells)
+            continue
+
+        if _is_separator(cells):
+            continue
+        # Handle any remaining overflow (extra unescaped pipes)
+        if len(cells) > width:
+            cells = cells[:width - 1] + [" | ".join(cells[width - 1:])]
+        if len(cells) == width:
+            yield ProspectRow(header, cells, line_no)
+
+
+def iter_prospects_file(path: Path) -> Iterator[ProspectRow]:
+    """Stream rows straight from a file without reading it all into memory."""
+    with open(path, "r", encoding="utf-8") as f:
+        yield from iter_prospects(f)
+
+
+def normalize_name(name: str) -> str:
+    """Lookup key for a person's name: case-folded, whitespace collapsed."""
+    return " ".join(name.split()).casefold()
+
+
+def normalize_url(url: str) -> str:
+    """Lookup key for a LinkedIn profile URL."""
+    return url.strip().lower()
+
+
+class ProspectsTable:
+    """Parsed rows plus secondary indexes by Profile URL, name and row #.
+
+    When two rows share a key, the first row in file order wins, matching the
+    old linear-scan behaviour.
+    """
+
+    def __init__(self, rows: Iterable[ProspectRow]):
+        self.rows: List[ProspectRow] = []
+        self.header: Optional[ProspectsHeader] = None
+        self.by_url: Dict[str, ProspectRow] = {}
+        self.by_name: Dict[str, ProspectRow] = {}
+        self.by_number: Dict[str, ProspectRow] = {}
+        for row in rows:
+            self.rows.append(row)
+            self.header = row.header
+            url = row.get("Profile URL", "")
+            if url and url != "TBD":
+                self.by_url.setdefault(normalize_url(url), row)
+            name = row.get("Name", "")
+            if name:
+                self.by_name.setdefault(normalize_name(name), row)
+            number = row.get("#", "").strip()
+            if number:
+                self.by_number.setdefault(number, row)
+
+    @classmethod
+    def from_text(cls, content: str) -> "ProspectsTable":
+        return cls(iter_prospects(content.splitlines()))
+
+    @classmethod
+    def from_file(cls, path: Path) -> "ProspectsTable":
+        return cls(iter_prospects_file(path))
+
+    @property
+    def columns(self) -> Tuple[str, ...]:
+        return self.header.columns if self.header else ()
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __iter__(self) -> Iterator[ProspectRow]:
+        return iter(self.rows)
+
+    def find_by_url(self, url: str) -> Optional[ProspectRow]:
+        return self.by_url.get(normalize_url(url))
+
+    def find_by_number(self, number: str) -> Optional[ProspectRow]:
+        return self.by_number.get(str(number).strip())
+
+    def find_by_name(self, name: str) -> Optional[ProspectRow]:
+        """Exact (case-insensitive) name match in O(1), else first partial match."""
+        key = normalize_name(name)
+        row = self.by_name.get(key)
+        if row is not None or not key:
+            return row
+        for row in self.rows:
+            if key in row.get("Name", "").casefold():
+                return row
+        return None
+
+
+# path -> ((mtime_ns, size), content sha1 or None, table)
+_table_cache: Dict[str, Tuple[Tuple[int, int], Optional[str], ProspectsTable]] = {}
+
+
+def load_table(path: Path, verify_content: bool = False) -> ProspectsTable:
+    """Parse `path`, reusing the previous parse while the file is unchanged.
+
+    The cache key is (path, mtime_ns, size). With verify_content, the bytes
+    are also hashed: that catches same-size rewrites within the filesystem's
+    mtime resolution, and lets a touched-but-identical file keep its parse.
+    The returned table is shared between callers; treat it as read-only.
+    """
+    key = str(Path(path).resolve())
+    st = os.stat(key)
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _table_cache.get(key)
+
+    if not verify_content:
+        if cached and cached[0] == stamp:
+            return cached[2]
+        table = ProspectsTable.from_file(Path(key))
+        _table_cache[key] = (stamp, None, table)
+        return table
+
+    data = Path(key).read_bytes()
+    digest = hashlib.sha1(data).hexdigest()
+    if cached and cached[1] == digest:
+        _table_cache[key] = (stamp, digest, cached[2])
+        return cached[2]
+    table = ProspectsTable.from_text(data.decode("utf-8"))
+    _table_cache[key] = (stamp, digest, table)
+    return table
+
+
+def clear_table_cache() -> None:
+    _table_cache.clear()
+
+
+# ─── Writeback ───
+
+EMPTY_CELLS = ("", "-")
+
+
+@contextmanager
+def file_lock(path: Path, timeout: float = 30.0) -> Iterator[None]:
+    """Exclusive advisory lock on `<path>.lock`, shared by every writer of `path`."""
+    lock_path = Path(path).with_name(Path(path).name + ".lock")
+    with open(lock_path, "a+b") as f:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+                break
+            except OSError:
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"Timed out waiting for lock on {path}")
+                time.sleep(0.05)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def escape_cell(value: str) -> str:
+    """Cell text safe to put between pipes: one line, literal pipes escaped."""
+    value = " ".join(str(value).splitlines()).strip()
+    return value.replace("\\|", "|").replace("|", "\\|")
+
+
+def _pipe_positions(line: str) -> List[int]:
+    """Offsets of the unescaped pipes in a table line."""
+    return [i for i, ch in enumerate(line) if ch == "|" and (i == 0 or line[i - 1] != "\\")]
+
+
+def replace_cells(line: str, width: int, changes: Dict[int, str]) -> str:
+    """Rewrite cells `changes` ({column position: value}) of one table line.
+
+    Everything else on the line — padding, other cells, escaped pipes, the
+    line ending — is kept byte for byte. As in iter_prospects(), extra
+    unescaped pipes belong to the last column.
+    """
+    pipes = _pipe_positions(line)
+    pieces = []
+    last = 0
+    for pos in sorted(changes):
+        start = pipes[pos]
+        end = pipes[-1] if pos == width - 1 else pipes[pos + 1]
+        pieces.append(line[last:start + 1])
+        pieces.append(f" {escape_cell(changes[pos])} ")
+        last = end
+    pieces.append(line[last:])
+    return "".join(pieces)
+
+
+def write_updates(
+    path: Path,
+    updates: Mapping,
+    key_column: str = "Profile URL",
+    overwrite: bool = True,
+    lock_timeout: float = 30.0,
+) -> Tuple[int, List[str]]:
+    """Apply {key: {column: value}} to the prospects table at `path` in one pass.
+
+    Keys are matched on `key_column` — "Profile URL" (normalized like
+    ProspectsTable.by_url) or "#". With overwrite=False, only empty or "-"
+    cells are filled, so a value written concurrently by someone else wins.
+    The file is re-read under file_lock() and replaced atomically (temp file
+    + rename); only the updated cells change. Unknown columns raise KeyError.
+
+    Returns (rows updated, keys not found).
+    """
+    path = Path(path)
+
+    def normalize_key(value: str) -> str:
+        return normalize_url(value) if key_column == "Profile URL" else str(value).strip()
+
+    pending = {normalize_key(k): (k, cols) for k, cols in updates.items()}
+    if not pending:
+        return 0, []
+
+    with file_lock(path, lock_timeout):
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            lines = f.readlines()
+
+        updated = 0
+        for row in iter_prospects(lines):
+            entry = pending.pop(normalize_key(row.get(key_column, "")), None)
+            if entry is None:
+                continue
+            changes = {}
+            for column, value in entry[1].items():
+                pos = row.header.positions[column]
+                if row.cells[pos] == escape_cell(value).replace("\\|", "|"):
+                    continue
+                if overwrite or row.cells[pos].strip() in EMPTY_CELLS:
+                    changes[pos] = value
+            if changes:
+                lines[row.line_no - 1] = replace_cells(lines[row.line_no - 1], len(row.header.columns), changes)
+                updated += 1
+            if not pending:
+                break
+
+        if updated:
+            fd, tmp = tempfile.mkstemp(prefix=f".{path.stem}-", dir=path.parent)
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+                    f.writelines(lines)
+                os.replace(tmp, path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+
+    return updated, [original for original, _ in pending.values()]
@@ -3,6 +3,13 @@
 # Usage: ./check-contact.sh "Contact Name"
 
 CONTACT_NAME="$1"
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+
+# icp-prospects.md is read through shared/prospects_store (JSON / shell-variable output)
+prospects_store() {
+    PYTHONPATH="$SCRIPT_DIR/..${PYTHONPATH:+:$PYTHONPATH}" python3 -m prospects_store \
+        --file "../logs/icp-prospects.md" "$@"
+}
 
 if [ -z "$CONTACT_NAME" ]; then
     echo "Usage: ./check-contact.sh \"Contact Name\""
@@ -58,26 +65,23 @@ fi
 
 # STEP 3: ICP Prospects Check (Engagement Gap Rules)
 echo "Step 3: Checking ICP Prospects for engagement rules..."
-PROSPECT_RESULT=$(grep -i "$CONTACT_NAME" "../logs/icp-prospects.md" 2>/dev/null)
+PROSPECT_RESULT=$(prospects_store find "$CONTACT_NAME" 2>/dev/null)
 
 if [ ! -z "$PROSPECT_RESULT" ]; then
     echo "✅ FOUND IN ICP PROSPECTS"
     echo "$PROSPECT_RESULT"
     echo ""
 
-    # Extract key fields (assuming CSV-like format with | delimiter)
-    LAST_TOUCH=$(echo "$PROSPECT_RESULT" | awk -F'|' '{print $9}' | xargs)
-    TOUCHES=$(echo "$PROSPECT_RESULT" | awk -F'|' '{print $8}' | xargs)
-    CONNECTION_STATUS=$(echo "$PROSPECT_RESULT" | awk -F'|' '{print $11}' | xargs)
+    # Key fields by column name, whatever their position in the table
+    eval "$(prospects_store find "$CONTACT_NAME" --format shell \
+        --columns "Last Touch" Touches "Connection Status" _days_since_last_touch)"
 
-    echo "Last Touch: $LAST_TOUCH"
+    echo "Last Touch: $LAST_TOUCH${DAYS_SINCE_LAST_TOUCH:+ ($DAYS_SINCE_LAST_TOUCH days ago)}"
     echo "Touches: $TOUCHES"
     echo "Connection Status: $CONNECTION_STATUS"
     echo ""
 
-    # Note: Date comparison would require more complex logic
-    # For now, just display the data for manual decision
-    echo "⚠️ CHECK GAP RULES MANUALLY:"
+    echo "⚠️ CHECK GAP RULES:"
     echo "  - If Connected + Last Touch < 7 days → SKIP"
     echo "  - If Warming + Last Touch < 3 days → SKIP"
     echo "  - Otherwise → OK to engage"
@@ -0,0 +1,283 @@
+"""
+Deduplicated, delta-compressed backups of icp-prospects.md snapshots.
+
+Replaces the one-full-CSV-per-sync backups (icp-prospects_YYYYMMDDHHMM.csv).
+Each snapshot is hashed (SHA-256 of its CSV form):
+
+- if it matches the latest snapshot, nothing is written;
+- if it matches an older one (a revert), the index points at the existing
+  object and nothing new is stored;
+- otherwise it is stored as a gzipped row-level delta against the current
+  base snapshot (changed/added rows plus the row order), or as a new gzipped
+  base when too much changed for a delta to pay off.
+
+Restoring any version reads at most one base and one delta. Retention keeps
+every snapshot from the last KEEP_ALL_DAYS days, then one per day up to
+KEEP_DAILY_DAYS, and compact() deletes objects nothing refers to. Each sync
+stores its snapshot and then runs compact_if_due(), so retention applies at
+most once per COMPACT_INTERVAL without anyone running `compact` by hand.
+
+Layout of the backup directory:
+    index.json           snapshot list: id (YYYYMMDDHHMMSS), content hash, row count;
+                         plus when compact() last ran
+    objects/<hash>.gz    base CSV or JSON delta, named by snapshot hash
+
+Usage:
+    python shared/scripts/prospect_backups.py list
+    python shared/scripts/prospect_backups.py restore latest -o restored.csv
+    python shared/scripts/prospect_backups.py restore 20261018153000
+    python shared/scripts/prospect_backups.py compact
+    python shared/scripts/prospect_backups.py import [--delete]   # legacy icp-prospects_*.csv
+"""
+import argparse
+import csv
+import gzip
+import hashlib
+import io
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+INDEX_VERSION = 1
+ID_FORMAT = "%Y%m%d%H%M%S"
+KEEP_ALL_DAYS = 14
+KEEP_DAILY_DAYS = 90
+COMPACT_INTERVAL = timedelta(days=1)
+REBASE_FRACTION = 0.3  # store a new base once a delta would carry this share of the rows
+DEFAULT_BACKUP_DIR = Path(__file__).resolve().parent.parent / "logs" / "backups"
+
+
+def to_csv(headers, rows):
+    """The canonical CSV text of a snapshot (what restore writes back out)."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(headers)
+    writer.writerows(rows)
+    return buf.getvalue()
+
+
+def from_csv(text):
+    reader = csv.reader(io.StringIO(text))
+    rows = list(reader)
+    return (rows[0], rows[1:]) if rows else ([], [])
+
+
+def row_keys(headers, rows):
+    """Per-row delta keys: Profile URL, else #; None if they aren't unique."""
+    url_col = headers.index("Profile URL") if "Profile URL" in headers else None
+    num_col = headers.index("#") if "#" in headers else None
+    keys = []
+    for row in rows:
+        url = row[url_col].strip().lower() if url_col is not None and url_col < len(row) else ""
+        if url and url != "tbd":
+            keys.append("url:" + url)
+        else:
+            keys.append("#:" + (row[num_col].strip() if num_col is not None and num_col < len(row) else ""))
+    return keys if len(set(keys)) == len(keys) else None
+
+
+def _atomic_write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}-", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+class BackupStore:
+    """Snapshots of the prospects table in `directory` (see module docstring)."""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.objects = self.directory / "objects"
+        self.index_path = self.directory / "index.json"
+        self.snapshots = []
+        self.compacted = None  # id-format time of the last compact()
+        if self.index_path.exists():
+            data = json.loads(self.index_path.read_text(encoding="utf-8"))
+            if data.get("version") == INDEX_VERSION:
+                self.snapshots = data["snapshots"]
+                self.compacted = data.get("compacted")
+
+    def _save_index(self):
+        data = {"version": INDEX_VERSION, "snapshots": self.snapshots, "compacted": self.compacted}
+        _atomic_write(self.index_path, json.dumps(data, indent=1).encode("utf-8"))
+
+    def _object_path(self, digest):
+        return self.objects / f"{digest}.gz"
+
+    def _read_object(self, digest):
+        return json.loads(gzip.decompress(self._object_path(digest).read_bytes()))
+
+    def _write_object(self, digest, obj):
+        path = self._object_path(digest)
+        if not path.exists():
+            _atomic_write(path, gzip.compress(json.dumps(obj, separators=(",", ":")).encode("utf-8")))
+
+    def _base_digest(self):
+        """Hash of the base that new deltas are taken against (the latest snapshot's base)."""
+        if not self.snapshots:
+            return None
+        latest = self._read_object(self.snapshots[-1]["hash"])
+        return self.snapshots[-1]["hash"] if latest["kind"] == "base" else latest["base"]
+
+    def save(self, headers, rows, when=None):
+        """Record a snapshot. Returns (snapshot id, stored) — stored is False if unchanged."""
+        text = to_csv(headers, rows)
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        if self.snapshots and self.snapshots[-1]["hash"] == digest:
+            return self.snapshots[-1]["id"], False
+
+        if not self._object_path(digest).exists():
+            self._write_object(digest, self._encode(headers, rows, text))
+        when = when or datetime.now()
+        if self.snapshots:
+            # Keep ids unique and ordered, even for two saves within a second
+            when = max(when, datetime.strptime(self.snapshots[-1]["id"], ID_FORMAT) + timedelta(seconds=1))
+        snapshot_id = when.strftime(ID_FORMAT)
+        self.snapshots.append({"id": snapshot_id, "hash": digest, "rows": len(rows)})
+        self._save_index()
+        return snapshot_id, True
+
+    def _encode(self, headers, rows, text):
+        """A delta against the current base when it's small enough, else a new base."""
+        base_digest = self._base_digest()
+        keys = row_keys(headers, rows)
+        if base_digest and keys is not None:
+            base_headers, base_rows = self._decode(base_digest)
+            base_keys = row_keys(base_headers, base_rows)
+            if base_headers == headers and base_keys is not None:
+                base_by_key = dict(zip(base_keys, base_rows))
+                changed = {k: r for k, r in zip(keys, rows) if base_by_key.get(k) != r}
+                if len(changed) <= REBASE_FRACTION * max(len(rows), 1):
+                    return {"kind": "delta", "base": base_digest, "order": keys, "rows": changed}
+        return {"kind": "base", "csv": text}
+
+    def _decode(self, digest):
+        obj = self._read_object(digest)
+        if obj["kind"] == "base":
+            return from_csv(obj["csv"])
+        headers, base_rows = from_csv(self._read_object(obj["base"])["csv"])
+        base_by_key = dict(zip(row_keys(headers, base_rows), base_rows))
+        changed = obj["rows"]
+        return headers, [changed[k] if k in changed else base_by_key[k] for k in obj["order"]]
+
+    def find(self, ref):
+        """Snapshot by id, id prefix, hash prefix or 'latest'."""
+        if not self.snapshots:
+            return None
+        if ref == "latest":
+            return self.snapshots[-1]
+        for snap in reversed(self.snapshots):
+            if snap["id"].startswith(ref) or snap["hash"].startswith(ref):
+                return snap
+        return None
+
+    def restore(self, ref):
+        """CSV text of a stored snapshot."""
+        snap = self.find(ref)
+        if snap is None:
+            raise KeyError(f"No backup matching {ref!r}")
+        return to_csv(*self._decode(snap["hash"]))
+
+    def compact(self, now=None):
+        """Apply retention, then delete objects no snapshot (or delta) needs. Returns counts."""
+        now = now or datetime.now()
+        kept, seen_days = [], set()
+        for snap in reversed(self.snapshots):
+            taken = datetime.strptime(snap["id"], ID_FORMAT)
+            age = now - taken
+            day = snap["id"][:8]
+            if snap is self.snapshots[-1] or age <= timedelta(days=KEEP_ALL_DAYS):
+                kept.append(snap)
+            elif age <= timedelta(days=KEEP_DAILY_DAYS) and day not in seen_days:
+                kept.append(snap)  # Latest snapshot of that day
+            seen_days.add(day)
+        dropped = len(self.snapshots) - len(kept)
+        self.snapshots = list(reversed(kept))
+        self.compacted = now.strftime(ID_FORMAT)
+        self._save_index()
+
+        needed = set()
+        for snap in self.snapshots:
+            needed.add(snap["hash"])
+            obj = self._read_object(snap["hash"])
+            if obj["kind"] == "delta":
+                needed.add(obj["base"])
+        removed = 0
+        for path in self.objects.glob("*.gz"):
+            if path.name[:-3] not in needed:
+                path.unlink()
+                removed += 1
+        return {"snapshots_dropped": dropped, "objects_removed": removed}
+
+    def compact_if_due(self, now=None):
+        """compact() unless it already ran within COMPACT_INTERVAL; returns its counts, or None."""
+        now = now or datetime.now()
+        if self.compacted and now - datetime.strptime(self.compacted, ID_FORMAT) < COMPACT_INTERVAL:
+            return None
+        return self.compact(now)
+
+    def import_legacy(self, delete=False):
+        """Ingest old icp-prospects_YYYYMMDDHHMM.csv backups, oldest first."""
+        imported = 0
+        for path in sorted(self.directory.glob("icp-prospects_*.csv")):
+            stamp = path.stem.split("_", 1)[1]
+            try:
+                when = datetime.strptime(stamp, "%Y%m%d%H%M")
+            except ValueError:
+                continue
+            if self.snapshots and self.snapshots[-1]["id"] >= when.strftime(ID_FORMAT):
+                continue  # Older than the store's history (or already imported): leave it alone
+            headers, rows = from_csv(path.read_text(encoding="utf-8"))
+            self.save(headers, rows, when)
+            imported += 1
+            if delete:
+                path.unlink()
+        return imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description="icp-prospects.md backup store")
+    parser.add_argument("--dir", default=os.environ.get("ICP_BACKUP_DIR", str(DEFAULT_BACKUP_DIR)),
+                        help="Backup directory (default: shared/logs/backups or ICP_BACKUP_DIR)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="List stored snapshots")
+    restore = sub.add_parser("restore", help="Write a snapshot back out as CSV")
+    restore.add_argument("ref", help="Snapshot id (or prefix), hash prefix, or 'latest'")
+    restore.add_argument("-o", "--output", help="Output CSV path (default: stdout)")
+    sub.add_parser("compact", help="Apply retention and delete unreferenced objects")
+    legacy = sub.add_parser("import", help="Import legacy icp-prospects_*.csv backups")
+    legacy.add_argument("--delete", action="store_true", help="Delete the legacy files once imported")
+    args = parser.parse_args()
+
+    store = BackupStore(args.dir)
+    if args.command == "list":
+        for snap in store.snapshots:
+            print(f"{snap['id']}  {snap['hash'][:12]}  {snap['rows']} rows")
+    elif args.command == "restore":
+        try:
+            text = store.restore(args.ref)
+        except KeyError as e:
+            print(f"ERROR: {e.args[0]}", file=sys.stderr)
+            sys.exit(1)
+        if args.output:
+            Path(args.output).write_text(text, encoding="utf-8", newline="")
+        else:
+            sys.stdout.write(text)
+    elif args.command == "compact":
+        result = store.compact()
+        print(f"Dropped {result['snapshots_dropped']} snapshots, removed {result['objects_removed']} objects")
+    elif args.command == "import":
+        print(f"Imported {store.import_legacy(args.delete)} legacy backups")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+Chunked, retrying, resumable upload of a Sheets batch_update plan.
+
+sync-prospects-to-sheets.py plans a list of batch_update requests (row
+deletes, grid growth, formatting, cell writes). Sent as one call, a large
+table hits payload limits and timeouts, and one failure loses the whole
+sync. upload() instead:
+
+- splits updateCells requests into ranges of at most `batch_cells` cells and
+  groups requests into batches of that size;
+- sends the structural batch (deletes, grid growth, formatting) first and on
+  its own, since row indices in the writes depend on it;
+- sends the write batches with bounded concurrency. They target fixed cell
+  ranges, so they are independent and safe to repeat;
+- retries each write batch with exponential backoff and jitter on rate
+  limits (HTTP 429), server errors (5xx) and network errors;
+- records every committed batch in a checkpoint file. An interrupted sync
+  resumes from the checkpoint when the source snapshot is unchanged, so it
+  neither re-reads the sheet nor re-sends what already landed.
+
+The structural batch is not idempotent (a row delete repeated deletes more
+rows), so it is only retried when the server answered 429/5xx, i.e. the
+batch was rejected. On a network error its outcome isn't known: it is not
+resent, and the checkpoint is discarded so the next run re-plans from the
+sheet as it actually is.
+"""
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from pathlib import Path
+
+CHECKPOINT_VERSION = 1
+CHECKPOINT_MAX_AGE = timedelta(hours=24)  # Older plans are re-made: the sheet may have been edited since
+BATCH_CELLS = 20000
+CONCURRENCY = 4
+RETRIES = 5
+BACKOFF_BASE = 1.0  # seconds; doubles per attempt, plus up to 100% jitter
+BACKOFF_MAX = 60.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+STRUCTURAL_KINDS = {"deleteDimension", "appendDimension", "repeatCell", "updateSheetProperties"}
+
+
+def _cells(request):
+    body = request.get("updateCells")
+    return sum(len(r["values"]) for r in body["rows"]) if body else 1
+
+
+def split_request(request, batch_cells):
+    """An updateCells request as several, each within batch_cells; others unchanged."""
+    body = request.get("updateCells")
+    if not body or _cells(request) <= batch_cells:
+        return [request]
+    width = max(len(r["values"]) for r in body["rows"]) or 1
+    step = max(1, batch_cells // width)
+    start = body["start"]
+    return [
+        {"updateCells": dict(body, rows=body["rows"][i:i + step],
+                             start=dict(start, rowIndex=start["rowIndex"] + i))}
+        for i in range(0, len(body["rows"]), step)
+    ]
+
+
+def plan_batches(requests, batch_cells=BATCH_CELLS):
+    """(structural requests, [write batches]) for a batch_update plan.
+
+    Structural requests keep their order and go out as one batch before any
+    writes; writes are split and packed into batches of at most batch_cells.
+    """
+    structural = [r for r in requests if next(iter(r)) in STRUCTURAL_KINDS]
+    batches, current, size = [], [], 0
+    for request in requests:
+        if next(iter(request)) in STRUCTURAL_KINDS:
+            continue
+        for part in split_request(request, batch_cells):
+            cells = _cells(part)
+            if current and size + cells > batch_cells:
+                batches.append(current)
+                current, size = [], 0
+            current.append(part)
+            size += cells
+    if current:
+        batches.append(current)
+    return structural, batches
+
+
+def is_retryable(error):
+    """Rate limits, server errors and network failures (requests' errors are OSErrors)."""
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    if status is not None:
+        return status in RETRY_STATUSES
+    return isinstance(error, (OSError, TimeoutError))
+
+
+def outcome_known(error):
+    """True if the server answered, so a failed batch_update was not applied (batches are atomic)."""
+    return getattr(getattr(error, "response", None), "status_code", None) is not None
+
+
+def is_rejected_retryable(error):
+    """Retryable and known not to have been applied: a 429/5xx answer, not a network error."""
+    return outcome_known(error) and is_retryable(error)
+
+
+def send_with_retry(send, requests, retries=RETRIES, sleep=time.sleep, retry_if=is_retryable):
+    """send(requests), retried with exponential backoff while retry_if(error) holds.
+
+    Always makes at least one attempt, whatever retries is.
+    """
+    retries = max(0, retries)
+    for attempt in range(retries + 1):
+        try:
+            return send(requests)
+        except Exception as e:
+            if attempt == retries or not retry_if(e):
+                raise
+            sleep(min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt) * (1 + random.random()))
+
+
+class Checkpoint:
+    """Progress of one upload plan, in a JSON file next to the logs."""
+
+    def __init__(self, path, data):
+        self.path = Path(path)
+        self.data = data
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path, target, source_hash, now=None):
+        """The saved plan for target + source_hash, if recent; else None."""
+        path = Path(path)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        now = now or datetime.now()
+        if (data.get("version") != CHECKPOINT_VERSION or data.get("target") != target
+                or data.get("source_hash") != source_hash
+                or now - datetime.fromisoformat(data["created"]) > CHECKPOINT_MAX_AGE):
+            return None
+        return cls(path, data)
+
+    @classmethod
+    def create(cls, path, target, source_hash, structural, batches, stats):
+        checkpoint = cls(path, {
+            "version": CHECKPOINT_VERSION, "target": target, "source_hash": source_hash,
+            "created": datetime.now().isoformat(timespec="seconds"), "stats": stats,
+            "structural": structural, "structural_done": not structural,
+            "batches": batches, "done": [],
+        })
+        checkpoint.save()
+        return checkpoint
+
+    @property
+    def pending(self):
+        done = set(self.data["done"])
+        return [i for i in range(len(self.data["batches"])) if i not in done]
+
+    def save(self):
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(prefix=f".{self.path.name}-", dir=self.path.parent)
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(self.data, f, separators=(",", ":"))
+                os.replace(tmp, self.path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+
+    def commit_structural(self):
+        self.data["structural_done"] = True
+        self.save()
+
+    def commit(self, index):
+        self.data["done"].append(index)
+        self.save()
+
+    def clear(self):
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def upload(send, checkpoint, concurrency=CONCURRENCY, retries=RETRIES, progress=None):
+    """Send a checkpointed plan with send(requests); returns the number of batch_update calls made.
+
+    Raises the first batch error that retries didn't resolve, after the
+    batches already in flight finish (and are checkpointed). The checkpoint
+    is cleared once everything is committed.
+    """
+    data = checkpoint.data
+    calls = 0
+    if not data["structural_done"]:
+        try:
+            send_with_retry(send, data["structural"], retries, retry_if=is_rejected_retryable)
+        except Exception as e:
+            if not outcome_known(e):
+                checkpoint.clear()  # It may have been applied: re-plan from the sheet next time
+            raise
+        calls += 1
+        checkpoint.commit_structural()
+
+    pending = checkpoint.pending
+    total = len(data["batches"])
+    error = None
+    concurrency = max(1, concurrency)
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        queue = iter(pending)
+        running = {}
+
+        def submit():
+            index = next(queue, None)
+            if index is not None:
+                running[pool.submit(send_with_retry, send, data["batches"][index], retries)] = index
+
+        for _ in range(concurrency):
+            submit()
+        while running:
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                index = running.pop(future)
+                try:
+                    future.result()
+                except Exception as e:
+                    error = error or e
+                    continue
+                calls += 1
+                checkpoint.commit(index)
+                if progress:
+                    progress(total - len(checkpoint.pending), total)
+                if error is None:
+                    submit()
+    if error is not None:
+        raise error
+    checkpoint.clear()
+    return calls
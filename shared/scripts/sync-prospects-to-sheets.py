@@ -4,121 +4,436 @@ Reads the markdown table directly (no CSV intermediary).
 Auto-runs as part of linkedin-daily-planner Evening Block.
 
 Prerequisites:
-- pip install gspread google-auth
+- pip install gspread google-auth (not needed for --backup-only or --backend local)
 - Service account JSON key at SERVICE_ACCOUNT_FILE path
 - Spreadsheet shared with: claude-sheets@gen-lang-client-0759962377.iam.gserviceaccount.com (Editor)
 - Google Drive API + Google Sheets API enabled on project gen-lang-client-0759962377
 
 Trigger: "sync to googlesheet" or auto-run in Evening Block
+
+Usage:
+    python shared/scripts/sync-prospects-to-sheets.py                 # backup + sync
+    python shared/scripts/sync-prospects-to-sheets.py --backup-only   # no Google libraries loaded
+    python shared/scripts/sync-prospects-to-sheets.py --backend local --local-sheet sheet.json
+
+Paths and IDs come from the environment (or the matching flag, see --help):
+ICP_PROSPECTS_PATH, GOOGLE_SERVICE_ACCOUNT_FILE, SHEETS_SPREADSHEET_ID,
+ICP_BACKUP_DIR, SHEETS_BACKEND, SHEETS_LOCAL_FILE. Defaults live under
+~/.claude/skills, the standard install location.
+
+The sheet is updated in place, never cleared: the current values are read
+once, diffed against the file by Profile URL, and only the changed cells,
+new rows and removed rows are sent, together with any header formatting
+that isn't already applied. sheets_upload.py sends that plan in chunked
+batches, concurrently and with retries, and checkpoints each committed batch
+(SHEETS_CHECKPOINT_FILE) so an interrupted sync resumes where it stopped.
 """
-import gspread
-from google.oauth2.service_account import Credentials
-import re
-import sys
-import csv
+import argparse
+import hashlib
+import json
 import os
+import sys
+import threading
 from datetime import datetime
+from pathlib import Path
+
+# icp-prospects.md is read through shared/prospects_store
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from prospects_store import PROSPECTS_PATH, load_table, normalize_url
+from prospect_backups import BackupStore, to_csv
+import sheets_upload
+from sheets_upload import Checkpoint, plan_batches, upload
 
-# --- Configuration ---
-SERVICE_ACCOUNT_FILE = r"C:\Users\melve\.claude\skills\gen-lang-client-0759962377-207882157ce2.json"
-PROSPECTS_FILE = r"C:\Users\melve\.claude\skills\shared\logs\icp-prospects.md"
-SPREADSHEET_ID = "1-3Ua8O6vwqHtuUe17VepNpWPWPeT0eeL8jXfN40lfKc"
+# --- Configuration (env overrides; CLI flags override env) ---
+SKILLS_DIR = Path.home() / ".claude" / "skills"
+SERVICE_ACCOUNT_FILE = os.environ.get(
+    "GOOGLE_SERVICE_ACCOUNT_FILE", str(SKILLS_DIR / "gen-lang-client-0759962377-207882157ce2.json")
+)
+PROSPECTS_FILE = str(PROSPECTS_PATH)  # ICP_PROSPECTS_PATH
+SPREADSHEET_ID = os.environ.get("SHEETS_SPREADSHEET_ID", "1-3Ua8O6vwqHtuUe17VepNpWPWPeT0eeL8jXfN40lfKc")
 DRIVE_FOLDER_ID = "1PAvNtv07W2wsLkAgIr93xxPCeoINjAnX"
 SERVICE_ACCOUNT_EMAIL = "claude-sheets@gen-lang-client-0759962377.iam.gserviceaccount.com"
-CSV_BACKUP_DIR = r"C:\Users\melve\.claude\skills\shared\logs\backups"
+CSV_BACKUP_DIR = os.environ.get("ICP_BACKUP_DIR", str(SKILLS_DIR / "shared" / "logs" / "backups"))
+SHEETS_BACKEND = os.environ.get("SHEETS_BACKEND", "google")
+SHEETS_LOCAL_FILE = os.environ.get("SHEETS_LOCAL_FILE", str(SKILLS_DIR / "shared" / "logs" / "sheet-standin.json"))
+SHEETS_CHECKPOINT_FILE = os.environ.get(
+    "SHEETS_CHECKPOINT_FILE", str(SKILLS_DIR / "shared" / "logs" / "sheets-sync-checkpoint.json")
+)
 
 SCOPES = [
     "https://www.googleapis.com/auth/spreadsheets",
     "https://www.googleapis.com/auth/drive",
 ]
 
+SHEET_TITLE = "Prospects"
+HEADER_BACKGROUND = {"red": 0.2, "green": 0.4, "blue": 0.7}
+HEADER_TEXT_FORMAT = {"bold": True, "foregroundColorStyle": {"rgbColor": {"red": 1, "green": 1, "blue": 1}}}
+# Only what the formatting check needs: title, frozen rows, grid size and the header cells' format
+SHEET_METADATA_FIELDS = (
+    "sheets(properties(sheetId,title,gridProperties(rowCount,columnCount,frozenRowCount)),"
+    "data(rowData(values(userEnteredFormat(backgroundColor,textFormat(bold))))))"
+)
+
 
 def parse_markdown_table(filepath):
     """Parse the prospects markdown table into headers + rows."""
-    rows = []
-    headers = None
-    in_table = False
+    table = load_table(filepath)
+    return list(table.columns), [list(row.cells) for row in table]
+
+
+def save_csv_backup(headers, rows, backup_dir=CSV_BACKUP_DIR):
+    """Record a snapshot in the backup store; returns (snapshot id, stored).
+
+    Unchanged snapshots aren't stored again, and retention is applied at most
+    once a day after a new one is (see prospect_backups.py, which also restores
+    any version: `python shared/scripts/prospect_backups.py restore latest`).
+    """
+    store = BackupStore(backup_dir)
+    snapshot_id, stored = store.save(headers, rows)
+    if stored:
+        store.compact_if_due()
+    return snapshot_id, stored
+
+
+def row_key(headers, row):
+    """Diff key for a row: its Profile URL, else its # (rows without a URL)."""
+    cells = dict(zip(headers, row))
+    url = cells.get("Profile URL", "").strip()
+    if url and url != "TBD":
+        return "url:" + normalize_url(url)
+    return "#:" + cells.get("#", "").strip()
+
+
+def _cell_data(values):
+    return {"values": [{"userEnteredValue": {"stringValue": v}} for v in values]}
+
+
+def _update_cells(sheet_id, row_index, col_index, rows):
+    """updateCells request writing `rows` (lists of strings) at a 0-based position."""
+    return {"updateCells": {
+        "start": {"sheetId": sheet_id, "rowIndex": row_index, "columnIndex": col_index},
+        "rows": [_cell_data(r) for r in rows],
+        "fields": "userEnteredValue",
+    }}
+
+
+def _delete_rows(sheet_id, indices):
+    """deleteDimension requests for 0-based row `indices`, bottom-up so earlier ones stay valid."""
+    requests = []
+    indices = sorted(set(indices))
+    for start in reversed([i for i in indices if i - 1 not in indices]):
+        end = start
+        while end + 1 in indices:
+            end += 1
+        requests.append({"deleteDimension": {"range": {
+            "sheetId": sheet_id, "dimension": "ROWS", "startIndex": start, "endIndex": end + 1,
+        }}})
+    return requests
+
+
+def plan_sheet_update(current, headers, rows, sheet_id=0, row_count=None, column_count=None):
+    """Requests turning the sheet values `current` (header + rows) into `headers` + `rows`.
+
+    Rows are matched on row_key(). Matched rows stay where they are and only
+    their changed cells are rewritten, one span per row. Rows no longer in the
+    file are deleted, and new rows are appended in file order. If the header
+    changed or keys aren't unique, every row is rewritten in file order over
+    the old values, so the sheet is never empty. row_count/column_count
+    (the grid size) let the plan grow the grid to fit. Returns (requests, stats).
+    """
+    width = len(headers)
+    current = [list(r[:width]) + [""] * (width - len(r[:width])) for r in current]
+    desired_keys = [row_key(headers, r) for r in rows]
+    current_keys = [row_key(headers, r) for r in current[1:]]
+    keyed = (
+        bool(current) and current[0] == list(headers)
+        and len(set(desired_keys)) == len(desired_keys)
+        and len(set(current_keys)) == len(current_keys)
+    )
+
+    stats = {"changed": 0, "added": 0, "removed": 0}
+    writes = []
+    if keyed:
+        desired = dict(zip(desired_keys, rows))
+        old_rows = dict(zip(current_keys, current[1:]))
+        removed = [i + 1 for i, key in enumerate(current_keys) if key not in desired]
+        surviving = [key for key in current_keys if key in desired]
+        for row_index, key in enumerate(surviving, start=1):
+            changed = [c for c in range(width) if old_rows[key][c] != desired[key][c]]
+            if changed:
+                lo, hi = changed[0], changed[-1]
+                writes.append(_update_cells(sheet_id, row_index, lo, [desired[key][lo:hi + 1]]))
+                stats["changed"] += 1
+        added = [row for key, row in zip(desired_keys, rows) if key not in old_rows]
+        if added:
+            writes.append(_update_cells(sheet_id, len(surviving) + 1, 0, [list(r) for r in added]))
+        stats["added"] = len(added)
+    else:
+        # Rows left over below the rewritten table are deleted
+        removed = list(range(len(rows) + 1, len(current)))
+        writes.append(_update_cells(sheet_id, 0, 0, [list(headers)] + [list(r) for r in rows]))
+        stats["changed"] = len(rows)
+    stats["removed"] = len(removed)
+
+    grow = []
+    total_rows = len(rows) + 1
+    if row_count is not None and total_rows > row_count - len(removed):
+        grow.append({"appendDimension": {
+            "sheetId": sheet_id, "dimension": "ROWS", "length": total_rows - (row_count - len(removed)),
+        }})
+    if column_count is not None and width > column_count:
+        grow.append({"appendDimension": {"sheetId": sheet_id, "dimension": "COLUMNS", "length": width - column_count}})
+
+    # Deletions first (indices refer to the current sheet), then room for new rows, then values
+    return _delete_rows(sheet_id, removed) + grow + writes, stats
 
-    with open(filepath, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line.startswith("|"):
-                if in_table and headers:
-                    break
-                continue
 
-            cells = [c.strip() for c in line.split("|")]
-            cells = cells[1:-1]
+def plan_formatting(sheet_meta, sheet_id=0):
+    """Header format, freeze and title requests, only for what isn't applied yet."""
+    props = sheet_meta.get("properties", {})
+    grid = props.get("gridProperties", {})
+    try:
+        first_cell = sheet_meta["data"][0]["rowData"][0]["values"][0].get("userEnteredFormat", {})
+    except (KeyError, IndexError):
+        first_cell = {}
+
+    requests = []
+    background = first_cell.get("backgroundColor", {})
+    if (not first_cell.get("textFormat", {}).get("bold")
+            or any(abs(background.get(k, 0) - v) > 0.01 for k, v in HEADER_BACKGROUND.items())):
+        requests.append({"repeatCell": {
+            "range": {"sheetId": sheet_id, "startRowIndex": 0, "endRowIndex": 1},
+            "cell": {"userEnteredFormat": {"backgroundColor": HEADER_BACKGROUND, "textFormat": HEADER_TEXT_FORMAT}},
+            "fields": "userEnteredFormat(backgroundColor,textFormat)",
+        }})
+    if grid.get("frozenRowCount", 0) != 1:
+        requests.append({"updateSheetProperties": {
+            "properties": {"sheetId": sheet_id, "gridProperties": {"frozenRowCount": 1}},
+            "fields": "gridProperties.frozenRowCount",
+        }})
+    if props.get("title") != SHEET_TITLE:
+        requests.append({"updateSheetProperties": {
+            "properties": {"sheetId": sheet_id, "title": SHEET_TITLE},
+            "fields": "title",
+        }})
+    return requests
+
+
+# --- Sheet backends ---
+# A backend is one worksheet: get_values() (header + rows as strings),
+# get_metadata() (Sheets API sheet resource: properties + header-row format,
+# see SHEET_METADATA_FIELDS), batch_update(requests), plus sheet_id and url.
+
+
+class GoogleSheetBackend:
+    """The first worksheet of a Google Spreadsheet, via gspread (imported on first use)."""
+
+    def __init__(self, spreadsheet_id, service_account_file):
+        import gspread
+        from google.oauth2.service_account import Credentials
+
+        creds = Credentials.from_service_account_file(service_account_file, scopes=SCOPES)
+        self.spreadsheet = gspread.authorize(creds).open_by_key(spreadsheet_id)
+        self.worksheet = self.spreadsheet.sheet1
+        self.sheet_id = self.worksheet.id
+        self.url = f"https://docs.google.com/spreadsheets/d/{spreadsheet_id}"
+
+    def get_values(self):
+        return self.worksheet.get_all_values()
+
+    def get_metadata(self):
+        return self.spreadsheet.fetch_sheet_metadata({
+            "includeGridData": "true",
+            "ranges": f"'{self.worksheet.title}'!1:1",
+            "fields": SHEET_METADATA_FIELDS,
+        })["sheets"][0]
+
+    def batch_update(self, requests):
+        self.spreadsheet.batch_update({"requests": requests})
+
 
-            if not headers:
-                headers = cells
-                in_table = True
-                continue
+class LocalSheetBackend:
+    """A worksheet kept in a JSON file, for offline tests and benchmarks.
 
-            if all(re.match(r'^-+$', c) for c in cells):
-                continue
+    Applies the same batch_update requests the sync sends to Google (cell
+    values, row deletes/appends, header format, freeze, title) and counts
+    API-equivalent calls in `calls`.
+    """
 
-            rows.append(cells)
+    def __init__(self, path):
+        self.path = Path(path)
+        self.sheet_id = 0
+        self.url = self.path.resolve().as_uri()
+        self.calls = {"read": 0, "batch_update": 0}
+        self._lock = threading.Lock()  # Uploads send batches from several threads
+        if self.path.exists():
+            self.state = json.loads(self.path.read_text(encoding="utf-8"))
+        else:
+            self.state = {"title": "Sheet1", "frozen_rows": 0, "row_count": 1000, "column_count": 26,
+                          "header_format": {}, "values": []}
 
-    return headers, rows
+    def get_values(self):
+        self.calls["read"] += 1
+        return [list(r) for r in self.state["values"]]
 
+    def get_metadata(self):
+        self.calls["read"] += 1
+        state = self.state
+        return {
+            "properties": {"sheetId": self.sheet_id, "title": state["title"], "gridProperties": {
+                "rowCount": state["row_count"], "columnCount": state["column_count"],
+                "frozenRowCount": state["frozen_rows"],
+            }},
+            "data": [{"rowData": [{"values": [{"userEnteredFormat": state["header_format"]}]}]}],
+        }
 
-def save_csv_backup(headers, rows):
-    """Save versioned CSV backup to backups folder."""
-    os.makedirs(CSV_BACKUP_DIR, exist_ok=True)
+    def batch_update(self, requests):
+        with self._lock:
+            self._apply(requests)
 
-    # Format: icp-prospects_YYYYMMDDHHMM.csv
-    version = datetime.now().strftime('%Y%m%d%H%M')
-    csv_filename = f"icp-prospects_{version}.csv"
-    csv_path = os.path.join(CSV_BACKUP_DIR, csv_filename)
+    def _apply(self, requests):
+        self.calls["batch_update"] += 1
+        state, values = self.state, self.state["values"]
+        for request in requests:
+            kind, body = next(iter(request.items()))
+            if kind == "deleteDimension":
+                start, end = body["range"]["startIndex"], body["range"]["endIndex"]
+                del values[start:end]
+                state["row_count"] -= end - start
+            elif kind == "appendDimension":
+                key = "row_count" if body["dimension"] == "ROWS" else "column_count"
+                state[key] += body["length"]
+            elif kind == "updateCells":
+                start = body["start"]
+                for offset, row in enumerate(body["rows"]):
+                    index = start["rowIndex"] + offset
+                    if index >= state["row_count"]:
+                        raise ValueError(f"Row {index + 1} is outside the grid ({state['row_count']} rows)")
+                    while len(values) <= index:
+                        values.append([])
+                    cells = [c["userEnteredValue"]["stringValue"] for c in row["values"]]
+                    target = values[index]
+                    target.extend([""] * (start["columnIndex"] + len(cells) - len(target)))
+                    target[start["columnIndex"]:start["columnIndex"] + len(cells)] = cells
+            elif kind == "repeatCell":
+                fmt = body["cell"]["userEnteredFormat"]
+                state["header_format"] = {"backgroundColor": fmt["backgroundColor"],
+                                          "textFormat": {"bold": fmt["textFormat"]["bold"]}}
+            elif kind == "updateSheetProperties":
+                props = body["properties"]
+                if "title" in props:
+                    state["title"] = props["title"]
+                if "gridProperties" in props:
+                    state["frozen_rows"] = props["gridProperties"]["frozenRowCount"]
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(state), encoding="utf-8")
 
-    with open(csv_path, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(headers)
-        writer.writerows(rows)
 
-    return csv_path
+def open_backend(config):
+    if config.backend == "local":
+        return LocalSheetBackend(config.local_sheet)
+    return GoogleSheetBackend(config.spreadsheet_id, config.service_account)
+
+
+def sync_sheet(backend, headers, rows, config):
+    """Bring the backend's sheet in line with headers + rows; returns (stats, resumed).
+
+    A checkpoint left by an interrupted sync of the same snapshot to the same
+    sheet is resumed without re-reading the sheet.
+    """
+    target = f"{backend.url}#{backend.sheet_id}"
+    source_hash = hashlib.sha256(to_csv(headers, rows).encode("utf-8")).hexdigest()
+    checkpoint = Checkpoint.load(config.checkpoint, target, source_hash)
+    resumed = checkpoint is not None
+    if checkpoint is None:
+        meta = backend.get_metadata()
+        grid = meta["properties"]["gridProperties"]
+        requests, stats = plan_sheet_update(
+            backend.get_values(), headers, rows, backend.sheet_id, grid.get("rowCount"), grid.get("columnCount"),
+        )
+        requests += plan_formatting(meta, backend.sheet_id)
+        if not requests:
+            Checkpoint(config.checkpoint, {}).clear()  # A stale plan for an older snapshot
+            return stats, False
+        structural, batches = plan_batches(requests, config.batch_cells)
+        checkpoint = Checkpoint.create(config.checkpoint, target, source_hash, structural, batches, stats)
+    upload(backend.batch_update, checkpoint, config.concurrency, config.retries)
+    return checkpoint.data["stats"], resumed
+
+
+def _positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+
+def _non_negative_int(value):
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must be at least 0, got {value}")
+    return number
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Back up icp-prospects.md and sync it to Google Sheets")
+    parser.add_argument("--prospects", default=PROSPECTS_FILE, help="icp-prospects.md path (ICP_PROSPECTS_PATH)")
+    parser.add_argument("--backup-dir", default=CSV_BACKUP_DIR, help="Backup store directory (ICP_BACKUP_DIR)")
+    parser.add_argument("--backup-only", action="store_true", help="Save the backup and stop; no Sheets access")
+    parser.add_argument("--backend", choices=("google", "local"), default=SHEETS_BACKEND,
+                        help="Sheet backend (SHEETS_BACKEND): google, or local for a JSON stand-in")
+    parser.add_argument("--local-sheet", default=SHEETS_LOCAL_FILE, help="JSON file for --backend local (SHEETS_LOCAL_FILE)")
+    parser.add_argument("--spreadsheet-id", default=SPREADSHEET_ID, help="Google Spreadsheet ID (SHEETS_SPREADSHEET_ID)")
+    parser.add_argument("--service-account", default=SERVICE_ACCOUNT_FILE,
+                        help="Service account JSON key (GOOGLE_SERVICE_ACCOUNT_FILE)")
+    parser.add_argument("--checkpoint", default=SHEETS_CHECKPOINT_FILE,
+                        help="Upload progress file for resuming (SHEETS_CHECKPOINT_FILE)")
+    parser.add_argument("--batch-cells", type=_positive_int, default=sheets_upload.BATCH_CELLS,
+                        help=f"Max cells per batch_update call (default {sheets_upload.BATCH_CELLS})")
+    parser.add_argument("--concurrency", type=_positive_int, default=sheets_upload.CONCURRENCY,
+                        help=f"Batches in flight at once (default {sheets_upload.CONCURRENCY})")
+    parser.add_argument("--retries", type=_non_negative_int, default=sheets_upload.RETRIES,
+                        help=f"Retries per batch on rate limits and transient errors (default {sheets_upload.RETRIES})")
+    return parser.parse_args(argv)
 
 
 def main():
+    config = parse_args()
     timestamp = datetime.now().strftime('%H:%M')
 
     try:
         print(f"[{timestamp}] Parsing icp-prospects.md...")
-        headers, rows = parse_markdown_table(PROSPECTS_FILE)
+        headers, rows = parse_markdown_table(config.prospects)
         print(f"[{timestamp}] Found {len(rows)} prospects with {len(headers)} columns")
 
         # Save CSV backup (always, even if Sheets sync fails)
-        csv_path = save_csv_backup(headers, rows)
-        print(f"[{timestamp}] CSV backup saved: {csv_path}")
-
-        creds = Credentials.from_service_account_file(SERVICE_ACCOUNT_FILE, scopes=SCOPES)
-        gc = gspread.authorize(creds)
-
-        sh = gc.open_by_key(SPREADSHEET_ID)
-        worksheet = sh.sheet1
-        worksheet.clear()
-
-        all_data = [headers] + rows
-        worksheet.update(all_data, value_input_option="RAW")
+        backup_id, stored = save_csv_backup(headers, rows, config.backup_dir)
+        if stored:
+            print(f"[{timestamp}] Backup saved: {backup_id} in {config.backup_dir}")
+        else:
+            print(f"[{timestamp}] Backup unchanged since {backup_id}")
+        if config.backup_only:
+            sys.exit(0)
 
-        # Format header row (blue bg, white bold text, frozen)
-        worksheet.format("1:1", {
-            "backgroundColor": {"red": 0.2, "green": 0.4, "blue": 0.7},
-            "textFormat": {"bold": True, "foregroundColorStyle": {"rgbColor": {"red": 1, "green": 1, "blue": 1}}},
-        })
-        worksheet.freeze(rows=1)
-        worksheet.update_title("Prospects")
+        backend = open_backend(config)
+        stats, resumed = sync_sheet(backend, headers, rows, config)
 
         timestamp = datetime.now().strftime('%H:%M')
-        print(f"[{timestamp}] Synced {len(rows)} prospects to Google Sheets")
-        print(f"[{timestamp}] Spreadsheet: https://docs.google.com/spreadsheets/d/{SPREADSHEET_ID}")
+        if any(stats.values()):
+            print(
+                f"[{timestamp}] Synced {len(rows)} prospects to Google Sheets "
+                f"({stats['changed']} updated, {stats['added']} added, {stats['removed']} removed"
+                f"{', resumed from checkpoint' if resumed else ''})"
+            )
+        else:
+            print(f"[{timestamp}] Google Sheets already up to date ({len(rows)} prospects)")
+        print(f"[{timestamp}] Spreadsheet: {backend.url}")
         sys.exit(0)
 
     except Exception as e:
         timestamp = datetime.now().strftime('%H:%M')
         print(f"[{timestamp}] ERROR syncing prospects: {str(e)}")
-        print(f"[{timestamp}] CSV backup available at: {csv_path if 'csv_path' in locals() else 'N/A'}")
+        print(f"[{timestamp}] Backup available: {backup_id if 'backup_id' in locals() else 'N/A'}")
         sys.exit(1)
 
 